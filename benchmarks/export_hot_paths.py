@@ -0,0 +1,405 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Times the hot paths of the exporter on synthetic scenes of several sizes and saves the results as JSON:
+
+    paramset     ParamSetItem.to_string() of a native mesh ParamSet (export/__init__.py)
+    ply          GeometryExporter.buildBinaryPLYMesh() (export/geometry.py)
+    smoke        read_cache() of a baked smoke domain (export/volumes.py)
+    duplis       matrix_to_list() + PropertyBatch per particle, as in DupliExporter (export/luxcore)
+    film         convertChannelToImage() for id, depth and bordered RGB passes (core/__init__.py)
+
+The functions are compiled from the add-on sources and run against the fakes in fake_blender.py,
+so this needs NumPy, but neither Blender nor LuxCore. The fakes (mathutils.Matrix in particular)
+are slower than the real C implementations, so compare results of this script with each other,
+not with timings taken inside Blender.
+
+Usage: python benchmarks/export_hot_paths.py [--quick] [--repeat N] [--only NAME ...]
+                                             [--output FILE] [--compare OLD_RESULTS.json]
+"""
+
+import argparse
+import array
+import collections
+import concurrent.futures
+import ctypes
+import datetime
+import importlib.util
+import json
+import math
+import os
+import platform
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+try:
+    import numpy
+except ImportError:
+    sys.exit('numpy is required for this benchmark')
+
+import fake_blender
+import synthetic
+from fake_blender import Bag, load_definitions, log
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARK_DIR, 'results')
+
+bpy, mathutils, pyluxcore = fake_blender.install()
+
+
+def load_module(name, relpath):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(fake_blender.SOURCE_ROOT, relpath))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# These modules do not import bpy and can be loaded as a whole
+ExportProfiler = load_module('export_profiling', os.path.join('export', 'profiling.py')).ExportProfiler
+PropertyBatch = load_module('luxcore_batch', os.path.join('export', 'luxcore', 'batch.py')).PropertyBatch
+
+export_ns = {'math': math, 'collections': collections, 'concurrent': concurrent, 'bpy': bpy, 'mathutils': mathutils,
+             'LuxManager': Bag(CurrentScene=fake_blender.unit_scene(scale_length=0.01))}
+ParamSetItem, ParamSet, ExportCache, ExportWriterPool, matrix_to_list, fix_matrix_order = load_definitions(
+    os.path.join('export', '__init__.py'),
+    ['ParamSetItem', 'ParamSet', 'ExportCache', 'ExportWriterPool', 'matrix_to_list', 'fix_matrix_order_new'],
+    export_ns)
+load_definitions(os.path.join('export', '__init__.py'), ['get_worldscale'], export_ns)
+export_ns['fix_matrix_order'] = fix_matrix_order
+
+
+# ParamSetItem.to_string
+
+def prepare_paramset(vertex_count):
+    points, normals, uvs, indices = synthetic.mesh_arrays(vertex_count)
+    params = ParamSet() \
+        .add_integer('nsubdivlevels', 0) \
+        .add_string('subdivscheme', 'loop') \
+        .add_bool('dmnormalsmooth', True) \
+        .add_color('Kd', (0.8, 0.8, 0.8)) \
+        .add_point('P', points) \
+        .add_normal('N', normals) \
+        .add_float('uv', uvs) \
+        .add_integer('triindices', indices)
+
+    def run():
+        return '\n'.join(p.to_string() for p in params)
+
+    return run
+
+
+# GeometryExporter.buildBinaryPLYMesh
+
+def prepare_ply(resolution, workers=1):
+    export_dir = tempfile.mkdtemp(prefix='luxblend_bench_ply_')
+    ply_ns = {'os': os, 'struct': struct, 'bpy': bpy, 'LuxLog': log, 'ParamSet': ParamSet,
+              'ExportProfiler': ExportProfiler,
+              'efutil': Bag(export_path=export_dir, scene_filename=lambda: 'bench',
+                            path_relative_to_export=lambda path: path)}
+    load_definitions(os.path.join('export', 'geometry.py'),
+                     ['InvalidGeometryException', 'UnexportableObjectException', 'write_binary_ply'], ply_ns)
+    build_ply, cache_key, instancing = load_definitions(
+        os.path.join('export', 'geometry.py'),
+        ['GeometryExporter.buildBinaryPLYMesh', 'GeometryExporter.mesh_cache_key',
+         'GeometryExporter.allow_instancing'], ply_ns)
+
+    class Exporter(object):
+        """The parts of GeometryExporter that buildBinaryPLYMesh() uses"""
+        NewExportedObjects = set()
+        KnownExportedObjects = set()
+        KnownModifiedObjects = set()
+        geometry_index = None
+        buildBinaryPLYMesh = build_ply
+        mesh_cache_key = cache_key
+        allow_instancing = instancing
+
+        def __init__(self):
+            self.geometry_scene = Bag(name='Scene')
+            self.visibility_scene = Bag(frame_current=1, luxrender_engine=Bag(partial_ply=False))
+            self.ExportedMeshes = ExportCache('ExportedMeshes')
+            self.ExportedPLYs = ExportCache('ExportedPLYs')
+            self.writer_pool = ExportWriterPool(workers)
+
+    ply_ns['GeometryExporter'] = Exporter
+
+    mesh = synthetic.grid_mesh(resolution)
+    obj = synthetic.mesh_object('Grid', mesh, ParamSet)
+
+    def run():
+        exporter = Exporter()
+        definitions = exporter.buildBinaryPLYMesh(obj)
+        exporter.writer_pool.shutdown()
+        assert len(definitions) == len(mesh.materials)
+        return definitions
+
+    return run, lambda: shutil.rmtree(export_dir, ignore_errors=True)
+
+
+# read_cache
+
+class StoredStreamLibrary(object):
+    """Stands in for the LZO library, the synthetic caches store the density as raw floats"""
+
+    @classmethod
+    def load_lzo(cls):
+        return True, cls
+
+    @staticmethod
+    def lzo1x_decompress(src, src_len, dst, out_len, wrkmem):
+        ctypes.memmove(dst, src, src_len)
+
+
+def prepare_smoke(resolution):
+    blend_dir = tempfile.mkdtemp(prefix='luxblend_bench_smoke_')
+    cache_dir = os.path.join(blend_dir, 'blendcache_bench')
+    os.makedirs(cache_dir)
+    density = synthetic.write_smoke_cache(cache_dir, 'SmokeCache', 1, 0, resolution)
+
+    smoke_ns = {name: getattr(ctypes, name) for name in ('c_uint', 'c_float', 'cast', 'POINTER', 'byref', 'sizeof')}
+    smoke_ns.update({'os': os, 'struct': struct, 'LuxLog': log, 'library_loader': StoredStreamLibrary,
+                     'bpy': Bag(data=Bag(filepath=os.path.join(blend_dir, 'bench.blend'))),
+                     'LuxManager': Bag(CurrentScene=fake_blender.unit_scene(frame=1))})
+    read_cache, = load_definitions(os.path.join('export', 'volumes.py'), ['read_cache'], smoke_ns)
+
+    smokecache = Bag(is_baked=True, name='SmokeCache', index=0)
+
+    def run():
+        res_x, res_y, res_z, cells, fire = read_cache(smokecache, False, 1, -1)
+        assert (res_x, res_y, res_z) == resolution and len(cells) == len(density)
+        assert cells[-1] == density[-1]
+        return cells
+
+    return run, lambda: shutil.rmtree(blend_dir, ignore_errors=True)
+
+
+# DupliExporter particle transformations
+
+DUPLI_TEMPLATE = ('scene.objects.%(name)s.shape = "%(shape)s"\n'
+                  'scene.objects.%(name)s.material = "%(material)s"\n'
+                  'scene.objects.%(name)s.transformation = %(transform)s')
+
+
+def prepare_duplis(count):
+    matrices = synthetic.particle_matrices(count)
+
+    def run():
+        # Per instance work of DupliExporter.__convert_particles(), without the pyluxcore flush
+        batch = PropertyBatch()
+
+        for index, dm in enumerate(matrices):
+            transform = PropertyBatch.format_matrix(matrix_to_list(dm, apply_worldscale=True))
+            batch.set_formatted(DUPLI_TEMPLATE % {
+                'name': 'Emitter_ParticleSystem_%d_0' % index,
+                'shape': 'Mesh_shape',
+                'material': 'Material',
+                'transform': transform,
+            })
+
+        assert len(batch) == count
+        return batch
+
+    return run
+
+
+# convertChannelToImage
+
+class FakeFilm(object):
+    def __init__(self, floats=None, uints=None):
+        self.floats = floats
+        self.uints = uints
+
+    def GetOutputFloat(self, output_type, buffer, index=0):
+        buffer[:] = self.floats
+
+    def GetOutputUInt(self, output_type, buffer, index=0):
+        buffer[:] = self.uints
+
+
+def prepare_film(channel, width, height, border=False):
+    film_ns = {'__package__': 'luxrender.core', 'array': array, 'bpy': bpy, 'LuxLog': log,
+               'get_output_filename': lambda scene: 'bench'}
+    convert, = load_definitions(os.path.join('core', '__init__.py'),
+                                ['RENDERENGINE_luxrender.convertChannelToImage'], film_ns)
+
+    depth = {'OBJECT_ID': 1, 'DEPTH': 1, 'RGB': 3}[channel]
+
+    if channel == 'OBJECT_ID':
+        film = FakeFilm(uints=array.array('I', synthetic.film_buffer(width, height, depth, integer=True).tobytes()))
+    else:
+        film = FakeFilm(floats=array.array('f', synthetic.film_buffer(width, height, depth).tobytes()))
+
+    engine = Bag(update_stats=lambda *args: None, output_dir='')
+    session = Bag(GetFilm=lambda: film)
+    full_resolution = (width * 2, height * 2) if border else (width, height)
+    scene = Bag(
+        luxrender_channels=Bag(import_compatible=True),
+        render=Bag(use_border=border, use_crop_to_border=False, border_min_x=0.25, border_min_y=0.25),
+        camera=Bag(data=Bag(luxrender_camera=Bag(luxrender_film=Bag(resolution=lambda scene: full_resolution)))),
+    )
+    passes = [Bag(type='Z', rect=None)]
+
+    def run():
+        del bpy.data.images[:]
+        convert(engine, session, scene, passes, width, height, channel, False)
+
+        if channel == 'DEPTH':
+            assert len(passes[0].rect) == width * height
+        else:
+            assert len(bpy.data.images[0].pixels) == full_resolution[0] * full_resolution[1] * 4
+
+    return run
+
+
+def film_case(channel, border=False):
+    return lambda size: prepare_film(channel, size[0], size[1], border)
+
+
+def pixels(size):
+    return size[0] * size[1]
+
+
+def cells(size):
+    return size[0] * size[1] * size[2]
+
+
+# name, case, prepare(size), sizes, quick sizes, element count(size), element name
+BENCHMARKS = [
+    ('paramset', 'native mesh', prepare_paramset, [1000, 10000, 100000], [1000, 10000], int, 'vertices'),
+    ('ply', 'smooth, uv, vertex colors', prepare_ply, [32, 128, 256], [32, 64], lambda r: r * r, 'faces'),
+    ('ply', '4 writer threads', lambda r: prepare_ply(r, workers=4), [32, 128, 256], [32, 64], lambda r: r * r,
+     'faces'),
+    ('smoke', 'lzo density', prepare_smoke, [(32, 32, 32), (64, 64, 64), (128, 128, 128)],
+     [(32, 32, 32), (64, 64, 64)], cells, 'cells'),
+    ('duplis', 'particles', prepare_duplis, [1000, 10000, 100000], [1000, 10000], int, 'instances'),
+    ('film', 'OBJECT_ID', film_case('OBJECT_ID'), [(320, 180), (960, 540), (1920, 1080)],
+     [(320, 180), (640, 360)], pixels, 'pixels'),
+    ('film', 'DEPTH to pass', film_case('DEPTH'), [(320, 180), (960, 540), (1920, 1080)],
+     [(320, 180), (640, 360)], pixels, 'pixels'),
+    ('film', 'RGB with border', film_case('RGB', border=True), [(320, 180), (960, 540), (1920, 1080)],
+     [(320, 180), (640, 360)], pixels, 'pixels'),
+]
+
+
+def size_label(size):
+    return 'x'.join(str(s) for s in size) if isinstance(size, tuple) else str(size)
+
+
+def measure(prepare, size, repeat):
+    prepared = prepare(size)
+    run, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+
+    try:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+    finally:
+        if cleanup is not None:
+            cleanup()
+
+    return times
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARK_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, old_path):
+    with open(old_path) as old_file:
+        old = {(r['benchmark'], r['case'], r['size']): r for r in json.load(old_file)['results']}
+
+    print('\nCompared with %s:' % old_path)
+
+    for result in results:
+        previous = old.get((result['benchmark'], result['case'], result['size']))
+
+        if previous is not None:
+            ratio = result['best'] / previous['best']
+            print('%-8s %-26s %-12s %8.3fs -> %8.3fs  %6.2fx' % (result['benchmark'], result['case'], result['size'],
+                                                               previous['best'], result['best'], ratio))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the exporter hot paths without Blender')
+    parser.add_argument('--quick', action='store_true', help='only the small sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per size, the best one is reported')
+    parser.add_argument('--only', nargs='+', choices=sorted(set(b[0] for b in BENCHMARKS)), help='benchmarks to run')
+    parser.add_argument('--output', help='results file (default: benchmarks/results/hot_paths_<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare with')
+    args = parser.parse_args()
+
+    results = []
+    print('%-8s %-26s %-12s %10s %10s %14s' % ('Name', 'Case', 'Size', 'Best (s)', 'Mean (s)', 'Per element'))
+
+    for name, case, prepare, sizes, quick_sizes, elements, element_name in BENCHMARKS:
+        if args.only and name not in args.only:
+            continue
+
+        for size in (quick_sizes if args.quick else sizes):
+            times = measure(prepare, size, args.repeat)
+            count = elements(size)
+            result = {
+                'benchmark': name,
+                'case': case,
+                'size': size_label(size),
+                'elements': count,
+                'element': element_name,
+                'best': min(times),
+                'mean': sum(times) / len(times),
+                'times': times,
+            }
+            results.append(result)
+            print('%-8s %-26s %-12s %10.4f %10.4f %11.3fus' % (name, case, result['size'], result['best'],
+                                                              result['mean'], result['best'] / count * 1000000))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, 'hot_paths_%s.json' % datetime.datetime.now().strftime('%Y%m%d-%H%M%S'))
+
+    with open(output, 'w') as results_file:
+        json.dump({
+            'created': datetime.datetime.now().isoformat(),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'platform': platform.platform(),
+            'quick': args.quick,
+            'repeat': args.repeat,
+            'results': results,
+        }, results_file, indent=2)
+
+    print('\nResults written to %s' % output)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
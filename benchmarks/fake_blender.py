@@ -0,0 +1,293 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Minimal stand-ins for bpy, mathutils and pyluxcore, just enough to run single exporter functions
+outside of Blender, and load_definitions() to pull those functions out of the add-on sources.
+
+The add-on package itself can not be imported without Blender (its __init__ registers UI classes
+and the outputs import the LuxRender bindings), so the benchmarks compile only the functions they
+need from the real source files and run them in a namespace filled with these fakes.
+"""
+
+import ast
+import collections
+import os
+import re
+import sys
+import types
+
+SOURCE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'luxrender')
+
+
+class Bag(types.SimpleNamespace):
+    """
+    Attribute container for fake Blender data (scenes, objects, settings...).
+    Hashed by identity like Blender ID blocks, so it can be used in export caches.
+    """
+    __eq__ = object.__eq__
+    __hash__ = object.__hash__
+
+
+class Matrix(object):
+    """4x4 row major matrix with the subset of the mathutils.Matrix API used by the exporter"""
+
+    def __init__(self, rows=None):
+        if rows is None:
+            rows = [[1.0 if i == j else 0.0 for j in range(4)] for i in range(4)]
+
+        self.rows = [list(row) for row in rows]
+
+    @classmethod
+    def Identity(cls, size=4):
+        return cls()
+
+    @classmethod
+    def Scale(cls, factor, size=4):
+        return cls([[factor if i == j and i < 3 else (1.0 if i == j else 0.0) for j in range(4)] for i in range(4)])
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+    def __eq__(self, other):
+        return isinstance(other, Matrix) and self.rows == other.rows
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __mul__(self, other):
+        a = self.rows
+        b = other.rows
+        return Matrix([[a[i][0] * b[0][j] + a[i][1] * b[1][j] + a[i][2] * b[2][j] + a[i][3] * b[3][j]
+                        for j in range(4)] for i in range(4)])
+
+    def copy(self):
+        return Matrix(self.rows)
+
+    def transposed(self):
+        return Matrix(zip(*self.rows))
+
+    def determinant(self):
+        m = self.rows
+
+        def minor(row, col):
+            sub = [[m[i][j] for j in range(4) if j != col] for i in range(4) if i != row]
+            return (sub[0][0] * (sub[1][1] * sub[2][2] - sub[1][2] * sub[2][1]) -
+                    sub[0][1] * (sub[1][0] * sub[2][2] - sub[1][2] * sub[2][0]) +
+                    sub[0][2] * (sub[1][0] * sub[2][1] - sub[1][1] * sub[2][0]))
+
+        return sum(((-1) ** col) * m[0][col] * minor(0, col) for col in range(4))
+
+
+class ImageCollection(list):
+    def new(self, name, width, height, alpha=False, float_buffer=False):
+        image = Bag(name=name, size=(width, height), users=0, pixels=None, filepath_raw='', file_format='PNG')
+        image.user_clear = lambda: None
+        self.append(image)
+        return image
+
+    def remove(self, image, do_unlink=True):
+        list.remove(self, image)
+
+
+class MeshCollection(list):
+    def remove(self, mesh, do_unlink=True):
+        pass
+
+
+def clean_name(name, replace='_'):
+    return re.sub(r'[^a-zA-Z0-9_\-.]', replace, name)
+
+
+class PropertyFunctions(object):
+    """
+    bpy.props: like Blender 2.7x, a property function returns a (function, keywords) tuple that is turned into
+    the real property when the class is registered. calls counts the properties created per type.
+    """
+
+    def __init__(self):
+        self.calls = collections.Counter()
+
+    def __getattr__(self, name):
+        if not name.endswith('Property'):
+            raise AttributeError(name)
+
+        def make_property(**keywords):
+            self.calls[name] += 1
+            return make_property, keywords
+
+        return make_property
+
+
+def make_bpy():
+    bpy = types.ModuleType('bpy')
+    bpy.app = Bag(version=(2, 79, 0), binary_path='/opt/blender/blender', background=True)
+    bpy.types = Bag(Operator=type('Operator', (), {}), Panel=type('Panel', (), {}),
+                    PropertyGroup=type('PropertyGroup', (), {}), Scene=type('Scene', (), {}))
+    # Registered classes show up in bpy.types, like in Blender
+    bpy.utils = Bag(user_resource=lambda resource_type, path='', create=False: os.path.join('/tmp', path),
+                    script_paths=lambda *args, **kwargs: [],
+                    register_class=lambda cls: setattr(bpy.types, cls.__name__, cls),
+                    unregister_class=lambda cls: delattr(bpy.types, cls.__name__))
+    bpy.props = PropertyFunctions()
+    bpy.ops = Bag()
+    bpy.path = Bag(clean_name=clean_name, abspath=lambda path, library=None: path)
+    bpy.data = Bag(filepath='', images=ImageCollection(), meshes=MeshCollection(), objects={})
+    bpy.context = Bag(scene=Bag(luxrender_world=Bag(preview_object_size=2.0)))
+    return bpy
+
+
+def make_mathutils():
+    mathutils = types.ModuleType('mathutils')
+    mathutils.Matrix = Matrix
+    return mathutils
+
+
+class FilmOutputType(object):
+    """Output types are only used as keys, their names are good enough"""
+
+    def __getattr__(self, name):
+        return name
+
+
+class Property(object):
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+
+class Properties(object):
+    """Name -> value subset of pyluxcore.Properties"""
+
+    def __init__(self, other=None):
+        self.values = dict(other.values) if other is not None else {}
+
+    def Set(self, prop):
+        if isinstance(prop, Properties):
+            self.values.update(prop.values)
+        else:
+            self.values[prop.name] = prop.value
+
+    def Get(self, name):
+        return Property(name, self.values[name])
+
+    def GetAllNames(self):
+        return list(self.values)
+
+    def GetAllUniqueSubNames(self, prefix):
+        depth = prefix.count('.') + 2
+        return sorted({'.'.join(name.split('.')[:depth]) for name in self.values if name.startswith(prefix + '.')})
+
+    def DeleteAll(self, names):
+        for name in names:
+            self.values.pop(name, None)
+
+    def __str__(self):
+        return '\n'.join('%s = %r' % item for item in sorted(self.values.items()))
+
+
+def make_pyluxcore():
+    """
+    The film channel conversions are C++ code in LuxCore, they are replaced with NumPy
+    versions here so that only the Python side of the add-on is measured.
+    """
+    import numpy
+
+    def spread(depth, fill):
+        def convert(width, height, buffer, normalize):
+            src = numpy.frombuffer(buffer, dtype=numpy.float32).reshape(-1, depth)
+            out = numpy.empty((src.shape[0], 4), dtype=numpy.float32)
+            out[:, :depth] = src
+            out[:, depth:3] = src[:, :1] if depth == 1 else 0.0
+            out[:, 3] = fill
+
+            if normalize and out[:, :3].max() > 0:
+                out[:, :3] /= out[:, :3].max()
+
+            return out.ravel().tolist()
+
+        return convert
+
+    pyluxcore = types.ModuleType('pyluxcore')
+    pyluxcore.FilmOutputType = FilmOutputType()
+    pyluxcore.Properties = Properties
+    pyluxcore.Property = Property
+    pyluxcore.ConvertFilmChannelOutput_1xFloat_To_4xFloatList = spread(1, 1.0)
+    pyluxcore.ConvertFilmChannelOutput_2xFloat_To_4xFloatList = spread(2, 1.0)
+    pyluxcore.ConvertFilmChannelOutput_3xFloat_To_4xFloatList = spread(3, 1.0)
+    return pyluxcore
+
+
+def install():
+    """
+    Register the fake modules, plus a fake luxrender.outputs.luxcore_api for functions that import
+    pyluxcore with a relative import. Returns (bpy, mathutils, pyluxcore).
+    """
+    bpy = sys.modules.setdefault('bpy', make_bpy())
+    mathutils = sys.modules.setdefault('mathutils', make_mathutils())
+    pyluxcore = make_pyluxcore()
+
+    for name in ('luxrender', 'luxrender.core', 'luxrender.outputs'):
+        package = sys.modules.setdefault(name, types.ModuleType(name))
+        package.__path__ = []
+
+    luxcore_api = types.ModuleType('luxrender.outputs.luxcore_api')
+    luxcore_api.pyluxcore = pyluxcore
+    luxcore_api.PYLUXCORE_AVAILABLE = True
+    sys.modules['luxrender.outputs.luxcore_api'] = luxcore_api
+
+    return bpy, mathutils, pyluxcore
+
+
+def load_definitions(relpath, names, namespace):
+    """
+    Compile the top level functions/classes (or 'Class.method' as a plain function) named in names
+    from the add-on source file relpath into namespace. Returns the definitions in the same order.
+    Nothing else of the module is executed, so its imports have to be provided by namespace.
+    """
+    path = os.path.join(SOURCE_ROOT, relpath)
+
+    with open(path, 'rb') as source_file:
+        tree = ast.parse(source_file.read(), path)
+
+    top_level = {node.name: node for node in tree.body if isinstance(node, (ast.FunctionDef, ast.ClassDef))}
+    selected = []
+
+    for name in names:
+        owner, _, member = name.rpartition('.')
+
+        if owner:
+            nodes = {node.name: node for node in top_level[owner].body if isinstance(node, ast.FunctionDef)}
+            selected.append(nodes[member])
+        else:
+            selected.append(top_level[name])
+
+    namespace.setdefault('__name__', 'luxrender.' + os.path.splitext(relpath)[0].replace(os.sep, '.'))
+    exec(compile(ast.Module(body=selected, type_ignores=[]), path, 'exec'), namespace)
+    return [namespace[name.rpartition('.')[2]] for name in names]
+
+
+def log(message, *args, **kwargs):
+    """Replacement for LuxLog, the messages are not interesting here"""
+    pass
+
+
+def unit_scene(name='Scene', frame=1, scale_length=1.0):
+    return Bag(name=name, frame_current=frame, unit_settings=Bag(system='METRIC', scale_length=scale_length))
+
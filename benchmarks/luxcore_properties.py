@@ -0,0 +1,112 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Compares per-key pyluxcore.Properties.Set() calls with the PropertyBatch used by the LuxCore
+exporter for object/dupli properties. Needs pyluxcore, but not Blender.
+
+Usage: python benchmarks/luxcore_properties.py [instance count]
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+try:
+    import pyluxcore
+except ImportError:
+    sys.exit('pyluxcore is required for this benchmark')
+
+BATCH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '..', 'src', 'luxrender', 'export', 'luxcore', 'batch.py')
+
+spec = importlib.util.spec_from_file_location('luxcore_batch', BATCH_PATH)
+batch_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(batch_module)
+PropertyBatch = batch_module.PropertyBatch
+
+PROPERTIES_PER_INSTANCE = 3
+
+
+def make_transform(i):
+    return [1.0, 0.0, 0.0, 0.0,
+            0.0, 1.0, 0.0, 0.0,
+            0.0, 0.0, 1.0, 0.0,
+            i * 0.1, i * 0.2, i * 0.3, 1.0]
+
+
+def run_per_key(count):
+    props = pyluxcore.Properties()
+
+    for i in range(count):
+        prefix = 'scene.objects.dupli%d' % i
+        props.Set(pyluxcore.Property(prefix + '.shape', 'Mesh_shape'))
+        props.Set(pyluxcore.Property(prefix + '.material', 'Material'))
+        props.Set(pyluxcore.Property(prefix + '.transformation', make_transform(i)))
+
+    return props
+
+
+def run_batched(count):
+    props = pyluxcore.Properties()
+    batch = PropertyBatch()
+    template = ('scene.objects.%(name)s.shape = "%(shape)s"\n'
+                'scene.objects.%(name)s.material = "%(material)s"\n'
+                'scene.objects.%(name)s.transformation = %(transform)s')
+
+    for i in range(count):
+        batch.set_formatted(template % {
+            'name': 'dupli%d' % i,
+            'shape': 'Mesh_shape',
+            'material': 'Material',
+            'transform': PropertyBatch.format_matrix(make_transform(i)),
+        })
+
+        if i % 10000 == 0:
+            batch.flush(props)
+
+    return batch.flush(props)
+
+
+def measure(name, func, count):
+    start = time.perf_counter()
+    props = func(count)
+    elapsed = time.perf_counter() - start
+
+    prop_count = len(props.GetAllNames())
+    assert prop_count == count * PROPERTIES_PER_INSTANCE, (name, prop_count)
+
+    print('%-10s %8d properties in %7.3fs: %12.0f properties/s' % (name, prop_count, elapsed, prop_count / elapsed))
+    return props
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    per_key = measure('per-key', run_per_key, count)
+    batched = measure('batched', run_batched, count)
+
+    # Both paths have to produce the same scene description
+    name = 'scene.objects.dupli%d.transformation' % (count - 1)
+    assert per_key.Get(name).GetFloats() == batched.Get(name).GetFloats()
+
+
+if __name__ == '__main__':
+    main()
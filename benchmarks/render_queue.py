@@ -0,0 +1,113 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Runs the animation queue scheduler of core/render_queue.py with a fake renderer instead of luxconsole.
+The fake renderer sleeps for work / threads ** efficiency seconds, so like a real render it does not get
+linearly faster with more threads, and fails the first attempt of every --fail-every'th frame, so the
+retries can be checked. Does not need Blender or LuxRender.
+
+Usage: python benchmarks/render_queue.py [--frames 24] [--processes 1 2 4] [--threads 8] [--fail-every 5]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+RENDER_QUEUE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 '..', 'src', 'luxrender', 'core', 'render_queue.py')
+
+spec = importlib.util.spec_from_file_location('render_queue', RENDER_QUEUE_PATH)
+render_queue = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(render_queue)
+
+# Reads "work fail" from the scene file; a failing frame leaves a marker, so only its first attempt fails
+FAKE_RENDERER = '''
+import os, sys, time
+threads = int(sys.argv[1].split('=')[1])
+scene_file = sys.argv[2]
+with open(scene_file) as f:
+    work, fail = f.read().split()
+marker = scene_file + '.attempted'
+if fail == '1' and not os.path.exists(marker):
+    open(marker, 'w').close()
+    sys.exit(3)
+time.sleep(float(work) / threads ** %f)
+'''
+
+
+def write_queue(directory, frames, work, fail_every):
+    queue_file = os.path.join(directory, 'animation.lxq')
+
+    with open(queue_file, 'w') as qf:
+        for frame in range(frames):
+            scene_file = os.path.join(directory, 'frame.%05d.lxs' % frame)
+            fail = fail_every and frame % fail_every == fail_every - 1
+
+            with open(scene_file, 'w') as sf:
+                sf.write('%f %i' % (work, fail))
+
+            qf.write('%s\n' % scene_file)
+
+    return queue_file
+
+
+def run(queue_file, processes, threads, retries, efficiency):
+    script = FAKE_RENDERER % efficiency
+
+    def make_args(scene_file, thread_count):
+        return [sys.executable, '-c', script, '--threads=%i' % thread_count, scene_file]
+
+    scheduler = render_queue.RenderQueueScheduler(render_queue.read_queue_file(queue_file), make_args,
+                                                  processes, threads, max_retries=retries,
+                                                  log=lambda message: None)
+    start = time.perf_counter()
+    scheduler.run(poll_interval=0.01)
+    elapsed = time.perf_counter() - start
+
+    attempts = sum(frame.attempts for frame in scheduler.frames)
+    print('%9i %-16s %9.2fs %9i %9i %9i' % (processes, scheduler.thread_budget, elapsed, len(scheduler.finished),
+                                             len(scheduler.failed), attempts - len(scheduler.frames)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=24)
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--threads', type=int, default=8, help='threads shared by all processes')
+    parser.add_argument('--work', type=float, default=0.8, help='seconds per frame with one thread')
+    parser.add_argument('--efficiency', type=float, default=0.7, help='thread scaling exponent of the fake renderer')
+    parser.add_argument('--fail-every', type=int, default=5, help='fail the first attempt of every n-th frame')
+    parser.add_argument('--retries', type=int, default=1)
+    args = parser.parse_args()
+
+    print('%d frames, %d threads' % (args.frames, args.threads))
+    print('%9s %-16s %10s %9s %9s %9s' % ('Processes', 'Threads', 'Time', 'Finished', 'Failed', 'Retries'))
+
+    for processes in args.processes:
+        with tempfile.TemporaryDirectory() as directory:
+            queue_file = write_queue(directory, args.frames, args.work, args.fail_every)
+            run(queue_file, processes, args.threads, args.retries, args.efficiency)
+
+
+if __name__ == '__main__':
+    main()
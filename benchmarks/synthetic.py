@@ -0,0 +1,163 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+NumPy generated test data for the export benchmarks: meshes, particle matrices, smoke point caches
+and film buffers. Everything is seeded, so repeated runs export exactly the same data.
+"""
+
+import os
+import struct
+
+import numpy
+
+from fake_blender import Bag, Matrix
+
+SEED = 1234
+
+
+class LayerList(list):
+    """Blender layer collection (uv textures, vertex colors) with an active layer"""
+
+    def __init__(self, layers=()):
+        super().__init__(layers)
+        self.active = self[0] if self else None
+
+
+def grid_mesh(resolution, material_count=2, smooth=True, uv=True, vertex_colors=True):
+    """
+    Wavy grid of resolution x resolution quads, looks like a tessellated Blender mesh (tessfaces).
+    Materials are assigned in stripes, so every material gets its own PLY part.
+    """
+    rng = numpy.random.RandomState(SEED)
+    side = resolution + 1
+
+    u, v = numpy.meshgrid(numpy.linspace(0, 1, side), numpy.linspace(0, 1, side))
+    height = 0.1 * numpy.sin(u * 12) * numpy.cos(v * 9) + rng.uniform(0, 0.01, u.shape)
+    co = numpy.stack([u, v, height], axis=-1).reshape(-1, 3)
+
+    normal = numpy.stack([-numpy.gradient(height, axis=1), -numpy.gradient(height, axis=0),
+                          numpy.full(height.shape, 1.0 / resolution)], axis=-1).reshape(-1, 3)
+    normal /= numpy.linalg.norm(normal, axis=1)[:, None]
+
+    vertices = [Bag(co=tuple(c), normal=tuple(n)) for c, n in zip(co.tolist(), normal.tolist())]
+
+    rows, cols = numpy.meshgrid(numpy.arange(resolution), numpy.arange(resolution), indexing='ij')
+    first = (rows * side + cols).ravel()
+    quads = numpy.stack([first, first + 1, first + side + 1, first + side], axis=-1)
+
+    faces = []
+    uv_data = []
+    color_data = []
+    colors = rng.uniform(0, 1, (len(quads), 4, 3)).tolist()
+
+    for index, quad in enumerate(quads.tolist()):
+        faces.append(Bag(index=index, vertices=tuple(quad), use_smooth=smooth, normal=(0.0, 0.0, 1.0),
+                         material_index=(index // resolution) % material_count))
+        uv_data.append(Bag(uv=[tuple(co[i][:2]) for i in quad]))
+        color_data.append(Bag(color1=colors[index][0], color2=colors[index][1],
+                              color3=colors[index][2], color4=colors[index][3]))
+
+    return Bag(
+        tessfaces=faces,
+        vertices=vertices,
+        materials=[None] * material_count,
+        uv_textures=Bag(active=True if uv else None),
+        tessface_uv_textures=LayerList([Bag(data=uv_data)] if uv else []),
+        tessface_vertex_colors=LayerList([Bag(data=color_data)] if vertex_colors else []),
+    )
+
+
+def mesh_object(name, mesh, paramset_factory):
+    data = Bag(name=name, luxrender_mesh=Bag(portal=False, instancing_mode='never', get_paramset=paramset_factory))
+    return Bag(name=name, type='MESH', data=data, to_mesh=lambda scene, apply_modifiers, settings: mesh)
+
+
+def mesh_arrays(vertex_count):
+    """Flat point/normal/uv/index lists as they are passed to the native mesh ParamSet"""
+    rng = numpy.random.RandomState(SEED)
+    points = rng.uniform(-10, 10, vertex_count * 3)
+    normals = rng.normal(size=(vertex_count, 3))
+    normals /= numpy.linalg.norm(normals, axis=1)[:, None]
+    uvs = rng.uniform(0, 1, vertex_count * 2)
+    indices = rng.randint(0, vertex_count, vertex_count * 2)
+
+    return points.tolist(), normals.ravel().tolist(), uvs.tolist(), indices.tolist()
+
+
+def particle_matrices(count):
+    """Random rotation, uniform scale and translation per particle, like a scattered dupli system"""
+    rng = numpy.random.RandomState(SEED)
+
+    quats = rng.normal(size=(count, 4))
+    quats /= numpy.linalg.norm(quats, axis=1)[:, None]
+    w, x, y, z = quats.T
+
+    rotation = numpy.stack([
+        1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w),
+        2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w),
+        2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y),
+    ], axis=-1).reshape(count, 3, 3)
+
+    matrices = numpy.zeros((count, 4, 4))
+    matrices[:, :3, :3] = rotation * rng.uniform(0.5, 2.0, count)[:, None, None]
+    matrices[:, :3, 3] = rng.uniform(-50, 50, (count, 3))
+    matrices[:, 3, 3] = 1.0
+
+    return [Matrix(m) for m in matrices.tolist()]
+
+
+def write_smoke_cache(directory, name, frame, index, resolution):
+    """
+    Writes a baked smoke domain point cache (format 1.04, see read_cache() in export/volumes.py).
+    The density segment is flagged as LZO compressed but holds the raw floats, so a stand-in
+    decompressor can copy it and read_cache() takes its usual compressed code path.
+    Returns the density values.
+    """
+    rng = numpy.random.RandomState(SEED)
+    res_x, res_y, res_z = resolution
+    cell_count = res_x * res_y * res_z
+    density = rng.uniform(0, 1, cell_count).astype(numpy.float32)
+
+    def uncompressed_segment():
+        return struct.pack('<B', 0) + numpy.zeros(cell_count, dtype=numpy.float32).tobytes()
+
+    path = os.path.join(directory, '%s_%06d_%02d.bphys' % (name, frame, index))
+
+    with open(path, 'wb') as cache_file:
+        cache_file.write(b'BPHYSICS')
+        cache_file.write(struct.pack('<3I', 3, cell_count, 0))
+        cache_file.write(b'1.04')
+        cache_file.write(struct.pack('<6I', 7, 1, res_x, res_y, res_z, 1))
+        cache_file.write(uncompressed_segment())  # shadow
+        cache_file.write(struct.pack('<BI', 1, density.nbytes) + density.tobytes())
+        cache_file.write(uncompressed_segment())  # heat
+        cache_file.write(uncompressed_segment())  # heat, old
+
+    return density
+
+
+def film_buffer(width, height, depth, integer=False):
+    """Raw LuxCore film output: float channels or packed 0xRRGGBB ids"""
+    rng = numpy.random.RandomState(SEED)
+
+    if integer:
+        return rng.randint(0, 0xffffff, width * height * depth).astype(numpy.uint32)
+
+    return rng.uniform(0, 4, width * height * depth).astype(numpy.float32)
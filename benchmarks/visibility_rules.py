@@ -0,0 +1,140 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Compares the per-redraw cost of the visibility rules of a synthetic property group, evaluated
+the old way (a new Logician per check, linear search of the properties list) and with the
+compiled rules and attr lookup used by property_group_renderer. Does not need Blender.
+
+Usage: python benchmarks/visibility_rules.py [redraw count]
+"""
+
+import importlib.util
+import os
+import sys
+import time
+
+VALIDATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             '..', 'src', 'luxrender', 'extensions_framework', 'validate.py')
+
+spec = importlib.util.spec_from_file_location('ef_validate', VALIDATE_PATH)
+validate = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(validate)
+
+A, O, LO = validate.Logic_AND, validate.Logic_OR, validate.Logic_Operator
+
+PROPERTY_COUNT = 200
+
+
+class SyntheticGroup(object):
+    """Looks like a large render settings panel: every property depends on a mode enum,
+    a third of them also on a toggle and a numeric threshold."""
+
+    mode = 'path'
+    advanced = True
+    threshold = 4
+
+    controls = []
+    visibility = {}
+    properties = [{'type': 'enum', 'attr': 'mode'},
+                  {'type': 'bool', 'attr': 'advanced'},
+                  {'type': 'int', 'attr': 'threshold'}]
+
+    for i in range(PROPERTY_COUNT):
+        attr = 'prop_%d' % i
+        controls.append(attr)
+        properties.append({'type': 'float', 'attr': attr})
+
+        if i % 3 == 0:
+            visibility[attr] = {'mode': O(['path', 'bidirectional']),
+                                'advanced': True,
+                                'threshold': LO({'gte': 2, 'lt': 8})}
+        else:
+            visibility[attr] = {'mode': O(['path', A([{'advanced': True}, {'threshold': 4}])])}
+
+    del i, attr
+
+
+class CountingLogician(validate.Logician):
+    calls = 0
+
+    def test_logic(self, member, logic, operator='eq'):
+        CountingLogician.calls += 1
+        return super().test_logic(member, logic, operator)
+
+
+def draw_old(group):
+    drawn = 0
+
+    for attr in group.controls:
+        vt = CountingLogician(group)
+        if attr in group.visibility.keys():
+            visible = vt.test_logic(getattr(group, attr, None), group.visibility[attr])
+        else:
+            visible = True
+
+        if visible:
+            for prop in group.properties:
+                if prop['attr'] == attr:
+                    drawn += 1
+                    break
+
+    return drawn
+
+
+def draw_compiled(group, rules, lookup):
+    drawn = 0
+
+    for attr in group.controls:
+        if attr in group.visibility:
+            visible = rules[attr](group, getattr(group, attr, None))
+        else:
+            visible = True
+
+        if visible and lookup.get(attr) is not None:
+            drawn += 1
+
+    return drawn
+
+
+def main():
+    redraws = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    group = SyntheticGroup()
+
+    start = time.perf_counter()
+    for _ in range(redraws):
+        old_drawn = draw_old(group)
+    old_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rules = {attr: validate.compile_logic(logic) for attr, logic in group.visibility.items()}
+    lookup = {prop['attr']: prop for prop in group.properties}
+    for _ in range(redraws):
+        new_drawn = draw_compiled(group, rules, lookup)
+    new_time = time.perf_counter() - start
+
+    assert old_drawn == new_drawn
+
+    print('%d redraws of %d controls' % (redraws, len(group.controls)))
+    print('logician  %7.3fs  %10d test_logic calls' % (old_time, CountingLogician.calls))
+    print('compiled  %7.3fs  %10d rules compiled' % (new_time, len(rules)))
+
+
+if __name__ == '__main__':
+    main()
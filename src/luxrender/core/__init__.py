@@ -49,13 +49,17 @@ from .. import LuxRenderAddon
 from ..export import get_output_filename, get_worldscale
 from ..export.scene import SceneExporter
 from ..export.volumes import SmokeCache
+from ..util import EncodedFileCache
 from ..outputs import LuxManager, LuxFilmDisplay
 from ..outputs import LuxLog
 from ..outputs.pure_api import LUXRENDER_VERSION
 from ..outputs.luxcore_api import ToValidLuxCoreName
 from ..outputs.luxcore_api import PYLUXCORE_AVAILABLE, UseLuxCore, pyluxcore
 from ..export.luxcore import LuxCoreExporter
+from ..export.luxcore.textures import ImageStagingCache
 from ..export.luxcore.utils import get_elem_key
+from .render_queue import FramePipeline, RenderQueueScheduler, read_queue_file
+from .viewport import Session, ViewportFrameFetcher, ViewportResolution
 
 # Exporter Property Groups need to be imported to ensure initialisation
 from ..properties import (
@@ -459,6 +463,9 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
     render_lock = threading.Lock()
 
+    # Renderer processes of the running pipelined animation, Blender creates a new engine for every frame
+    frame_pipeline = None
+
 
 
     def render(self, scene):
@@ -491,6 +498,10 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
         if UseLuxCore():
             self.luxcore_view_draw(context)
 
+    def __del__(self):
+        # Blender frees the engine when the viewport render is stopped
+        self.free_view_texture()
+
     ############################################################################
     #
     # LuxRender classic API
@@ -519,6 +530,11 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
             is_animation = hasattr(self, 'is_animation') and self.is_animation
             make_queue = scene.luxrender_engine.export_type == 'EXT' and \
                          scene.luxrender_engine.binary_name == 'luxrender' and write_files
+            pipelined = is_animation and scene.luxrender_engine.export_type == 'EXT' and \
+                        scene.luxrender_engine.render and scene.luxrender_engine.pipeline_animation
+
+            if pipelined:
+                make_queue = True
 
             if is_animation and make_queue:
                 queue_file = efutil.export_path + '%s.%s.lxq' % (
@@ -528,6 +544,12 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                 if scene.frame_current == scene.frame_start:
                     open(queue_file, 'w').close()
 
+                    if pipelined:
+                        self.stop_frame_pipeline()
+                        RENDERENGINE_luxrender.frame_pipeline = FramePipeline(
+                            scene.luxrender_engine.pipeline_lookahead, self.get_render_thread_count(scene),
+                            log=LuxLog)
+
                 if hasattr(self, 'update_progress'):
                     fr = scene.frame_end - scene.frame_start
                     fo = scene.frame_current - scene.frame_start
@@ -535,6 +557,8 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
             exported_file = self.export_scene(scene)
             if not exported_file:
+                if pipelined:
+                    self.stop_frame_pipeline()
                 return  # Export frame failed, abort rendering
 
             if is_animation and make_queue:
@@ -543,7 +567,32 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                 with open(queue_file, 'a') as qf:
                     qf.write("%s\n" % exported_file)
 
-                if scene.frame_current == scene.frame_end:
+                if pipelined:
+                    # Hand the frame to the renderer right away, Blender then continues
+                    # exporting the next frame while this one renders
+                    pipeline = RENDERENGINE_luxrender.frame_pipeline
+
+                    if pipeline is None:
+                        raise Exception('Pipelined animation has to start at the first frame')
+
+                    slot = pipeline.wait_for_slot(self.test_break)
+
+                    if slot is None:
+                        self.stop_frame_pipeline()
+                        return
+
+                    cmd_args = self.get_process_args(scene, True, binary_name='luxconsole', threads=False)
+                    cmd_args.extend(['--threads=%i' % pipeline.thread_budget[slot], exported_file])
+
+                    LuxLog('Launching frame %i: %s' % (scene.frame_current, cmd_args))
+                    pipeline.dispatch(slot, cmd_args, self.output_dir)
+
+                    if scene.frame_current == scene.frame_end:
+                        # Only report the animation as done when the last frames have finished rendering
+                        self.update_stats('', 'LuxRender: Waiting for the last frames to render')
+                        pipeline.wait_all(self.test_break)
+                        RENDERENGINE_luxrender.frame_pipeline = None
+                elif scene.frame_current == scene.frame_end:
                     # run the queue
                     self.render_queue(scene, queue_file)
             else:
@@ -552,9 +601,19 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
         except Exception as err:
             LuxLog('%s' % err)
             self.report({'ERROR'}, '%s' % err)
+            self.stop_frame_pipeline()
+        finally:
+            # Encoded embedded files are reused by the following frames of an animation
+            if not (hasattr(self, 'is_animation') and self.is_animation) or scene.frame_current >= scene.frame_end:
+                EncodedFileCache.clear()
 
         os.chdir(prev_cwd)
 
+    def stop_frame_pipeline(self):
+        if RENDERENGINE_luxrender.frame_pipeline is not None:
+            RENDERENGINE_luxrender.frame_pipeline.terminate_all()
+            RENDERENGINE_luxrender.frame_pipeline = None
+
     def luxrender_render_preview(self, scene):
         if sys.platform == 'darwin':
             self.output_dir = efutil.filesystem_path(bpy.app.tempdir)
@@ -836,6 +895,10 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
         internal, start_rendering, parse, worldEnd = self.rendering_behaviour(scene)
 
         if start_rendering:
+            if scene.luxrender_engine.queue_processes > 1:
+                self.render_queue_processes(scene, queue_file)
+                return
+
             cmd_args = self.get_process_args(scene, start_rendering)
 
             cmd_args.extend(['-L', queue_file])
@@ -844,6 +907,33 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
             # LuxLog(' in %s' % self.outout_dir)
             luxrender_process = subprocess.Popen(cmd_args, cwd=self.output_dir)
 
+    def render_queue_processes(self, scene, queue_file):
+        """
+        Render the queued frames with several LuxConsole processes, each with its share of the render threads.
+        Blocks until all frames are done or the render is cancelled.
+        """
+        engine_settings = scene.luxrender_engine
+        base_args = self.get_process_args(scene, True, binary_name='luxconsole', threads=False)
+
+        def make_args(scene_file, threads):
+            return base_args + ['--threads=%i' % threads, scene_file]
+
+        def progress(finished, total):
+            self.update_stats('', 'LuxRender: Rendered %i of %i frames' % (finished, total))
+            self.update_progress(finished / total if total else 1.0)
+
+        scheduler = RenderQueueScheduler(read_queue_file(queue_file), make_args, engine_settings.queue_processes,
+                                         self.get_render_thread_count(scene),
+                                         max_retries=engine_settings.queue_retries,
+                                         cwd=self.output_dir, log=LuxLog)
+
+        LuxLog('Launching Queue: %i frames, %i processes, threads per process: %s' % (
+            len(scheduler.frames), len(scheduler.slots), scheduler.thread_budget))
+
+        if scheduler.run(self.test_break, progress) and scheduler.failed:
+            self.report({'ERROR'}, 'LuxRender: %i frames failed to render: %s' % (
+                len(scheduler.failed), ', '.join(frame.scene_file for frame in scheduler.failed)))
+
     def append_lux_binary_name(self, scene, luxrender_path, binary_name):
         if sys.platform == 'darwin':
             # Get binary from OSX bundle
@@ -878,12 +968,24 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
         return luxrender_path
 
-    def get_process_args(self, scene, start_rendering):
+    def get_render_thread_count(self, scene):
+        """
+        Threads that external renderers may use in total, divided between the processes of an animation
+        """
+        if scene.luxrender_engine.threads_auto:
+            return multiprocessing.cpu_count()
+
+        return scene.luxrender_engine.threads
+
+    def get_process_args(self, scene, start_rendering, binary_name=None, threads=True):
         config_updates = {
             'auto_start': start_rendering
         }
 
-        luxrender_path = self.get_lux_binary_path(scene, scene.luxrender_engine.binary_name)
+        if binary_name is None:
+            binary_name = scene.luxrender_engine.binary_name
+
+        luxrender_path = self.get_lux_binary_path(scene, binary_name)
 
         cmd_args = [luxrender_path]
 
@@ -892,18 +994,18 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
             cmd_args.append('--' + scene.luxrender_engine.log_verbosity)
 
         # Epsilon values if any
-        if scene.luxrender_engine.binary_name != 'luxvr':
+        if binary_name != 'luxvr':
             if scene.luxrender_engine.min_epsilon:
                 cmd_args.append('--minepsilon=%.8f' % scene.luxrender_engine.min_epsilon)
             if scene.luxrender_engine.max_epsilon:
                 cmd_args.append('--maxepsilon=%.8f' % scene.luxrender_engine.max_epsilon)
 
-        if scene.luxrender_engine.binary_name == 'luxrender':
+        if binary_name == 'luxrender':
             # Copy the GUI log to the console
             cmd_args.append('--logconsole')
 
-        # Set number of threads for external processes
-        if not scene.luxrender_engine.threads_auto:
+        # Set number of threads for external processes, unless the caller divides them between processes
+        if threads and not scene.luxrender_engine.threads_auto:
             cmd_args.append('--threads=%i' % scene.luxrender_engine.threads)
 
         # Set fixed seeds, if enabled
@@ -1572,11 +1674,21 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
             filmWidth, filmHeight = self.get_film_size(scene)
 
-            luxcore_exporter = LuxCoreExporter(scene, self)
-            luxcore_config = luxcore_exporter.convert(filmWidth, filmHeight)
+            incremental = self.is_animation and scene.luxcore_translatorsettings.incremental_animation
+            luxcore_exporter, luxcore_scene = LuxCoreAnimationCache.get(scene) if incremental else (None, None)
+
+            if luxcore_exporter is None:
+                luxcore_exporter = LuxCoreExporter(scene, self)
+                luxcore_exporter.is_animation_session = incremental
+                luxcore_scene = luxcore_exporter.create_luxcore_scene()
+                luxcore_config = luxcore_exporter.convert(filmWidth, filmHeight, luxcore_scene)
+            else:
+                luxcore_exporter.renderengine = self
+                luxcore_config = luxcore_exporter.convert_frame(filmWidth, filmHeight, luxcore_scene)
 
             # Maybe export was cancelled by user, don't start the rendering with an incomplete scene then
             if self.test_break() or luxcore_config is None:
+                LuxCoreAnimationCache.clear()
                 return
 
             luxcore_session = pyluxcore.RenderSession(luxcore_config)
@@ -1591,6 +1703,7 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
             # Immediately end the rendering if 'FILESAVER' engine is used
             if scene.luxcore_translatorsettings.export_type == 'luxcoreui':
                 luxcore_session.Stop()
+                self.keep_animation_frame(scene, incremental, luxcore_exporter, luxcore_scene)
 
                 if scene.luxcore_translatorsettings.run_luxcoreui:
                     luxrender_path = self.get_lux_binary_path(scene, 'luxcoreui')
@@ -1711,14 +1824,32 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                     self.import_aov_channels(scene, luxcore_session, filmWidth, filmHeight, result.layers[0].passes)
 
             self.end_result(result)
+            self.keep_animation_frame(scene, incremental, luxcore_exporter, luxcore_scene)
+
+            # Staged images are reused by the following frames of an animation
+            if not self.is_animation or scene.frame_current >= scene.frame_end:
+                ImageStagingCache.clear()
+
             LuxLog('Done.\n')
         except Exception as exc:
+            LuxCoreAnimationCache.clear()
+            ImageStagingCache.clear()
             LuxLog('Rendering aborted: %s' % exc)
             self.report({'ERROR'}, str(exc))
             import traceback
 
             traceback.print_exc()
 
+    def keep_animation_frame(self, scene, incremental, luxcore_exporter, luxcore_scene):
+        """
+        Keep the exporter and scene of a rendered animation frame so the next frame can be exported incrementally.
+        Only call this after the frame was rendered, a cancelled rendering drops the cached scene
+        """
+        if incremental and not self.test_break() and scene.frame_current < scene.frame_end:
+            LuxCoreAnimationCache.store(scene, luxcore_exporter, luxcore_scene)
+        else:
+            LuxCoreAnimationCache.clear()
+
     def create_result(self, luxcore_session, imageBufferFloat, scene, stats, filmWidth, filmHeight, is_final_result):
         """
         Updates the film and creates a RenderResult.
@@ -1933,13 +2064,15 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
             LuxLog('ERROR: LuxCore preview rendering requires pyluxcore')
             return
         from ..outputs.luxcore_api import pyluxcore
-        from ..export.luxcore.materialpreview import MaterialPreviewExporter
+        from ..export.luxcore.materialpreview import MaterialPreviewExporter, MaterialPreviewCache
 
         try:
             def update_result(luxcore_session, imageBufferFloat, filmWidth, filmHeight):
                 # Update the image
                 luxcore_session.GetFilm().GetOutputFloat(pyluxcore.FilmOutputType.RGB_TONEMAPPED, imageBufferFloat)
+                display_result(imageBufferFloat, filmWidth, filmHeight)
 
+            def display_result(imageBufferFloat, filmWidth, filmHeight):
                 # Here we write the pixel values to the RenderResult
                 result = self.begin_result(0, 0, filmWidth, filmHeight)
                 layer = result.layers[0] if bpy.app.version < (2, 74, 4) else result.layers[0].passes[0]
@@ -1965,6 +2098,8 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
             luxcore_config = exporter.convert(filmWidth, filmHeight)
 
             if luxcore_config is None:
+                if exporter.cached_pixels is not None:
+                    display_result(exporter.cached_pixels, filmWidth, filmHeight)
                 return
 
             # Create preview rendersession
@@ -2004,6 +2139,10 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
             luxcore_session.Stop()
             LuxLog('Preview render done (%.2fs)' % (time.time() - startTime))
+
+            # Only cache finished previews, not the ones that were cancelled by a new update
+            if not self.test_break():
+                MaterialPreviewCache.store(exporter.cache_key, imageBufferFloat)
         except Exception as exc:
             LuxLog('Rendering aborted: %s' % exc)
             import traceback
@@ -2020,7 +2159,11 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
     viewFilmWidth = -1
     viewFilmHeight = -1
-    viewImageBufferFloat = None
+    view_resolution = None  # ViewportResolution, the film size is reduced during interaction
+    pending_region_size = None  # New region size that is not applied to the film yet
+    pending_resize_time = 0
+    view_texture = None  # bgl.Buffer holding the id of the GL texture the viewport frames are uploaded to
+    view_texture_size = None  # (width, height, bufferdepth) of the allocated texture storage
     last_update_time = 0
     # store renderengine configuration of last update
     lastRenderSettings = ''
@@ -2032,39 +2175,138 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
     lastVisibilitySettings = None
     lastNodeMatSettings = ''
     update_counter = 0
+    pending_update_changes = None  # Scene edits that were coalesced and not sent to the session yet
+    last_flush_time = 0
+
+    @staticmethod
+    def get_view_interval(scene):
+        if scene.camera:
+            return scene.camera.data.luxrender_camera.luxcore_imagepipeline.viewport_interval / 1000
+        else:
+            return 0.05
+
+    @staticmethod
+    def get_update_interval(scene):
+        if scene.camera:
+            return scene.camera.data.luxrender_camera.luxcore_imagepipeline.viewport_update_interval / 1000
+        else:
+            return 0.1
+
+    @staticmethod
+    def get_resolution_settings(scene):
+        """
+        Returns the resolution reduction factor used during interaction and the idle time (seconds) after which
+        the viewport render returns to full resolution
+        """
+        if scene.camera:
+            settings = scene.camera.data.luxrender_camera.luxcore_imagepipeline
+            return int(settings.viewport_resolution_reduction), settings.viewport_full_resolution_delay / 1000
+        else:
+            return 1, 0
+
+    def get_view_film_size(self):
+        if self.view_resolution is None:
+            return self.viewFilmWidth, self.viewFilmHeight
+
+        return self.view_resolution.film_size(self.viewFilmWidth, self.viewFilmHeight)
+
+    def start_frame_fetcher(self, context):
+        film_width, film_height = self.get_view_film_size()
+        LuxCoreSessionManager.start_frame_fetcher(self.space, film_width, film_height,
+                                                  self.transparent_film, self.get_view_interval(context.scene))
+
+    def upload_view_texture(self, pixels, width, height, bufferdepth):
+        buffertype = bgl.GL_RGBA if bufferdepth == 4 else bgl.GL_RGB
+        glBuffer = bgl.Buffer(bgl.GL_FLOAT, [width * height * bufferdepth], pixels)
+        size = (width, height, bufferdepth)
+
+        if self.view_texture_size != size:
+            # The texture storage only has to be (re)allocated after the film size or type changed
+            self.free_view_texture()
+            self.view_texture = bgl.Buffer(bgl.GL_INT, 1)
+            bgl.glGenTextures(1, self.view_texture)
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.view_texture[0])
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MIN_FILTER, bgl.GL_LINEAR)
+            bgl.glTexParameteri(bgl.GL_TEXTURE_2D, bgl.GL_TEXTURE_MAG_FILTER, bgl.GL_LINEAR)
+            bgl.glTexImage2D(bgl.GL_TEXTURE_2D, 0, buffertype, width, height, 0, buffertype, bgl.GL_FLOAT, glBuffer)
+            self.view_texture_size = size
+        else:
+            bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.view_texture[0])
+            bgl.glTexSubImage2D(bgl.GL_TEXTURE_2D, 0, 0, 0, width, height, buffertype, bgl.GL_FLOAT, glBuffer)
+
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
 
-    def create_view_buffer(self, width, height):
-        bufferdepth = 4 if self.transparent_film else 3
-        self.viewImageBufferFloat = array.array('f', [0.0] * (width * height * bufferdepth))
+    def free_view_texture(self):
+        """
+        Delete the GL texture of the viewport, it is created again by the next upload_view_texture() call
+        """
+        if self.view_texture is not None:
+            bgl.glDeleteTextures(1, self.view_texture)
+            self.view_texture = None
+            self.view_texture_size = None
+
+    def draw_view_texture(self, width, height):
+        """
+        Draw the viewport texture stretched to width x height pixels (upscaling it if the film size is reduced)
+        """
+        if self.view_texture is None or self.view_texture_size is None:
+            return
+
+        bufferdepth = self.view_texture_size[2]
+
+        if bufferdepth == 4:
+            # Enable GL_BLEND so the alpha channel is visible
+            bgl.glEnable(bgl.GL_BLEND)
+
+        bgl.glEnable(bgl.GL_TEXTURE_2D)
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, self.view_texture[0])
+        bgl.glColor4f(1, 1, 1, 1)
+
+        bgl.glBegin(bgl.GL_QUADS)
+        bgl.glTexCoord2f(0, 0)
+        bgl.glVertex2f(0, 0)
+        bgl.glTexCoord2f(1, 0)
+        bgl.glVertex2f(width, 0)
+        bgl.glTexCoord2f(1, 1)
+        bgl.glVertex2f(width, height)
+        bgl.glTexCoord2f(0, 1)
+        bgl.glVertex2f(0, height)
+        bgl.glEnd()
+
+        # restore the defaults
+        bgl.glBindTexture(bgl.GL_TEXTURE_2D, 0)
+        bgl.glDisable(bgl.GL_TEXTURE_2D)
+        bgl.glDisable(bgl.GL_BLEND)
 
     def luxcore_view_draw(self, context):
         def draw_framebuffer():
-            # Update the screen
+            # Upload the newest frame fetched by the background thread (if there is one) and update the screen
+            session = LuxCoreSessionManager.sessions.get(self.space)
 
-            if self.transparent_film:
-                bufferdepth = 4
-                buffertype = bgl.GL_RGBA
-                # Enable GL_BLEND so the alpha channel is visible
-                bgl.glEnable(bgl.GL_BLEND)
-            else:
-                bufferdepth = 3
-                buffertype = bgl.GL_RGB
+            if session is not None and session.frame_fetcher is not None:
+                session.frame_fetcher.consume_frame(self.upload_view_texture)
 
-            buffersize = self.viewFilmWidth * self.viewFilmHeight * bufferdepth
-            glBuffer = bgl.Buffer(bgl.GL_FLOAT, [buffersize], self.viewImageBufferFloat)
-
-            bgl.glRasterPos2i(0, 0)
-            bgl.glDrawPixels(self.viewFilmWidth, self.viewFilmHeight, buffertype, bgl.GL_FLOAT, glBuffer)
-            # restore the default
-            bgl.glDisable(bgl.GL_BLEND)
+            self.draw_view_texture(context.region.width, context.region.height)
 
         view_draw_startTime = time.time()
-        elapsed = view_draw_startTime - self.last_update_time
 
-        if context.scene.camera:
-            interval = context.scene.camera.data.luxrender_camera.luxcore_imagepipeline.viewport_interval / 1000
-        else:
-            interval = 0.05
+        # Apply coalesced scene edits once the update interval has passed
+        if (self.pending_update_changes is not None and not self.critical_errors and
+                view_draw_startTime - self.last_flush_time >= self.get_update_interval(context.scene)):
+            pending_update_changes = self.pending_update_changes
+            self.pending_update_changes = None
+            self.luxcore_view_update(context, pending_update_changes)
+
+        # Return to full resolution when no edits arrived for a while
+        if (self.view_resolution is not None and not self.critical_errors and
+                self.view_resolution.check_idle(view_draw_startTime, self.get_resolution_settings(context.scene)[1],
+                                                self.viewFilmWidth, self.viewFilmHeight)):
+            update_changes = UpdateChanges()
+            update_changes.set_cause(config = True)
+            self.luxcore_view_update(context, update_changes)
+
+        elapsed = view_draw_startTime - self.last_update_time
+        interval = self.get_view_interval(context.scene)
 
         # Run at fixed fps
         if elapsed < interval:
@@ -2083,12 +2325,22 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
         stop_redraw = False
 
-        # Check if the size of the window is changed
-        if (self.viewFilmWidth != context.region.width) or (
-                self.viewFilmHeight != context.region.height):
-            update_changes = UpdateChanges()
-            update_changes.set_cause(config = True)
-            self.luxcore_view_update(context, update_changes)
+        # Check if the size of the window is changed. The session has to be restarted with the new film size, but
+        # only when the size stopped changing (e.g. while a panel is dragged). Until then, the old image is stretched.
+        region_size = (context.region.width, context.region.height)
+
+        if region_size != (self.viewFilmWidth, self.viewFilmHeight):
+            if region_size != self.pending_region_size:
+                self.pending_region_size = region_size
+                self.pending_resize_time = view_draw_startTime
+            elif view_draw_startTime - self.pending_resize_time >= self.get_update_interval(context.scene):
+                self.pending_region_size = None
+                update_changes = UpdateChanges()
+                update_changes.set_cause(config = True)
+                self.luxcore_view_update(context, update_changes)
+
+            # Make sure we get another draw call to apply the resize
+            self.tag_redraw()
 
         # check if camera settings have changed
         self.luxcore_exporter.convert_camera()
@@ -2106,8 +2358,9 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
         # Update statistics
         if LuxCoreSessionManager.is_session_active(self.space):
-            session.luxcore_session.UpdateStats()
-            stats = session.luxcore_session.GetStats()
+            with session.lock:
+                session.luxcore_session.UpdateStats()
+                stats = session.luxcore_session.GetStats()
 
             stop_redraw = self.haltConditionMet(context.scene, stats, realtime_preview = True)
 
@@ -2122,14 +2375,7 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
                 self.update_stats(status, blender_stats)
 
-        # Update the image buffer
-        if self.transparent_film:
-            output_type = pyluxcore.FilmOutputType.RGBA_TONEMAPPED
-        else:
-            output_type = pyluxcore.FilmOutputType.RGB_TONEMAPPED
-
-        session.luxcore_session.WaitNewFrame()
-        session.luxcore_session.GetFilm().GetOutputFloat(output_type, self.viewImageBufferFloat)
+        # The image buffer is updated by the frame fetcher thread of the session
         draw_framebuffer()
 
         self.last_update_time = view_draw_startTime
@@ -2280,7 +2526,7 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
             self.lastHaltSamples = newHaltSamples
 
             # Check for config changes that need a restart of the rendering
-            self.luxcore_exporter.convert_config(self.viewFilmWidth, self.viewFilmHeight)
+            self.luxcore_exporter.convert_config(*self.get_view_film_size())
             newRenderSettings = str(self.luxcore_exporter.config_exporter.properties)
 
             if self.lastRenderSettings == '':
@@ -2308,6 +2554,27 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
         return update_changes
 
+    def defer_update_changes(self, context, update_changes):
+        """
+        Merge scene edits that arrive faster than the update interval into the pending changes.
+        Returns True if the changes were deferred.
+        """
+        deferrable = ((update_changes.scene_edit_necessary or update_changes.cause_session) and not
+                      (update_changes.cause_startViewportRender or update_changes.cause_config or
+                       update_changes.cause_haltconditions))
+
+        if not deferrable or time.time() - self.last_flush_time >= self.get_update_interval(context.scene):
+            return False
+
+        if self.pending_update_changes is None:
+            self.pending_update_changes = update_changes
+        else:
+            self.pending_update_changes.merge(update_changes)
+
+        # Make sure luxcore_view_draw() is called to flush the changes
+        self.tag_redraw()
+        return True
+
     def luxcore_view_update(self, context, update_changes=None):
         # LuxCore libs
         if not PYLUXCORE_AVAILABLE:
@@ -2317,6 +2584,25 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
         if self.test_break() or context.scene.luxcore_rendering_controls.pause_viewport_render:
             return
 
+        # check which changes took place
+        if update_changes is None:
+            update_changes = self.find_update_changes(context)
+
+            # Blender calls view_update() for every little change while the user drags an object or a slider,
+            # luxcore_view_draw() applies the coalesced changes later
+            if self.defer_update_changes(context, update_changes):
+                return
+
+        if self.pending_update_changes is not None:
+            # Apply the deferred changes together with this update (they are obsolete if the render is restarted)
+            if not update_changes.cause_startViewportRender:
+                self.pending_update_changes.merge(update_changes)
+                update_changes = self.pending_update_changes
+
+            self.pending_update_changes = None
+
+        self.last_flush_time = time.time()
+
         print('\n###########################################################')
 
         # get update starttime in milliseconds
@@ -2329,10 +2615,6 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
         #                        Dynamic Updates
         ##########################################################################
 
-        # check which changes took place
-        if update_changes is None:
-            update_changes = self.find_update_changes(context)
-
         update_changes.print_updates()
 
         if update_changes.cause_unknown:
@@ -2356,6 +2638,7 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                                 break
 
                 LuxCoreSessionManager.stop_luxcore_session(self.space)
+                self.free_view_texture()
 
                 if context.scene.camera:
                     self.transparent_film = context.scene.camera.data.luxrender_camera.luxcore_imagepipeline.transparent_film
@@ -2375,7 +2658,7 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
                 self.viewFilmWidth = context.region.width
                 self.viewFilmHeight = context.region.height
-                self.create_view_buffer(self.viewFilmWidth, self.viewFilmHeight)
+                self.view_resolution = ViewportResolution()
 
                 # Export the Blender scene
                 luxcore_config = self.luxcore_exporter.convert(self.viewFilmWidth, self.viewFilmHeight)
@@ -2385,6 +2668,7 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
                 LuxCoreSessionManager.create_luxcore_session(luxcore_config, self.space)
                 LuxCoreSessionManager.start_luxcore_session(self.space)
+                self.start_frame_fetcher(context)
 
                 self.critical_errors = False
             except Exception as exc:
@@ -2399,6 +2683,13 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                 traceback.print_exc()
 
         else:
+            # Continued edits (including view navigation) switch to the reduced interactive resolution
+            reduction, idle_time = self.get_resolution_settings(context.scene)
+            if (update_changes.scene_edit_necessary and self.view_resolution is not None and
+                    self.view_resolution.activity(time.time(), reduction, idle_time,
+                                                  self.viewFilmWidth, self.viewFilmHeight)):
+                update_changes.set_cause(config = True)
+
             # config update
             if update_changes.cause_config:
                 LuxLog('Configuration update')
@@ -2411,12 +2702,13 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                 self.viewFilmWidth = context.region.width
                 self.viewFilmHeight = context.region.height
 
-                self.create_view_buffer(self.viewFilmWidth, self.viewFilmHeight)
-
                 luxcore_config = LuxCoreSessionManager.get_session(self.space).luxcore_session.GetRenderConfig()
                 LuxCoreSessionManager.stop_luxcore_session(self.space)
+                self.free_view_texture()
 
-                self.luxcore_exporter.convert_config(self.viewFilmWidth, self.viewFilmHeight)
+                self.luxcore_exporter.convert_config(*self.get_view_film_size())
+                # Prevent that the next update check detects the new film size as config change again
+                self.lastRenderSettings = str(self.luxcore_exporter.config_exporter.properties)
 
                 # change config
                 luxcore_config.Parse(self.luxcore_exporter.config_properties)
@@ -2424,8 +2716,17 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                     LuxLog('ERROR: not a valid luxcore config')
                     return
 
+                # The converted scene is reused, only the camera depends on the viewport size.
+                # Update it before the new session starts instead of in a separate scene edit.
+                # Other pending scene changes stay queued for the scene edit below.
+                self.luxcore_exporter.convert_camera()
+                camera_props = self.luxcore_exporter.pop_updated_camera_properties()
+                luxcore_config.GetScene().Parse(camera_props)
+                self.lastCameraSettings = str(camera_props)
+
                 LuxCoreSessionManager.create_luxcore_session(luxcore_config, self.space)
                 LuxCoreSessionManager.start_luxcore_session(self.space)
+                self.start_frame_fetcher(context)
 
             if update_changes.scene_edit_necessary:
                 # begin sceneEdit
@@ -2450,7 +2751,9 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                     for ob in update_changes.changed_objects_transform:
                         LuxLog('Transformation update: ' + ob.name)
 
-                        self.luxcore_exporter.convert_object(ob, luxcore_scene, update_mesh=False, update_material=False)
+                        if not self.luxcore_exporter.update_object_transform(ob):
+                            self.luxcore_exporter.convert_object(ob, luxcore_scene, update_mesh=False,
+                                                                 update_material=False)
 
                 if update_changes.cause_objectsRemoved:
                     for ob in update_changes.removed_objects:
@@ -2493,6 +2796,7 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
 
                 # parse scene changes and end sceneEdit
                 luxcore_scene.Parse(updated_properties)
+                ImageStagingCache.scene_parsed()
 
                 LuxCoreSessionManager.end_scene_edit(self.space)
 
@@ -2501,7 +2805,9 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
                 props = self.luxcore_exporter.convert_imagepipeline()
                 props.Set(self.luxcore_exporter.convert_lightgroup_scales())
 
-                LuxCoreSessionManager.get_session(self.space).luxcore_session.Parse(props)
+                session = LuxCoreSessionManager.get_session(self.space)
+                with session.lock:
+                    session.luxcore_session.Parse(props)
 
             # Resume in case the session was paused
             LuxCoreSessionManager.resume(self.space)
@@ -2513,19 +2819,39 @@ class RENDERENGINE_luxrender(bpy.types.RenderEngine):
         self.last_update_time = time.time()
 
 
-class Session(object):
+class LuxCoreAnimationCache(object):
     """
-    Wrapper for LuxCore's rendersession class.
+    Keeps the exporter and the LuxCore scene of an animation render alive between frames,
+    so that every frame after the first one only converts what changed (see LuxCoreExporter.convert_frame()).
     """
-    def __init__(self, luxcore_session):
-        self.luxcore_session = luxcore_session
-        self.is_active = False
 
-    def is_in_scene_edit(self):
-        return self.luxcore_session.IsInSceneEdit()
+    scene_name = None
+    frame = None
+    exporter = None
+    luxcore_scene = None
+
+    @classmethod
+    def get(cls, scene):
+        # Only continue a cached animation with the directly following frames of the same scene
+        if cls.exporter is None or cls.scene_name != scene.name or scene.frame_current <= cls.frame:
+            cls.clear()
+            return None, None
+
+        return cls.exporter, cls.luxcore_scene
+
+    @classmethod
+    def store(cls, scene, exporter, luxcore_scene):
+        cls.scene_name = scene.name
+        cls.frame = scene.frame_current
+        cls.exporter = exporter
+        cls.luxcore_scene = luxcore_scene
 
-    def is_paused(self):
-        return self.luxcore_session.IsInPause()
+    @classmethod
+    def clear(cls):
+        cls.scene_name = None
+        cls.frame = None
+        cls.exporter = None
+        cls.luxcore_scene = None
 
 
 class LuxCoreSessionManager(object):
@@ -2559,6 +2885,26 @@ class LuxCoreSessionManager(object):
                 session.luxcore_session.Start()
                 session.is_active = True
 
+    @classmethod
+    def start_frame_fetcher(cls, space, width, height, transparent_film, interval):
+        if space in cls.sessions:
+            session = cls.sessions[space]
+            cls.stop_frame_fetcher(session)
+
+            if transparent_film:
+                bufferdepth, output_type = 4, pyluxcore.FilmOutputType.RGBA_TONEMAPPED
+            else:
+                bufferdepth, output_type = 3, pyluxcore.FilmOutputType.RGB_TONEMAPPED
+
+            session.frame_fetcher = ViewportFrameFetcher(session, width, height, bufferdepth, output_type, interval)
+            session.frame_fetcher.start()
+
+    @staticmethod
+    def stop_frame_fetcher(session):
+        if session.frame_fetcher is not None:
+            session.frame_fetcher.stop()
+            session.frame_fetcher = None
+
     @classmethod
     def stop_luxcore_session(cls, space):
         if space in cls.sessions:
@@ -2566,6 +2912,7 @@ class LuxCoreSessionManager(object):
 
             if session.is_active:
                 print('Stopping viewport render')
+                cls.stop_frame_fetcher(session)
                 cls.end_scene_edit(space)
                 session.is_active = False
 
@@ -2597,6 +2944,8 @@ class LuxCoreSessionManager(object):
 
         for space, session in orphans:
             print('Stopping orphaned rendersession')
+            cls.stop_frame_fetcher(session)
+
             if session.is_in_scene_edit():
                 session.luxcore_session.EndSceneEdit()
 
@@ -2610,36 +2959,40 @@ class LuxCoreSessionManager(object):
         if space in cls.sessions:
             session = cls.sessions[space]
 
-            if session.is_active and not session.is_in_scene_edit():
-                print('Beginning scene edit')
-                session.luxcore_session.BeginSceneEdit()
+            with session.lock:
+                if session.is_active and not session.is_in_scene_edit():
+                    print('Beginning scene edit')
+                    session.luxcore_session.BeginSceneEdit()
 
     @classmethod
     def end_scene_edit(cls, space):
         if space in cls.sessions:
             session = cls.sessions[space]
 
-            if session.is_active and session.is_in_scene_edit():
-                print('Ending scene edit')
-                session.luxcore_session.EndSceneEdit()
+            with session.lock:
+                if session.is_active and session.is_in_scene_edit():
+                    print('Ending scene edit')
+                    session.luxcore_session.EndSceneEdit()
 
     @classmethod
     def pause(cls, space):
         if space in cls.sessions:
             session = cls.sessions[space]
 
-            if session.is_active and not session.is_paused():
-                print('Pausing viewport render')
-                session.luxcore_session.Pause()
+            with session.lock:
+                if session.is_active and not session.is_paused():
+                    print('Pausing viewport render')
+                    session.luxcore_session.Pause()
 
     @classmethod
     def resume(cls, space):
         if space in cls.sessions:
             session = cls.sessions[space]
 
-            if session.is_active and session.is_paused():
-                print('Resuming viewport render')
-                session.luxcore_session.Resume()
+            with session.lock:
+                if session.is_active and session.is_paused():
+                    print('Resuming viewport render')
+                    session.luxcore_session.Resume()
 
 
 @persistent
@@ -2652,6 +3005,10 @@ def stop_viewport_render(context):
         if space is not None and space.viewport_shade != 'RENDERED':
             LuxCoreSessionManager.stop_luxcore_session(space)
 
+    # The last viewport render was stopped, staged images are not needed anymore
+    if spaces and not LuxCoreSessionManager.sessions:
+        ImageStagingCache.clear()
+
 bpy.app.handlers.scene_update_post.append(stop_viewport_render)
 
 
@@ -2726,6 +3083,28 @@ class UpdateChanges(object):
         if haltconditions is not None:
             self.cause_haltconditions = haltconditions
 
+    def merge(self, newer):
+        """
+        Add the changes of a newer UpdateChanges instance. Elements are converted from their current state when
+        the merged changes are applied, so only the latest change of each element takes effect.
+        """
+        # An object that was removed and added again (or the other way round) only keeps its latest state
+        self.removed_objects -= newer.changed_objects_mesh | newer.changed_objects_transform
+        self.changed_objects_mesh -= newer.removed_objects
+        self.changed_objects_transform -= newer.removed_objects
+
+        self.changed_objects_transform |= newer.changed_objects_transform
+        self.changed_objects_mesh |= newer.changed_objects_mesh
+        self.changed_materials |= newer.changed_materials
+        self.removed_objects |= newer.removed_objects
+
+        for attr, value in vars(newer).items():
+            if attr.startswith('cause_') and attr != 'cause_unknown':
+                setattr(self, attr, getattr(self, attr) or value)
+
+        self.cause_unknown = self.cause_unknown and newer.cause_unknown
+        self.scene_edit_necessary |= newer.scene_edit_necessary
+
     def print_updates(self):
         print('===== Realtime update information: =====')
 
@@ -0,0 +1,255 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# --------------------------------------------------------------------------
+# Blender 2.5 LuxRender Add-On
+# --------------------------------------------------------------------------
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Renders the frames of an animation with several renderer processes at once, either from a queue file (.lxq) or
+frame by frame as they are exported (pipelined animation). Every process slot gets a share of the CPU threads,
+frames are handed out as slots free up and failed queue frames are retried.
+
+Does not depend on Blender, the command line of a frame comes from a callback, so any program can act as the
+renderer (see benchmarks/render_queue.py).
+"""
+
+import subprocess
+import time
+
+
+def read_queue_file(queue_file):
+    """
+    Returns the scene files listed in a LuxRender queue file, one per line
+    """
+    with open(queue_file, 'r') as qf:
+        return [line.strip() for line in qf if line.strip()]
+
+
+def split_threads(total_threads, process_count):
+    """
+    Divide total_threads between process_count slots, the first slots get the remainder.
+    Every slot gets at least one thread.
+    """
+    process_count = max(1, process_count)
+    share, remainder = divmod(max(total_threads, process_count), process_count)
+    return [share + 1 if slot < remainder else share for slot in range(process_count)]
+
+
+class QueueFrame(object):
+    def __init__(self, index, scene_file):
+        self.index = index
+        self.scene_file = scene_file
+        self.attempts = 0
+        self.returncode = None
+
+
+class RenderQueueScheduler(object):
+    """
+    Usage:
+
+        scheduler = RenderQueueScheduler(scene_files, make_args, process_count=4, total_threads=16)
+        if not scheduler.run(test_break):
+            ...  # cancelled, the running processes have been terminated
+
+    make_args(scene_file, threads) returns the command line that renders one scene file with the given number of
+    threads. A frame whose process exits with a non-zero code is queued again, at most max_retries times.
+    """
+
+    def __init__(self, scene_files, make_args, process_count, total_threads, max_retries=1, cwd=None, log=None):
+        self.make_args = make_args
+        self.max_retries = max_retries
+        self.cwd = cwd
+        self.log = log if log is not None else print
+
+        self.frames = [QueueFrame(index, scene_file) for index, scene_file in enumerate(scene_files)]
+        self.pending = list(self.frames)
+        self.thread_budget = split_threads(total_threads, min(process_count, max(1, len(self.frames))))
+        self.slots = [None] * len(self.thread_budget)  # (frame, process) per slot
+        self.finished = []
+        self.failed = []
+
+    def running(self):
+        return [slot for slot in self.slots if slot is not None]
+
+    def done(self):
+        return not self.pending and not self.running()
+
+    def start(self, slot, frame):
+        frame.attempts += 1
+        cmd_args = self.make_args(frame.scene_file, self.thread_budget[slot])
+        self.log('Queue slot %i, frame %i (attempt %i): %s' % (slot, frame.index, frame.attempts, cmd_args))
+
+        try:
+            process = subprocess.Popen(cmd_args, cwd=self.cwd)
+        except OSError as err:
+            self.log('Could not start renderer for %s: %s' % (frame.scene_file, err))
+            frame.returncode = -1
+            self.retry_or_fail(frame)
+            return
+
+        self.slots[slot] = (frame, process)
+
+    def retry_or_fail(self, frame):
+        if frame.attempts <= self.max_retries:
+            self.log('Frame %i failed (exit code %s), retrying' % (frame.index, frame.returncode))
+            self.pending.append(frame)
+        else:
+            self.log('Frame %i failed (exit code %s), giving up' % (frame.index, frame.returncode))
+            self.failed.append(frame)
+
+    def poll(self):
+        """
+        Collect finished processes and fill the free slots with pending frames.
+        Returns True while there is work left.
+        """
+        for slot, entry in enumerate(self.slots):
+            if entry is not None:
+                frame, process = entry
+                returncode = process.poll()
+
+                if returncode is None:
+                    continue
+
+                frame.returncode = returncode
+                self.slots[slot] = None
+
+                if returncode == 0:
+                    self.finished.append(frame)
+                else:
+                    self.retry_or_fail(frame)
+
+            if self.slots[slot] is None and self.pending:
+                self.start(slot, self.pending.pop(0))
+
+        return not self.done()
+
+    def stop(self):
+        """
+        Terminate all running processes, the pending frames are dropped
+        """
+        for frame, process in self.running():
+            process.terminate()
+
+        for frame, process in self.running():
+            process.wait()
+
+        self.slots = [None] * len(self.slots)
+        self.pending = []
+
+    def run(self, test_break=None, progress=None, poll_interval=0.5):
+        """
+        Render all frames. test_break() is checked between polls, progress(finished, total) is called whenever
+        a frame completes. Returns False if cancelled.
+        """
+        completed = -1
+
+        while self.poll():
+            if test_break is not None and test_break():
+                self.log('Render queue cancelled, stopping %i renderer processes' % len(self.running()))
+                self.stop()
+                return False
+
+            if progress is not None and completed != len(self.finished):
+                completed = len(self.finished)
+                progress(completed, len(self.frames))
+
+            time.sleep(poll_interval)
+
+        if progress is not None:
+            progress(len(self.finished), len(self.frames))
+
+        return True
+
+
+class FramePipeline(object):
+    """
+    Renderer processes of one pipelined animation render. Each exported frame is handed to its own process right
+    away, so Blender can export the next frame while the previous ones render. At most lookahead frames render at
+    the same time, each slot gets its share of the render threads.
+
+        pipeline = FramePipeline(lookahead, total_threads)
+        for every frame:
+            slot = pipeline.wait_for_slot(test_break)
+            pipeline.dispatch(slot, make_args(scene_file, pipeline.thread_budget[slot]), cwd)
+        pipeline.wait_all(test_break)
+    """
+
+    def __init__(self, lookahead, total_threads, log=None):
+        self.log = log if log is not None else print
+        self.thread_budget = split_threads(total_threads, lookahead)
+        self.slots = [None] * len(self.thread_budget)
+        self.failed = []
+
+    def running(self):
+        for slot, process in enumerate(self.slots):
+            if process is not None:
+                returncode = process.poll()
+
+                if returncode is not None:
+                    if returncode != 0:
+                        self.log('Renderer process %s exited with code %i' % (process.args, returncode))
+                        self.failed.append(process)
+
+                    self.slots[slot] = None
+
+        return [process for process in self.slots if process is not None]
+
+    def wait_for_slot(self, test_break, poll_interval=0.1):
+        """
+        Block until a slot is free and return its index.
+        Returns None if the wait was cancelled by test_break(), the running processes are terminated then.
+        """
+        while len(self.running()) >= len(self.slots):
+            if test_break():
+                self.terminate_all()
+                return None
+            time.sleep(poll_interval)
+
+        return self.slots.index(None)
+
+    def dispatch(self, slot, cmd_args, cwd=None):
+        self.slots[slot] = subprocess.Popen(cmd_args, cwd=cwd)
+
+    def wait_all(self, test_break, poll_interval=0.1):
+        """
+        Block until all frames are rendered. Returns False if cancelled by test_break(), the running
+        processes are terminated then.
+        """
+        while self.running():
+            if test_break():
+                self.terminate_all()
+                return False
+            time.sleep(poll_interval)
+
+        return True
+
+    def terminate_all(self):
+        running = self.running()
+
+        if running:
+            self.log('Stopping %i renderer processes' % len(running))
+
+        for process in running:
+            process.terminate()
+
+        for process in running:
+            process.wait()
+
+        self.slots = [None] * len(self.slots)
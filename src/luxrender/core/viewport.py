@@ -0,0 +1,180 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# --------------------------------------------------------------------------
+# Blender 2.5 LuxRender Add-On
+# --------------------------------------------------------------------------
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Viewport render session state that does not depend on Blender or pyluxcore, the LuxCore session is only used
+through the methods of pyluxcore.RenderSession.
+"""
+
+import array
+import threading
+
+
+class Session(object):
+    """
+    Wrapper for LuxCore's rendersession class.
+    """
+    def __init__(self, luxcore_session):
+        self.luxcore_session = luxcore_session
+        self.is_active = False
+        # Serializes the access to luxcore_session between Blender and the frame fetcher thread
+        self.lock = threading.RLock()
+        self.frame_fetcher = None
+
+    def is_in_scene_edit(self):
+        return self.luxcore_session.IsInSceneEdit()
+
+    def is_paused(self):
+        return self.luxcore_session.IsInPause()
+
+
+class ViewportFrameFetcher(threading.Thread):
+    """
+    Pulls new frames of a viewport render session in the background, so that luxcore_view_draw() does not have to
+    wait for the session on the UI thread. The frames are written into two buffers alternately, the draw callback
+    only uploads the most recent completed buffer to the viewport texture (see consume_frame()).
+
+    The session lock is only held for the state checks and the film read. WaitNewFrame() blocks for up to a frame
+    time and runs without it, so scene edits, pause/resume and statistics on the UI thread don't wait for a frame.
+    """
+    def __init__(self, session, width, height, bufferdepth, output_type, interval):
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self.session = session
+        self.width = width
+        self.height = height
+        self.bufferdepth = bufferdepth
+        self.output_type = output_type
+        self.interval = interval
+
+        buffersize = width * height * self.bufferdepth
+        self.buffers = [array.array('f', [0.0]) * buffersize for i in range(2)]
+        self.front = 0  # Index of the buffer with the latest completed frame
+        self.new_frame = False
+        self.buffer_lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def rendering_session(self):
+        """
+        Returns the LuxCore session if it is rendering, None while it is stopped, paused or in scene edit.
+        Has to be called with the session lock held.
+        """
+        luxcore_session = self.session.luxcore_session
+
+        if (not self.session.is_active or luxcore_session is None or luxcore_session.IsInSceneEdit()
+                or luxcore_session.IsInPause()):
+            return None
+
+        return luxcore_session
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            with self.session.lock:
+                luxcore_session = self.rendering_session()
+
+            if luxcore_session is None:
+                continue
+
+            luxcore_session.WaitNewFrame()
+
+            if self.stop_event.is_set():
+                break
+
+            # Only this thread changes self.front, the back buffer is never read by the draw callback
+            back = 1 - self.front
+
+            with self.session.lock:
+                # The session may have been paused or edited while waiting for the frame
+                if self.rendering_session() is not luxcore_session:
+                    continue
+
+                luxcore_session.GetFilm().GetOutputFloat(self.output_type, self.buffers[back])
+
+            with self.buffer_lock:
+                self.front = back
+                self.new_frame = True
+
+    def consume_frame(self, upload_func):
+        """
+        Call upload_func(pixels, width, height, bufferdepth) with the latest frame if it was not consumed yet.
+        Returns True if there was a new frame.
+        """
+        with self.buffer_lock:
+            if not self.new_frame:
+                return False
+
+            upload_func(self.buffers[self.front], self.width, self.height, self.bufferdepth)
+            self.new_frame = False
+            return True
+
+    def stop(self):
+        """
+        Stop the thread, waits at most until a running WaitNewFrame() returns
+        """
+        self.stop_event.set()
+        self.join()
+
+
+class ViewportResolution(object):
+    """
+    Keeps track of the film resolution of a viewport render. While edits keep arriving, the film is rendered with
+    1/reduction of the region size (and upscaled when drawn), so the first samples arrive faster. After idle_time
+    seconds without edits it returns to full resolution.
+
+    A change of the film size means a restart of the render session, so a single edit keeps the full resolution:
+    only an edit that follows the previous one within idle_time (dragging, scrubbing a slider) switches to the
+    reduced size, and only if the film size actually changes.
+    """
+    def __init__(self):
+        self.scale = 1
+        self.last_activity = None
+
+    def activity(self, now, reduction, idle_time, width, height):
+        """
+        Register an edit. Returns True if the film size changed.
+        """
+        interactive = self.last_activity is not None and now - self.last_activity < idle_time
+        self.last_activity = now
+
+        if not interactive:
+            return False
+
+        return self.set_scale(reduction, width, height)
+
+    def check_idle(self, now, idle_time, width, height):
+        """
+        Returns True if the film size changed back to full resolution.
+        """
+        if self.scale != 1 and now - self.last_activity >= idle_time:
+            return self.set_scale(1, width, height)
+
+        return False
+
+    def set_scale(self, scale, width, height):
+        old_size = self.film_size(width, height)
+        self.scale = scale
+        return self.film_size(width, height) != old_size
+
+    def film_size(self, width, height):
+        return max(1, width // self.scale), max(1, height // self.scale)
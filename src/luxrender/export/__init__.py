@@ -24,14 +24,19 @@
 #
 # ***** END GPL LICENCE BLOCK *****
 #
-import collections, math, os, sys
+import array, collections, concurrent.futures, hashlib, math, os, sys
 
 import bpy, mathutils
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from ..extensions_framework import util as efutil
 
 from ..outputs import LuxManager, LuxLog
-from ..util import bencode_file2string_with_size
+from ..util import bencode_file2lines_with_size
 
 
 class ExportProgressThread(efutil.TimerThread):
@@ -83,6 +88,196 @@ class ExportCache(object):
             raise Exception('Item %s not found in %s!' % (ck, self.name))
 
 
+class ExportWriterPool(object):
+    """
+    Runs file writing jobs on worker threads, so that packing and writing the data of one mesh overlaps
+    with the export of the next objects and scenes. Jobs must not access the Blender API, only the main
+    thread may do that. With one worker, jobs run right away on the calling thread.
+    The threads are started by the first job, exports that write no files (e.g. material previews) never
+    start them.
+    """
+
+    def __init__(self, workers=1):
+        self.workers = workers
+        self.executor = None
+        self.pending = []
+
+    def submit(self, job, *args):
+        if self.workers <= 1:
+            job(*args)
+            return
+
+        if self.executor is None:
+            self.executor = concurrent.futures.ThreadPoolExecutor(self.workers)
+
+        self.pending.append(self.executor.submit(job, *args))
+
+    def wait(self):
+        """
+        Wait until all submitted jobs are done, re-raises the first error of a job
+        """
+        pending, self.pending = self.pending, []
+
+        for future in pending:
+            future.result()
+
+    def shutdown(self):
+        try:
+            self.wait()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+
+
+class GeometryIndex(object):
+    """
+    Maps mesh datablocks to a fingerprint of their geometry (vertex, face, UV and vertex colour buffers),
+    so that bit-identical meshes from different datablocks, e.g. appended or linked copies of the same
+    asset, can share one shape definition.
+    """
+
+    # Modifiers that do not change the render mesh
+    NON_DEFORMING_MODIFIERS = ('COLLISION', 'PARTICLE_INSTANCE', 'PARTICLE_SYSTEM', 'SMOKE')
+
+    def __init__(self):
+        self.fingerprints = {}
+        self.datablocks = collections.Counter()
+
+    @staticmethod
+    def can_share(obj, is_viewport_render=False):
+        """
+        Only objects whose render mesh is the unmodified mesh datablock can share geometry,
+        otherwise the fingerprint of the datablock does not describe the exported mesh
+        """
+        if obj.type != 'MESH' or obj.data is None or obj.data.shape_keys is not None:
+            return False
+
+        if obj.data.luxrender_mesh.portal:
+            return False
+
+        for modifier in obj.modifiers:
+            if modifier.type not in GeometryIndex.NON_DEFORMING_MODIFIERS:
+                if (is_viewport_render and modifier.show_viewport) or (not is_viewport_render and modifier.show_render):
+                    return False
+
+        return True
+
+    @staticmethod
+    def __buffer(collection, attr, typecode, size=1):
+        buf = array.array(typecode, [0]) * (len(collection) * size)
+        collection.foreach_get(attr, buf)
+        return buf.tobytes()
+
+    @staticmethod
+    def __values(collection, attr):
+        # Short and boolean attributes can't be read into an int array directly
+        values = [0] * len(collection)
+        collection.foreach_get(attr, values)
+        return array.array('i', values).tobytes()
+
+    def compute(self, mesh):
+        h = hashlib.sha1()
+
+        h.update(self.__buffer(mesh.vertices, 'co', 'f', 3))
+        h.update(self.__buffer(mesh.loops, 'vertex_index', 'i'))
+        h.update(self.__buffer(mesh.polygons, 'loop_total', 'i'))
+        h.update(self.__values(mesh.polygons, 'material_index'))
+        h.update(self.__values(mesh.polygons, 'use_smooth'))
+
+        if mesh.uv_layers.active is not None:
+            h.update(b'uv')
+            h.update(self.__buffer(mesh.uv_layers.active.data, 'uv', 'f', 2))
+
+        if mesh.vertex_colors.active is not None:
+            h.update(b'vcol')
+            h.update(self.__buffer(mesh.vertex_colors.active.data, 'color', 'f', 3))
+
+        # Settings from the LuxRender mesh panel end up in the shape definition, too
+        h.update(('%r %f' % (mesh.use_auto_smooth, mesh.auto_smooth_angle)).encode())
+        h.update(''.join([p.to_string() for p in mesh.luxrender_mesh.get_paramset()]).encode())
+
+        return h.hexdigest()
+
+    def add(self, mesh):
+        if mesh not in self.fingerprints:
+            fingerprint = self.compute(mesh)
+            self.fingerprints[mesh] = fingerprint
+            self.datablocks[fingerprint] += 1
+
+        return self.fingerprints[mesh]
+
+    def add_objects(self, objects, is_viewport_render=False):
+        for obj in objects:
+            if self.can_share(obj, is_viewport_render):
+                self.add(obj.data)
+
+    def get(self, mesh):
+        return self.add(mesh)
+
+    def is_shared(self, obj, is_viewport_render=False):
+        """
+        True if the geometry of obj is also used by another mesh datablock
+        """
+        return self.can_share(obj, is_viewport_render) and self.datablocks[self.get(obj.data)] > 1
+
+
+class ImageColorSampler(object):
+    """
+    Nearest neighbour colour lookups in Blender images, used for hair root colours from the emitter's UV texture.
+    Every access to Image.pixels copies the whole image, so the pixels of each image are read only once and
+    shared by all particle systems that use the same image during an export.
+    """
+
+    def __init__(self):
+        self.pixels = {}
+
+    def get_pixels(self, image):
+        key = (image.name, image.library.filepath if image.library else '')
+
+        if key not in self.pixels:
+            if numpy is None:
+                self.pixels[key] = array.array('f', image.pixels[:])
+            elif hasattr(image.pixels, 'foreach_get'):
+                pixels = numpy.empty(len(image.pixels), dtype=numpy.float32)
+                image.pixels.foreach_get(pixels)
+                self.pixels[key] = pixels
+            else:
+                self.pixels[key] = numpy.array(image.pixels[:], dtype=numpy.float32)
+
+        return self.pixels[key]
+
+    def has_pixels(self, image):
+        return len(self.get_pixels(image)) > 0
+
+    def sample(self, image, uv_coords):
+        """
+        Returns a list of (r, g, b) tuples, one for each (u, v) coordinate in uv_coords
+        """
+        if not uv_coords:
+            return []
+
+        width, height = image.size
+        pixels = self.get_pixels(image)
+
+        if numpy is not None:
+            uv = numpy.array(uv_coords, dtype=numpy.float64).reshape(-1, 2)
+            x = numpy.clip(numpy.rint(uv[:, 0] * (width - 1)), 0, width - 1).astype(numpy.int64)
+            y = numpy.clip(numpy.rint(uv[:, 1] * (height - 1)), 0, height - 1).astype(numpy.int64)
+            index = (y * width + x) * 4
+            colors = numpy.column_stack((pixels[index], pixels[index + 1], pixels[index + 2]))
+            return [tuple(color) for color in colors.tolist()]
+
+        colors = []
+        for u, v in uv_coords:
+            x = min(max(round(u * (width - 1)), 0), width - 1)
+            y = min(max(round(v * (height - 1)), 0), height - 1)
+            index = (width * y + x) * 4
+            colors.append((pixels[index], pixels[index + 1], pixels[index + 2]))
+
+        return colors
+
+
 class ParamSetItem(list):
     WRAP_WIDTH = 100
 
@@ -389,9 +584,10 @@ def process_filepath_data(scene, obj, file_path, paramset, parameter_name):
 
     if scene.luxrender_engine.allow_file_embed():
         paramset.add_string(parameter_name, file_basename)
-        encoded_data, encoded_size = bencode_file2string_with_size(file_relative)
+        encoded_lines, encoded_size = bencode_file2lines_with_size(file_relative,
+                                                                   scene.luxrender_engine.embed_compression)
         paramset.increase_size('%s_data' % parameter_name, encoded_size)
-        paramset.add_string('%s_data' % parameter_name, encoded_data.splitlines())
+        paramset.add_string('%s_data' % parameter_name, encoded_lines)
     else:
         paramset.add_string(parameter_name, file_relative)
 
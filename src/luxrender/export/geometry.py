@@ -33,12 +33,14 @@ from ..extensions_framework import util as efutil
 
 from ..outputs import LuxLog
 from ..outputs.file_api import Files
-from ..export import ParamSet, ExportProgressThread, ExportCache, object_anim_matrices
+from ..export import ParamSet, ExportProgressThread, ExportCache, ExportWriterPool, GeometryIndex, ImageColorSampler
+from ..export import object_anim_matrices
 from ..export import matrix_to_list
 from ..export import fix_matrix_order
 from ..export.materials import get_material_volume_defs
 from ..export import LuxManager
 from ..export import is_obj_visible
+from ..export.profiling import ExportProfiler
 from ..properties import find_node
 from ..properties.node_material import luxrender_texture_maker
 
@@ -59,6 +61,108 @@ class DupliExportProgressThread(ExportProgressThread):
     message = '...  %i%% ...'
 
 
+def write_binary_ply(ply_path, vertices, faces, has_uv, has_vertex_colors):
+    """
+    ply_path			string
+    vertices			list of (co, no[, uv][, vc]) tuples
+    faces				list of lists of vertex indices
+    has_uv				bool
+    has_vertex_colors	bool
+
+    Write a mesh collected by buildBinaryPLYMesh() to a binary PLY file.
+    Does not access Blender data, so it can run on an ExportWriterPool thread.
+
+    Returns None
+    """
+
+    vertex_format = '<3f3f'
+
+    if has_uv:
+        vertex_format += '2f'
+    if has_vertex_colors:
+        vertex_format += '3B'
+
+    pack_vertex = struct.Struct(vertex_format).pack
+
+    with open(ply_path, 'wb') as ply:
+        ply.write(b'ply\n')
+        ply.write(b'format binary_little_endian 1.0\n')
+        ply.write(b'comment Created by LuxBlend 2.6 exporter for LuxRender - www.luxrender.net\n')
+
+        ply.write(('element vertex %d\n' % len(vertices)).encode())
+        ply.write(b'property float x\n')
+        ply.write(b'property float y\n')
+        ply.write(b'property float z\n')
+
+        ply.write(b'property float nx\n')
+        ply.write(b'property float ny\n')
+        ply.write(b'property float nz\n')
+
+        if has_uv:
+            ply.write(b'property float s\n')
+            ply.write(b'property float t\n')
+
+        if has_vertex_colors:
+            ply.write(b'property uchar red\n')
+            ply.write(b'property uchar green\n')
+            ply.write(b'property uchar blue\n')
+
+        ply.write(('element face %d\n' % len(faces)).encode())
+        ply.write(b'property list uchar uint vertex_indices\n')
+
+        ply.write(b'end_header\n')
+
+        # dump cached co/no/uv/vc
+        if has_uv and has_vertex_colors:
+            ply.write(b''.join([pack_vertex(*co, *no, *uv, *vc) for co, no, uv, vc in vertices]))
+        elif has_uv:
+            ply.write(b''.join([pack_vertex(*co, *no, *uv) for co, no, uv in vertices]))
+        elif has_vertex_colors:
+            ply.write(b''.join([pack_vertex(*co, *no, *vc) for co, no, vc in vertices]))
+        else:
+            ply.write(b''.join([pack_vertex(*co, *no) for co, no in vertices]))
+
+        # dump face vert indices
+        ply.write(b''.join([struct.pack('<B%dI' % len(indices), len(indices), *indices) for indices in faces]))
+
+    LuxLog('Binary PLY file written: %s' % ply_path)
+
+
+def get_material_emission(ob_mat):
+    """
+    Returns (object_is_emitter, light_node): whether the material emits light, either through a node connected
+    to the Emission input of its output node or, without node tree, the classic emission settings
+    """
+    output_node = find_node(ob_mat, 'luxrender_material_output_node')
+
+    if output_node is None:
+        return ob_mat.luxrender_emission.use_emission, None
+
+    light_socket = output_node.inputs['Emission']
+
+    if light_socket.is_linked:
+        return True, light_socket.links[0].from_node
+
+    return False, None
+
+
+def material_emits_light(scene, ob_mat):
+    """
+    Returns False if the emission of an emitting material does not light the scene: its light group is disabled
+    or, with the classic emission settings, colour or gain are zero
+    """
+    emission = ob_mat.luxrender_emission
+
+    if not scene.luxrender_lightgroups.is_enabled(emission.lightgroup):
+        return False
+
+    if ob_mat.luxrender_material.nodetree:
+        # The strength of the light node is not known here
+        return True
+
+    return emission.L_color.v * emission.gain > 0.0
+
+
 class GeometryExporter(object):
     # for partial mesh export
     KnownExportedObjects = set()
@@ -75,6 +179,18 @@ class GeometryExporter(object):
         self.AnimationDataCache = ExportCache('AnimationData')
         self.ExportedObjectsDuplis = ExportCache('ExportedObjectsDuplis')
 
+        # PLY files are written on worker threads, writer_pool.shutdown() has to be called before they are used
+        self.writer_pool = ExportWriterPool(visibility_scene.luxrender_engine.export_threads)
+
+        # Optional index to share one shape definition between identical meshes of different datablocks
+        if visibility_scene.luxrender_engine.deduplicate_meshes:
+            self.geometry_index = GeometryIndex()
+        else:
+            self.geometry_index = None
+
+        # Pixels of images used for hair colours, shared by all particle systems
+        self.image_sampler = ImageColorSampler()
+
         # start fresh
         GeometryExporter.NewExportedObjects = set()
 
@@ -116,6 +232,7 @@ class GeometryExporter(object):
         # Using a cache on object massively speeds up dupli instance export
         obj_cache_key = (self.geometry_scene, obj)
         if self.ExportedObjects.have(obj_cache_key):
+            ExportProfiler.count('object cache hits')
             return self.ExportedObjects.get(obj_cache_key)
 
         mesh_definitions = []
@@ -211,8 +328,9 @@ class GeometryExporter(object):
                         continue
 
                     # If this mesh/mat combo has already been processed, get it from the cache
-                    mesh_cache_key = (self.geometry_scene, obj.data, i)
+                    mesh_cache_key = self.mesh_cache_key(obj, i)
                     if self.allow_instancing(obj) and self.ExportedMeshes.have(mesh_cache_key):
+                        ExportProfiler.count('mesh cache hits')
                         mesh_definitions.append(self.ExportedMeshes.get(mesh_cache_key))
                         continue
 
@@ -360,69 +478,16 @@ class GeometryExporter(object):
                         del vert_vno_indices
                         del vert_use_vno
 
-                        with open(ply_path, 'wb') as ply:
-                            ply.write(b'ply\n')
-                            ply.write(b'format binary_little_endian 1.0\n')
-                            ply.write(b'comment Created by LuxBlend 2.6 exporter for LuxRender - www.luxrender.net\n')
+                        ExportProfiler.count('vertices written', vert_index)
+                        ExportProfiler.count('PLY files written')
 
-                            # vert_index == the number of actual verts needed
-                            ply.write(('element vertex %d\n' % vert_index).encode())
-                            ply.write(b'property float x\n')
-                            ply.write(b'property float y\n')
-                            ply.write(b'property float z\n')
+                        # Packing and writing the file does not need Blender, that is left to the writer pool
+                        faces = [face_vert_indices[face.index] for face in ffaces_mats[i]]
+                        self.writer_pool.submit(write_binary_ply, ply_path, co_no_uv_vc_cache, faces,
+                                                bool(uv_layer), bool(vertex_color_layer))
 
-                            ply.write(b'property float nx\n')
-                            ply.write(b'property float ny\n')
-                            ply.write(b'property float nz\n')
-
-                            if uv_layer:
-                                ply.write(b'property float s\n')
-                                ply.write(b'property float t\n')
-
-                            if vertex_color_layer:
-                                ply.write(b'property uchar red\n')
-                                ply.write(b'property uchar green\n')
-                                ply.write(b'property uchar blue\n')
-
-                            ply.write(('element face %d\n' % len(ffaces_mats[i])).encode())
-                            ply.write(b'property list uchar uint vertex_indices\n')
-
-                            ply.write(b'end_header\n')
-
-                            # dump cached co/no/uv/vc
-                            if uv_layer:
-                                if vertex_color_layer:
-                                    for co, no, uv, vc in co_no_uv_vc_cache:
-                                        ply.write(struct.pack('<3f', *co))
-                                        ply.write(struct.pack('<3f', *no))
-                                        ply.write(struct.pack('<2f', *uv))
-                                        ply.write(struct.pack('<3B', *vc))
-                                else:
-                                    for co, no, uv in co_no_uv_vc_cache:
-                                        ply.write(struct.pack('<3f', *co))
-                                        ply.write(struct.pack('<3f', *no))
-                                        ply.write(struct.pack('<2f', *uv))
-                            else:
-                                if vertex_color_layer:
-                                    for co, no, vc in co_no_uv_vc_cache:
-                                        ply.write(struct.pack('<3f', *co))
-                                        ply.write(struct.pack('<3f', *no))
-                                        ply.write(struct.pack('<3B', *vc))
-                                else:
-                                    for co, no in co_no_uv_vc_cache:
-                                        ply.write(struct.pack('<3f', *co))
-                                        ply.write(struct.pack('<3f', *no))
-
-                            # dump face vert indices
-                            for face in ffaces_mats[i]:
-                                lfvi = len(face_vert_indices[face.index])
-                                ply.write(struct.pack('<B', lfvi))
-                                ply.write(struct.pack('<%dI' % lfvi, *face_vert_indices[face.index]))
-
-                            del co_no_uv_vc_cache
-                            del face_vert_indices
-
-                        LuxLog('Binary PLY file written: %s' % ply_path)
+                        del co_no_uv_vc_cache
+                        del face_vert_indices
                     else:
                         LuxLog('Skipping already exported PLY: %s' % mesh_name)
 
@@ -491,9 +556,10 @@ class GeometryExporter(object):
                         continue
 
                     # If this mesh/mat-index combo has already been processed, get it from the cache
-                    mesh_cache_key = (self.geometry_scene, obj.data, i)
+                    mesh_cache_key = self.mesh_cache_key(obj, i)
 
                     if self.allow_instancing(obj) and self.ExportedMeshes.have(mesh_cache_key):
+                        ExportProfiler.count('mesh cache hits')
                         mesh_definitions.append(self.ExportedMeshes.get(mesh_cache_key))
                         continue
 
@@ -574,6 +640,8 @@ class GeometryExporter(object):
                     del vert_vno_indices
                     del vert_use_vno
 
+                    ExportProfiler.count('vertices written', vert_index)
+
                     # build shape ParamSet
                     shape_params = ParamSet()
 
@@ -611,6 +679,27 @@ class GeometryExporter(object):
 
         return mesh_definitions
 
+    def mesh_cache_key(self, obj, material_index):
+        # Identical meshes from different datablocks share their key if deduplication is enabled
+        if self.geometry_index is not None and self.geometry_index.is_shared(obj):
+            # The AreaLightSource of an emitting material is part of the shape definition,
+            # so meshes only share it if they also share the emitting material
+            return (self.geometry_scene, self.geometry_index.get(obj.data), material_index,
+                    self.emitting_material(obj, material_index))
+
+        return self.geometry_scene, obj.data, material_index
+
+    def emitting_material(self, obj, material_index):
+        try:
+            ob_mat = obj.material_slots[material_index].material
+        except IndexError:
+            return None
+
+        if ob_mat is not None and get_material_emission(ob_mat)[0]:
+            return ob_mat
+
+        return None
+
     is_preview = False
 
     def allow_instancing(self, obj):
@@ -625,6 +714,10 @@ class GeometryExporter(object):
         if self.is_object_animated(obj)[0]:
             return True
 
+        # Meshes that are identical to the mesh of another datablock are shared
+        if self.geometry_index is not None and self.geometry_index.is_shared(obj):
+            return True
+
         # If the mesh is only used once, instancing is a waste of memory
         # However, duplis don't increase the users count, so we cout those separately
         if (not ((obj.parent and obj.parent.is_duplicator) or obj in self.objects_used_as_duplis)) and \
@@ -682,19 +775,7 @@ class GeometryExporter(object):
 
         # Emission check
         if ob_mat is not None:
-            output_node = find_node(ob_mat, 'luxrender_material_output_node')
-            object_is_emitter = False
-            light_node = None
-
-            if output_node is not None:
-                light_socket = output_node.inputs['Emission']
-
-                if light_socket.is_linked:
-                    light_node = light_socket.links[0].from_node
-                    object_is_emitter = light_socket.is_linked
-            else:
-                # No node tree, so check the classic mat editor
-                object_is_emitter = ob_mat.luxrender_emission.use_emission
+            object_is_emitter, light_node = get_material_emission(ob_mat)
 
             # Only add the AreaLightSource if this object's emission lightgroup is enabled
             if object_is_emitter and \
@@ -862,7 +943,8 @@ class GeometryExporter(object):
             else:
                 object_is_emitter = False
 
-            self.have_emitting_object |= object_is_emitter
+            if object_is_emitter and material_emits_light(self.visibility_scene, ob_mat):
+                self.have_emitting_object = True
 
             # If instancing is forbidden, just export the Shape
             if not self.allow_instancing(mat_object):
@@ -993,9 +1075,8 @@ class GeometryExporter(object):
             colorflag = 0
             uvflag = 0
             thicknessflag = 0
-            image_width = 0
-            image_height = 0
-            image_pixels = []
+            color_image = None
+            color_uvs = []
 
             mesh = obj.to_mesh(self.geometry_scene, True, 'RENDER')
             uv_textures = mesh.tessface_uv_textures
@@ -1012,9 +1093,8 @@ class GeometryExporter(object):
                 uv_tex = uv_textures.active.data
                 if psys.settings.luxrender_hair.export_color == 'uv_texture_map':
                     if uv_tex[0].image:
-                        image_width = uv_tex[0].image.size[0]
-                        image_height = uv_tex[0].image.size[1]
-                        image_pixels = uv_tex[0].image.pixels[:]
+                        if self.image_sampler.has_pixels(uv_tex[0].image):
+                            color_image = uv_tex[0].image
                         colorflag = 1
                 uvflag = 1
 
@@ -1072,17 +1152,11 @@ class GeometryExporter(object):
 
                             uv_coords.append(uv_co)
 
-                        if psys.settings.luxrender_hair.export_color == 'uv_texture_map' and not len(image_pixels) == 0:
-                            if not col:
-                                x_co = round(uv_co[0] * (image_width - 1))
-                                y_co = round(uv_co[1] * (image_height - 1))
-
-                                pixelnumber = (image_width * y_co) + x_co
-
-                                r = image_pixels[pixelnumber * 4]
-                                g = image_pixels[pixelnumber * 4 + 1]
-                                b = image_pixels[pixelnumber * 4 + 2]
-                                col = (r, g, b)
+                        if psys.settings.luxrender_hair.export_color == 'uv_texture_map' and color_image is not None:
+                            if col is None:
+                                # Store the index of the root UV, the colours of all strands are looked up at once
+                                color_uvs.append(uv_co)
+                                col = len(color_uvs) - 1
 
                             colors.append(col)
                         elif psys.settings.luxrender_hair.export_color == 'vertex_color' and has_vertex_colors:
@@ -1102,6 +1176,10 @@ class GeometryExporter(object):
                     total_strand_count += 1
                     total_segments_count = total_segments_count + point_count - 1
 
+            if color_uvs:
+                strand_colors = self.image_sampler.sample(color_image, color_uvs)
+                colors = [strand_colors[index] for index in colors]
+
             with open(hair_file_path, 'wb') as hair_file:
                 # Binary hair file format from
                 # http://www.cemyuksel.com/research/hairmodels/
@@ -1399,6 +1477,9 @@ class GeometryExporter(object):
 
         export_originals = {}
 
+        if self.geometry_index is not None:
+            self.geometry_index.add_objects(geometry_scene.objects)
+
         for obj in geometry_scene.objects:
             progress_thread.exported_objects += 1
 
@@ -1419,7 +1500,8 @@ class GeometryExporter(object):
                     if self.visibility_scene.luxrender_testing.object_analysis:
                         print(' -> is duplicator without particle systems')
                     if obj.dupli_type in self.valid_duplis_callbacks:
-                        self.callbacks['duplis'][obj.dupli_type](obj)
+                        with ExportProfiler.span(obj.name, 'duplis', dupli_type=obj.dupli_type):
+                            self.callbacks['duplis'][obj.dupli_type](obj)
                     elif self.visibility_scene.luxrender_testing.object_analysis:
                         print(' -> Unsupported Dupli type: %s' % obj.dupli_type)
 
@@ -1436,7 +1518,8 @@ class GeometryExporter(object):
                     for psys in obj.particle_systems:
                         export_originals[obj] = export_originals[obj] or psys.settings.use_render_emitter
                         if psys.settings.render_type in self.valid_particles_callbacks:
-                            self.callbacks['particles'][psys.settings.render_type](obj, particle_system=psys)
+                            with ExportProfiler.span(obj.name, 'particles', particle_system=psys.name):
+                                self.callbacks['particles'][psys.settings.render_type](obj, particle_system=psys)
                         elif self.visibility_scene.luxrender_testing.object_analysis:
                             print(' -> Unsupported Particle system type: %s' % psys.settings.render_type)
 
@@ -1457,7 +1540,8 @@ class GeometryExporter(object):
                 if not obj.type in self.valid_objects_callbacks:
                     raise UnexportableObjectException('Unsupported object type')
 
-                self.callbacks['objects'][obj.type](obj)
+                with ExportProfiler.span(obj.name, 'object', type=obj.type):
+                    self.callbacks['objects'][obj.type](obj)
 
             except UnexportableObjectException as err:
                 if self.visibility_scene.luxrender_testing.object_analysis:
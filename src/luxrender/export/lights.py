@@ -101,6 +101,32 @@ def checkLightEnabled(scene, lamp):
         return True
 
 
+def lamp_emits_light(lamp):
+    """
+    lamp			bpy.types.Lamp
+
+    Returns False if the lamp settings make it emit no light at all.
+    """
+
+    lamp_enabled = lamp.energy > 0.0
+
+    if lamp.type == 'POINT':
+        lamp_enabled &= lamp.luxrender_lamp.luxrender_lamp_point.L_color.v > 0.0
+
+    if lamp.type == 'SPOT':
+        lamp_enabled &= lamp.luxrender_lamp.luxrender_lamp_spot.L_color.v > 0.0
+
+    if lamp.type == 'HEMI':
+        lamp_enabled &= lamp.luxrender_lamp.luxrender_lamp_hemi.L_color.v > 0.0
+
+    if lamp.type == 'AREA':
+        lamp_enabled &= lamp.luxrender_lamp.luxrender_lamp_area.L_color.v > 0.0
+        lamp_enabled &= lamp.luxrender_lamp.luxrender_lamp_area.power > 0.0
+        lamp_enabled &= lamp.luxrender_lamp.luxrender_lamp_area.efficacy > 0.0
+
+    return lamp_enabled
+
+
 def exportLight(scene, lux_context, ob, matrix, portals=[]):
     light = ob.data
 
@@ -299,6 +325,92 @@ def exportLight(scene, lux_context, ob, matrix, portals=[]):
     return False
 
 
+def object_may_produce_lamps(ob, cache, visiting=None):
+    """
+    ob			bpy.types.Object
+    cache		dict of already checked objects and groups
+    visiting	set of objects and groups checked by the running search, see search_lamps()
+
+    Returns True if ob is a lamp, or a duplicator whose dupli list may
+    contain lamps (also through nested groups and duplicators). This
+    allows to skip dupli_list_create() for duplicators which can only
+    produce geometry.
+    """
+
+    if ob.type == 'LAMP':
+        return True
+
+    if not (ob.is_duplicator and ob.dupli_type in ('GROUP', 'VERTS', 'FACES')):
+        return False
+
+    def check(visiting):
+        if ob.dupli_type == 'GROUP':
+            return ob.dupli_group is not None and group_contains_lamps(ob.dupli_group, cache, visiting)
+
+        # VERTS and FACES duplicators instance their children
+        return any(object_may_produce_lamps(child, cache, visiting) for child in ob.children)
+
+    return search_lamps(ob, cache, visiting, check)
+
+
+def group_contains_lamps(group, cache, visiting=None):
+    return search_lamps(group, cache, visiting,
+                        lambda visiting: any(object_may_produce_lamps(ob, cache, visiting) for ob in group.objects))
+
+
+def search_lamps(element, cache, visiting, check):
+    """
+    Depth first search for lamps below an object or group, check(visiting) looks at its direct contents.
+
+    visiting holds everything the running search reached. Reaching an element again (through a cyclic group
+    reference or a group used twice) adds no lamps: its own check is either still running or found none.
+    Such a False result is only final once the whole search is done, so False results are cached by the
+    outermost call only, when it found no lamps at all. True results are always final.
+    """
+
+    if element in cache:
+        return cache[element]
+
+    outermost = visiting is None
+
+    if outermost:
+        visiting = set()
+    elif element in visiting:
+        return False
+
+    visiting.add(element)
+    result = check(visiting)
+
+    if result:
+        cache[element] = True
+    elif outermost:
+        for checked in visiting:
+            cache[checked] = False
+
+    return result
+
+
+def portals_for_light(light, portal_shapes, cache):
+    """
+    light			bpy.types.Lamp
+    portal_shapes	list of (light group name, portal shape name)
+    cache			dict of already matched light groups
+
+    Returns the names of the portal shapes that apply to light. Portals
+    without a light group apply to all lights, the others only to the
+    lights of their light group. Lights without a light group are in the
+    'default' group, like in exportLight().
+    """
+
+    lightgroup = light.luxrender_lamp.lightgroup or 'default'
+
+    if lightgroup not in cache:
+        cache[lightgroup] = [shape for portal_lightgroup, shape in portal_shapes
+                             if not portal_lightgroup or portal_lightgroup == lightgroup]
+
+    return cache[lightgroup]
+
+
 def lights(lux_context, geometry_scene, visibility_scene, mesh_definitions):
     """
     lux_context		pylux.Context
@@ -306,7 +418,7 @@ def lights(lux_context, geometry_scene, visibility_scene, mesh_definitions):
     and export the compatible ones to the context lux_context.
 
     Returns Boolean indicating if any light sources
-    were exported.
+    which actually emit light were exported.
     """
 
     have_light = False
@@ -329,10 +441,15 @@ def lights(lux_context, geometry_scene, visibility_scene, mesh_definitions):
     for obdata in mesh_def_keys_keys:
         # match the mesh data against the keys in mesh_definitions
         if obdata.luxrender_mesh.portal:
+            portal_lightgroup = obdata.luxrender_mesh.portal_lightgroup
+
             for mesh_def_key in mesh_def_keys[obdata]:
-                portal_shapes.append(mesh_definitions.get(mesh_def_key)[0])
+                portal_shapes.append((portal_lightgroup, mesh_definitions.get(mesh_def_key)[0]))
 
     # Then iterate for lights
+    lamp_cache = {}
+    portal_cache = {}
+
     for ob in geometry_scene.objects:
         if not is_obj_visible(visibility_scene, ob) or ob.hide_render:
             continue
@@ -344,6 +461,10 @@ def lights(lux_context, geometry_scene, visibility_scene, mesh_definitions):
         # we have to check for duplis before the "LAMP" check
         # to support a mesh/object which got lamp as dupli object
         if ob.is_duplicator and ob.dupli_type in ('GROUP', 'VERTS', 'FACES'):
+            # the duplis were already exported as geometry, only expand them again if they can contain lamps
+            if not object_may_produce_lamps(ob, lamp_cache):
+                continue
+
             # create dupli objects
             ob.dupli_list_create(geometry_scene)
 
@@ -352,13 +473,16 @@ def lights(lux_context, geometry_scene, visibility_scene, mesh_definitions):
                     continue
 
                 have_light |= exportLight(visibility_scene, lux_context, dupli_ob.object, dupli_ob.matrix,
-                                          portal_shapes)
+                                          portals_for_light(dupli_ob.object.data, portal_shapes, portal_cache)) \
+                              and lamp_emits_light(dupli_ob.object.data)
 
             # free object dupli list again. Warning: all dupli objects are INVALID now!
             if ob.dupli_list:
                 ob.dupli_list_clear()
         else:
             if ob.type == 'LAMP':
-                have_light |= exportLight(visibility_scene, lux_context, ob, ob.matrix_world, portal_shapes)
+                have_light |= exportLight(visibility_scene, lux_context, ob, ob.matrix_world,
+                                          portals_for_light(ob.data, portal_shapes, portal_cache)) \
+                              and lamp_emits_light(ob.data)
 
     return have_light
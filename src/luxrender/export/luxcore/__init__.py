@@ -30,7 +30,9 @@ import bpy, time, os
 from ...outputs import LuxManager
 from ...outputs.luxcore_api import pyluxcore
 from ...extensions_framework import util as efutil
+from ...export import GeometryIndex, ImageColorSampler
 from ...export.volumes import SmokeCache
+from ...export.profiling import ExportProfiler
 
 from .camera import CameraExporter
 from .config import ConfigExporter
@@ -39,7 +41,7 @@ from .lights import LightExporter       # ported to new interface, but crucial r
 from .materials import MaterialExporter
 from .meshes import MeshExporter
 from .objects import ObjectExporter
-from .textures import TextureExporter
+from .textures import TextureExporter, ImageStagingCache
 from .volumes import VolumeExporter
 from .utils import get_elem_key, LightgroupCache, is_lightgroup_opencl_compatible, ErrorCache
 
@@ -76,6 +78,20 @@ class LuxCoreExporter(object):
         self.texture_cache = {}
         self.volume_cache = {}
 
+        # Set for animation renders that keep this exporter alive between frames, see convert_frame()
+        self.is_animation_session = False
+        # Object transformations of the last converted frame, structure: {element: matrix}
+        self.object_matrices = {}
+        # Visibility, material assignment and mesh data of the last converted frame, structure: {element: state}
+        self.object_states = {}
+
+        # Optional index to share one shape between identical meshes of different datablocks. Not used in the
+        # viewport because mesh edits would change the fingerprints
+        if blender_scene.luxcore_translatorsettings.deduplicate_meshes and not is_viewport_render:
+            self.geometry_index = GeometryIndex()
+        else:
+            self.geometry_index = None
+
         # Namecache to map an ascending number to each lightgroup name
         self.lightgroup_cache = LightgroupCache(self.blender_scene.luxrender_lightgroups)
         # Cache defined passes to avoid multiple definitions
@@ -85,6 +101,8 @@ class LuxCoreExporter(object):
         self.temp_material_cache = set()
         self.temp_texture_cache = set()
         self.temp_volume_cache = set()
+        # Pixels of images used for hair colours, shared by all particle systems
+        self.image_sampler = ImageColorSampler()
 
         # Special exporters that are not stored in caches (because there's only one camera and config)
         self.config_exporter = ConfigExporter(self, self.blender_scene, self.is_viewport_render)
@@ -107,45 +125,101 @@ class LuxCoreExporter(object):
         self.temp_material_cache = set()
         self.temp_texture_cache = set()
         self.temp_volume_cache = set()
+        self.image_sampler = ImageColorSampler()
 
         return updated_properties
 
 
+    def pop_updated_camera_properties(self):
+        """
+        Get the camera properties and remove them from the changed scene properties. Other changes and the temporary
+        caches are kept for the next pop_updated_scene_properties()
+        """
+        camera_properties = pyluxcore.Properties(self.camera_exporter.properties)
+        self.updated_scene_properties.DeleteAll(self.camera_exporter.properties.GetAllNames())
+        return camera_properties
+
+
     def convert(self, film_width, film_height, luxcore_scene=None):
         """
         Convert the whole scene
         """
         print('\nStarting export...')
         start_time = time.time()
+        self.begin_profiling()
+
+        try:
+            if luxcore_scene is None:
+                luxcore_scene = self.create_luxcore_scene()
+
+            # Convert camera and add it to the scene. This needs to be done before object conversion because e.g.
+            # hair export needs a valid defined camera object in case it is view-dependent
+            with ExportProfiler.span('camera'):
+                self.convert_camera()
+                luxcore_scene.Parse(self.pop_updated_scene_properties())
+
+            with ExportProfiler.span('volumes'):
+                SmokeCache.reset()
+                self.convert_all_volumes()
+
+            if self.geometry_index is not None:
+                self.geometry_index.add_objects(self.blender_scene.objects)
+
+            if self.is_viewport_render and self.context.space_data.local_view:
+                # In local view, only export "local" objects and add a white background light
+                for blender_object in self.context.visible_objects:
+                    self.convert_object(blender_object, luxcore_scene)
 
-        if luxcore_scene is None:
-            image_scale = self.blender_scene.luxcore_scenesettings.imageScale / 100.0
-            if image_scale < 0.99:
-                print('All textures will be scaled down by factor %.2f' % image_scale)
+                background_props = pyluxcore.Properties()
+                background_props.Set(pyluxcore.Property('scene.lights.LOCALVIEW_BACKGROUND.type', 'constantinfinite'))
+
+                self.__set_scene_properties(background_props)
             else:
-                image_scale = 1
+                # Materials, textures, lights and meshes are all converted by their respective Blender object
+                object_amount = len(self.blender_scene.objects)
+                object_counter = 0
 
-            luxcore_scene = pyluxcore.Scene(image_scale)
+                with ExportProfiler.span('objects'):
+                    for blender_object in self.blender_scene.objects:
+                        if self.renderengine.test_break():
+                            print('EXPORT CANCELLED BY USER')
+                            return None
 
-        # Convert camera and add it to the scene. This needs to be done before object conversion because e.g.
-        # hair export needs a valid defined camera object in case it is view-dependent
-        self.convert_camera()
-        luxcore_scene.Parse(self.pop_updated_scene_properties())
+                        object_counter += 1
+                        self.renderengine.update_stats('Exporting...', 'Object: ' + blender_object.name)
+                        self.renderengine.update_progress(object_counter / object_amount)
 
-        SmokeCache.reset()
-        self.convert_all_volumes()
+                        self.convert_object(blender_object, luxcore_scene)
 
-        if self.is_viewport_render and self.context.space_data.local_view:
-            # In local view, only export "local" objects and add a white background light
-            for blender_object in self.context.visible_objects:
-                self.convert_object(blender_object, luxcore_scene)
+            return self.__create_config(film_width, film_height, luxcore_scene, start_time)
+        finally:
+            # Does nothing if the config was created, otherwise the profiler of a failed or cancelled
+            # export is stopped here so its events do not end up in the next one
+            ExportProfiler.end()
 
-            background_props = pyluxcore.Properties()
-            background_props.Set(pyluxcore.Property('scene.lights.LOCALVIEW_BACKGROUND.type', 'constantinfinite'))
 
-            self.__set_scene_properties(background_props)
-        else:
-            # Materials, textures, lights and meshes are all converted by their respective Blender object
+    def convert_frame(self, film_width, film_height, luxcore_scene):
+        """
+        Update a scene converted for the previous animation frame to the current frame.
+        Only objects, materials and lights that changed since the last frame are converted again,
+        everything else is taken from the caches
+        """
+        print('\nStarting frame update...')
+        start_time = time.time()
+        self.begin_profiling()
+
+        try:
+            self.error_cache = ErrorCache()
+
+            with ExportProfiler.span('camera'):
+                self.convert_camera()
+                luxcore_scene.Parse(self.pop_updated_scene_properties())
+
+            with ExportProfiler.span('volumes'):
+                SmokeCache.reset()
+                self.convert_all_volumes()
+
+            scene_objects = set()
             object_amount = len(self.blender_scene.objects)
             object_counter = 0
 
@@ -155,15 +229,83 @@ class LuxCoreExporter(object):
                     return None
 
                 object_counter += 1
-                self.renderengine.update_stats('Exporting...', 'Object: ' + blender_object.name)
                 self.renderengine.update_progress(object_counter / object_amount)
 
-                self.convert_object(blender_object, luxcore_scene)
+                obj_key = get_elem_key(blender_object)
+                scene_objects.add(obj_key)
+
+                for material in self.__get_animated_materials(blender_object):
+                    self.convert_material(material)
+
+                if obj_key in self.object_cache:
+                    if blender_object.type == 'LAMP' or self.__is_duplicator(blender_object):
+                        # Lights are cheap to convert and particles move on their own, always update them
+                        update_mesh = True
+                    elif self.__has_animated_geometry(blender_object):
+                        update_mesh = True
+                    elif self.__get_object_state(blender_object) != self.object_states.get(obj_key):
+                        # Hidden, moved to other layers or assigned other materials or mesh data
+                        update_mesh = True
+                    elif blender_object.matrix_world != self.object_matrices.get(obj_key):
+                        if self.update_object_transform(blender_object):
+                            ExportProfiler.count('transform-only updates')
+                            continue
+                        update_mesh = False
+                    else:
+                        ExportProfiler.count('unchanged objects')
+                        continue
+                else:
+                    update_mesh = True
 
+                self.renderengine.update_stats('Exporting...', 'Object: ' + blender_object.name)
+                self.__update_object(blender_object, luxcore_scene, update_mesh)
+
+            # Delete objects that were removed from the scene since the last frame
+            for obj_key in [key for key in self.object_cache.keys() if key not in scene_objects]:
+                names = self.__get_object_names(self.object_cache[obj_key].properties)
+                if obj_key in self.dupli_cache:
+                    names |= self.__get_object_names(self.dupli_cache[obj_key].properties)
+                    del self.dupli_cache[obj_key]
+
+                for name in names:
+                    luxcore_scene.DeleteObject(name)
+
+                if obj_key in self.light_cache:
+                    for exported_light in self.light_cache[obj_key].exported_lights:
+                        if exported_light.type == 'AREA':
+                            # Area lights are meshlights and treated like objects with glowing materials
+                            luxcore_scene.DeleteObject(exported_light.luxcore_name)
+                        else:
+                            luxcore_scene.DeleteLight(exported_light.luxcore_name)
+
+                    del self.light_cache[obj_key]
+
+                del self.object_cache[obj_key]
+                self.object_matrices.pop(obj_key, None)
+                self.object_states.pop(obj_key, None)
+
+            return self.__create_config(film_width, film_height, luxcore_scene, start_time)
+        finally:
+            # See convert()
+            ExportProfiler.end()
+
+
+    def create_luxcore_scene(self):
+        image_scale = self.blender_scene.luxcore_scenesettings.imageScale / 100.0
+        if image_scale < 0.99:
+            print('All textures will be scaled down by factor %.2f' % image_scale)
+        else:
+            image_scale = 1
+
+        return pyluxcore.Scene(image_scale)
+
+
+    def __create_config(self, film_width, film_height, luxcore_scene, start_time):
         # Convert config at last because all lightgroups and passes have to be already defined
-        self.convert_config(film_width, film_height)
-        self.convert_imagepipeline()
-        self.convert_lightgroup_scales(verbose=True)
+        with ExportProfiler.span('config'):
+            self.convert_config(film_width, film_height)
+            self.convert_imagepipeline()
+            self.convert_lightgroup_scales(verbose=True)
 
         # Debug output
         if self.blender_scene.luxcore_translatorsettings.print_cfg:
@@ -186,12 +328,34 @@ class LuxCoreExporter(object):
         self.renderengine.update_stats('Export Finished (%.1fs)' % export_time, message)
 
         # Create luxcore scene and config
-        luxcore_scene.Parse(self.pop_updated_scene_properties())
-        luxcore_config = pyluxcore.RenderConfig(self.config_properties, luxcore_scene)
+        with ExportProfiler.span('parse'):
+            luxcore_scene.Parse(self.pop_updated_scene_properties())
+            luxcore_config = pyluxcore.RenderConfig(self.config_properties, luxcore_scene)
+
+        ImageStagingCache.scene_parsed()
+
+        ExportProfiler.end(self.get_trace_filepath())
 
         return luxcore_config
 
 
+    def begin_profiling(self):
+        """
+        Start collecting export timings if enabled (final renders only, the viewport and material previews
+        update too often for a trace file to be useful)
+        """
+        enabled = self.blender_scene.luxcore_translatorsettings.profile_export and not (
+            self.is_viewport_render or self.is_material_preview)
+        ExportProfiler.begin(enabled)
+
+
+    def get_trace_filepath(self):
+        folder = efutil.export_path or efutil.temp_directory()
+        filename = '%s.%05d.trace.json' % (bpy.path.clean_name(self.blender_scene.name),
+                                           self.blender_scene.frame_current)
+        return os.path.join(folder, filename)
+
+
     def convert_camera(self):
         camera_props_keys = self.camera_exporter.properties.GetAllNames()
         self.scene_properties.DeleteAll(camera_props_keys)
@@ -405,6 +569,11 @@ class LuxCoreExporter(object):
 
 
     def convert_object(self, blender_object, luxcore_scene, update_mesh=True, update_material=True):
+        with ExportProfiler.span(blender_object.name, 'object', type=blender_object.type):
+            self.__convert_object(blender_object, luxcore_scene, update_mesh, update_material)
+
+
+    def __convert_object(self, blender_object, luxcore_scene, update_mesh, update_material):
         cache = self.object_cache
         exporter = ObjectExporter(self, self.blender_scene, self.is_viewport_render, blender_object)
 
@@ -422,12 +591,34 @@ class LuxCoreExporter(object):
         self.__set_scene_properties(new_properties)
 
         cache[obj_key] = exporter
+        self.object_matrices[obj_key] = blender_object.matrix_world.copy()
+        self.object_states[obj_key] = self.__get_object_state(blender_object)
+
+
+    def update_object_transform(self, blender_object):
+        """
+        Update only the transformation of an already converted object, without going through the mesh and
+        material conversion. Returns False if the object has to be converted with convert_object() instead.
+        """
+        obj_key = get_elem_key(blender_object)
+
+        if obj_key not in self.object_cache:
+            return False
+
+        new_properties = self.object_cache[obj_key].update_transform()
+
+        if new_properties is None:
+            return False
+
+        self.__set_scene_properties(new_properties)
+        self.object_matrices[obj_key] = blender_object.matrix_world.copy()
+        return True
 
 
     def convert_mesh(self, blender_object, luxcore_scene, use_instancing, transformation):
         exporter = MeshExporter(self.blender_scene, self.is_viewport_render, blender_object, use_instancing,
-                                transformation)
-        key = MeshExporter.get_mesh_key(blender_object, self.is_viewport_render, use_instancing)
+                                transformation, self.geometry_index)
+        key = MeshExporter.get_mesh_key(blender_object, self.is_viewport_render, use_instancing, self.geometry_index)
         self.__convert_element(key, self.mesh_cache, exporter, luxcore_scene)
 
 
@@ -435,6 +626,7 @@ class LuxCoreExporter(object):
         mat_key = get_elem_key(material)
 
         if mat_key in self.temp_material_cache:
+            ExportProfiler.count('material cache hits')
             return
 
         self.temp_material_cache.add(mat_key)
@@ -446,6 +638,7 @@ class LuxCoreExporter(object):
         tex_key = get_elem_key(texture)
 
         if tex_key in self.temp_texture_cache:
+            ExportProfiler.count('texture cache hits')
             return
 
         self.temp_texture_cache.add(tex_key)
@@ -462,6 +655,7 @@ class LuxCoreExporter(object):
         vol_key = get_elem_key(volume)
 
         if vol_key in self.temp_volume_cache:
+            ExportProfiler.count('volume cache hits')
             return
 
         self.temp_volume_cache.add(vol_key)
@@ -492,12 +686,109 @@ class LuxCoreExporter(object):
             self.scene_properties.DeleteAll(old_properties)
             self.updated_scene_properties.DeleteAll(old_properties)
 
-        new_properties = exporter.convert(luxcore_scene) if luxcore_scene else exporter.convert()
+        with ExportProfiler.span(str(cache_key), type(exporter).__name__.replace('Exporter', '').lower()):
+            new_properties = exporter.convert(luxcore_scene) if luxcore_scene else exporter.convert()
+
         self.__set_scene_properties(new_properties)
 
         cache[cache_key] = exporter
 
 
+    def __update_object(self, blender_object, luxcore_scene, update_mesh):
+        """
+        Convert an object again for a new animation frame and delete the LuxCore objects it no longer creates
+        (e.g. dead particles or objects that were hidden)
+        """
+        obj_key = get_elem_key(blender_object)
+        old_names = set()
+
+        if obj_key in self.object_cache:
+            old_names |= self.__get_object_names(self.object_cache[obj_key].properties)
+        if obj_key in self.dupli_cache:
+            old_names |= self.__get_object_names(self.dupli_cache[obj_key].properties)
+
+        if self.__is_duplicator(blender_object):
+            self.convert_duplis(luxcore_scene, blender_object)
+
+        self.convert_object(blender_object, luxcore_scene, update_mesh=update_mesh, update_material=False)
+
+        new_names = self.__get_object_names(self.object_cache[obj_key].properties)
+        if obj_key in self.dupli_cache:
+            new_names |= self.__get_object_names(self.dupli_cache[obj_key].properties)
+
+        for name in old_names - new_names:
+            luxcore_scene.DeleteObject(name)
+
+
+    @staticmethod
+    def __get_object_names(properties):
+        return {name.split('.')[2] for name in properties.GetAllUniqueSubNames('scene.objects')}
+
+
+    @staticmethod
+    def __get_object_state(blender_object):
+        """
+        Everything besides the transformation that decides whether and how an unchanged object is exported
+        """
+        materials = tuple(slot.material.name if slot.material else None for slot in blender_object.material_slots)
+        data_name = blender_object.data.name if blender_object.data else None
+        return blender_object.hide_render, tuple(blender_object.layers), materials, data_name
+
+
+    @staticmethod
+    def __is_duplicator(blender_object):
+        return len(blender_object.particle_systems) > 0 or blender_object.is_duplicator
+
+
+    def __has_animated_geometry(self, blender_object):
+        """
+        Check if the mesh of an object can change from frame to frame (deforming modifiers, animated
+        mesh data or shape keys, simulation caches)
+        """
+        if blender_object.type not in ('MESH', 'CURVE', 'SURFACE', 'META', 'FONT') or blender_object.data is None:
+            return False
+
+        if blender_object.data.animation_data is not None:
+            return True
+
+        shape_keys = getattr(blender_object.data, 'shape_keys', None)
+        if shape_keys is not None and shape_keys.animation_data is not None:
+            return True
+
+        for modifier in blender_object.modifiers:
+            if modifier.show_render and modifier.type in ('FLUID_SIMULATION', 'OCEAN', 'DYNAMIC_PAINT', 'EXPLODE',
+                                                          'BUILD', 'MESH_CACHE', 'CLOTH', 'SOFT_BODY', 'SMOKE'):
+                return True
+
+        return blender_object.is_deform_modified(self.blender_scene, 'RENDER')
+
+
+    @staticmethod
+    def __get_animated_materials(blender_object):
+        animated_materials = []
+
+        for slot in blender_object.material_slots:
+            material = slot.material
+
+            if material is None:
+                continue
+
+            animated = material.animation_data is not None
+
+            nodetree_name = material.luxrender_material.nodetree
+            if nodetree_name and nodetree_name in bpy.data.node_groups:
+                animated |= bpy.data.node_groups[nodetree_name].animation_data is not None
+
+            for tex_slot in material.texture_slots:
+                if tex_slot and tex_slot.texture:
+                    animated |= tex_slot.texture.animation_data is not None
+
+            if animated:
+                animated_materials.append(material)
+
+        return animated_materials
+
+
     def __set_scene_properties(self, properties):
         self.updated_scene_properties.Set(properties)
         self.scene_properties.Set(properties)
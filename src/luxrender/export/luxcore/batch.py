@@ -0,0 +1,80 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# --------------------------------------------------------------------------
+# Blender 2.5 LuxRender Add-On
+# --------------------------------------------------------------------------
+#
+# Authors:
+# David Bucciarelli, Jens Verwiebe, Tom Bech, Simon Wendsche
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+
+"""
+Collects LuxCore properties in plain Python lists and hands them to pyluxcore in one call
+(Properties.SetFromString()), instead of creating a pyluxcore.Property and calling Properties.Set()
+for every single key. Used for the hot loops of the exporter, e.g. particle and dupli export.
+
+This module must not import bpy or pyluxcore so that it can be benchmarked outside of Blender.
+"""
+
+
+class PropertyBatch(object):
+    def __init__(self):
+        self.lines = []
+
+    def __len__(self):
+        return len(self.lines)
+
+    @staticmethod
+    def format_value(value):
+        if isinstance(value, str):
+            return '"%s"' % value
+        elif isinstance(value, bool):
+            return '1' if value else '0'
+        elif isinstance(value, (int, float)):
+            return repr(value)
+        else:
+            # Lists, tuples and vectors
+            return ' '.join([PropertyBatch.format_value(v) for v in value])
+
+    @staticmethod
+    def format_matrix(matrix):
+        """
+        Faster format_value() for flat lists of floats, e.g. transformations from matrix_to_list()
+        """
+        return ' '.join(map(repr, matrix))
+
+    def set(self, key, value):
+        self.lines.append(key + ' = ' + self.format_value(value))
+
+    def set_formatted(self, text):
+        """
+        Add one or more already formatted "key = value" lines, e.g. created from a prebuilt template
+        """
+        self.lines.append(text)
+
+    def flush(self, properties):
+        """
+        Move all collected properties into properties (pyluxcore.Properties)
+        """
+        if self.lines:
+            properties.SetFromString('\n'.join(self.lines))
+            self.lines = []
+
+        return properties
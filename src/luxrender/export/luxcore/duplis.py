@@ -30,6 +30,7 @@ from ...outputs.luxcore_api import pyluxcore
 from ...outputs.luxcore_api import ToValidLuxCoreName
 from ...export import matrix_to_list, is_obj_visible
 
+from .batch import PropertyBatch
 from .objects import ObjectExporter
 from .lights import LightExporter
 from .utils import log_exception
@@ -150,6 +151,12 @@ class DupliExporter(object):
                 object_exporter.convert(False, False, luxcore_scene, None, dm)
                 unique_objs[do.name] = object_exporter.exported_objects
 
+        # Instance properties are collected as text and flushed into self.properties in large batches
+        batch = PropertyBatch()
+        instance_template = ('scene.objects.%(name)s.shape = "%(shape)s"\n'
+                             'scene.objects.%(name)s.material = "%(material)s"\n'
+                             'scene.objects.%(name)s.transformation = %(transform)s')
+
         # dupli object, dupli matrix
         for do, dm, psys_name, persistent_id in duplis:
             # Increment dupli number for progress display
@@ -167,6 +174,7 @@ class DupliExporter(object):
             # Make it possible to interrupt the export process and report status in the UI
             # (only every 10000 loop iterations for performance reasons)
             if self.dupli_number % 10000 == 0:
+                batch.flush(self.properties)
                 self.__report_progress()
 
                 if self.luxcore_exporter.renderengine.test_break():
@@ -186,14 +194,17 @@ class DupliExporter(object):
                     name += do.library.name
                 name = ToValidLuxCoreName(name)
 
-                transform = matrix_to_list(dm, apply_worldscale=True)
+                transform = PropertyBatch.format_matrix(matrix_to_list(dm, apply_worldscale=True))
 
                 for mat_index, exp_obj in enumerate(exported_objects):
-                    prefix = 'scene.objects.%s%d' % (name, mat_index)
-                    self.properties.Set(pyluxcore.Property(prefix + '.shape', exp_obj.luxcore_shape_name))
-                    self.properties.Set(pyluxcore.Property(prefix + '.material', exp_obj.luxcore_material_name))
-                    self.properties.Set(pyluxcore.Property(prefix + '.transformation', transform))
-
+                    batch.set_formatted(instance_template % {
+                        'name': name + str(mat_index),
+                        'shape': exp_obj.luxcore_shape_name,
+                        'material': exp_obj.luxcore_material_name,
+                        'transform': transform,
+                    })
+
+        batch.flush(self.properties)
         del duplis
 
         time_elapsed = time.time() - time_start
@@ -253,9 +264,8 @@ class DupliExporter(object):
         colorflag = 0
         uvflag = 0
         thicknessflag = 0
-        image_width = 0
-        image_height = 0
-        image_pixels = []
+        color_image = None
+        color_uvs = []
 
         modifier_mode = 'PREVIEW' if self.is_viewport_render else 'RENDER'
         mesh = obj.to_mesh(self.blender_scene, True, modifier_mode)
@@ -272,9 +282,8 @@ class DupliExporter(object):
             uv_tex = uv_textures.active.data
             if settings.export_color == 'uv_texture_map':
                 if uv_tex[0].image:
-                    image_width = uv_tex[0].image.size[0]
-                    image_height = uv_tex[0].image.size[1]
-                    image_pixels = uv_tex[0].image.pixels[:]
+                    if self.luxcore_exporter.image_sampler.has_pixels(uv_tex[0].image):
+                        color_image = uv_tex[0].image
                     colorflag = 1
             uvflag = 1
 
@@ -336,17 +345,11 @@ class DupliExporter(object):
 
                         uv_coords.append(uv_co)
 
-                    if settings.export_color == 'uv_texture_map' and not len(image_pixels) == 0:
-                        if not col:
-                            x_co = round(uv_co[0] * (image_width - 1))
-                            y_co = round(uv_co[1] * (image_height - 1))
-
-                            pixelnumber = (image_width * y_co) + x_co
-
-                            r = image_pixels[pixelnumber * 4]
-                            g = image_pixels[pixelnumber * 4 + 1]
-                            b = image_pixels[pixelnumber * 4 + 2]
-                            col = (r, g, b)
+                    if settings.export_color == 'uv_texture_map' and color_image is not None:
+                        if col is None:
+                            # Store the index of the root UV, the colours of all strands are looked up at once
+                            color_uvs.append(uv_co)
+                            col = len(color_uvs) - 1
 
                         colors.append(col)
                     elif settings.export_color == 'vertex_color' and has_vertex_colors:
@@ -366,6 +369,10 @@ class DupliExporter(object):
                 total_strand_count += 1
                 total_segments_count = total_segments_count + point_count - 1
 
+        if color_uvs:
+            strand_colors = self.luxcore_exporter.image_sampler.sample(color_image, color_uvs)
+            colors = [strand_colors[index] for index in colors]
+
         # LuxCore needs tuples, not vectors
         points_as_tuples = [tuple(point) for point in points]
 
@@ -25,8 +25,11 @@
 # ***** END GPL LICENCE BLOCK *****
 #
 
+import array, hashlib, os
+
 from mathutils import Matrix
 
+from ...extensions_framework import util as efutil
 from ...outputs.luxcore_api import pyluxcore
 from ...export import matrix_to_list
 
@@ -35,8 +38,6 @@ from .utils import get_elem_key
 
 
 class MaterialPreviewExporter(object):
-    cached_preview_properties = ''
-
     def __init__(self, blender_scene, renderengine, is_thumbnail, preview_type, preview_material,
                  preview_texture, preview_object):
         self.blender_scene = blender_scene
@@ -51,6 +52,10 @@ class MaterialPreviewExporter(object):
         self.is_world_sphere_type = self.preview_object.name == 'preview.004'
         self.is_plane_type = self.preview_object.name == 'preview'
 
+        # Set by convert(), see MaterialPreviewCache
+        self.cache_key = None
+        self.cached_pixels = None
+
     def convert(self, film_width, film_height):
         # Make the strands in strand preview mode thicker so they are visible
         strands_settings = self.blender_scene.objects['previewhair'].particle_systems[0].settings.luxrender_hair
@@ -146,23 +151,24 @@ class MaterialPreviewExporter(object):
             scn_props.Set(pyluxcore.Property('scene.lights.' + 'distant' + '.color', [3.1] * 3))
 
         print(scn_props)
-        luxcore_scene.Parse(scn_props)
 
-        # Create config
         cfg_props = self.__create_preview_config(film_width, film_height)
-        luxcore_config = pyluxcore.RenderConfig(cfg_props, luxcore_scene)
 
         # Check if we even have to render a new preview (only when something changed)
-        # Blender spams many unnecessary updates. The cache has to be static because each preview update
-        # creates its own instance of RENDERENGINE_luxrender (and thus MaterialPreviewExporter).
-        new_preview_properties = str(scn_props) + str(cfg_props)
-
-        if MaterialPreviewExporter.cached_preview_properties == new_preview_properties:
-            print('Skipping preview render, type:', self.preview_type, 'is_thumbnail:', self.is_thumbnail)
+        # Blender spams many unnecessary updates, and previews of unchanged materials are requested again
+        # every time they are shown. The cache has to be static because each preview update creates its own
+        # instance of RENDERENGINE_luxrender (and thus MaterialPreviewExporter).
+        self.cache_key = MaterialPreviewCache.create_key(scn_props, cfg_props, self.preview_object)
+        self.cached_pixels = MaterialPreviewCache.get(self.cache_key, film_width * film_height * 3)
+
+        if self.cached_pixels is not None:
+            print('Using cached preview, type:', self.preview_type, 'is_thumbnail:', self.is_thumbnail)
             return
-        else:
-            MaterialPreviewExporter.cached_preview_properties = new_preview_properties
 
+        luxcore_scene.Parse(scn_props)
+
+        # Create config
+        luxcore_config = pyluxcore.RenderConfig(cfg_props, luxcore_scene)
         return luxcore_config
 
     def __export_plane_scene(self, luxcore_exporter, scn_props, luxcore_scene):
@@ -396,3 +402,88 @@ class MaterialPreviewExporter(object):
 
         return cfg_props
 
+
+class MaterialPreviewCache(object):
+    """
+    On-disk cache of rendered material/texture previews, so previews that were already rendered once (e.g. when
+    scrolling through a material list or switching back to a material) are displayed without creating a RenderConfig
+    and RenderSession. The key is a hash of the exported preview scene and config properties.
+    The files are kept in the temp directory and their total size is limited, the least recently used
+    previews (oldest modification time, which is updated on every cache hit) are deleted first.
+    """
+    folder_name = 'luxblend_preview_cache'
+    max_size = 128 * 1024 * 1024
+
+    @classmethod
+    def get_folder(cls):
+        return os.path.join(efutil.temp_directory(), cls.folder_name)
+
+    @staticmethod
+    def create_key(scn_props, cfg_props, preview_object):
+        digest = hashlib.sha1()
+        digest.update(preview_object.name.encode())
+        digest.update(str(scn_props).encode())
+        digest.update(str(cfg_props).encode())
+
+        # Image files can change on disk without any change of the properties
+        for name in scn_props.GetAllNames():
+            if name.endswith('.file'):
+                path = scn_props.Get(name).GetString()
+                if os.path.exists(path):
+                    digest.update(str(os.path.getmtime(path)).encode())
+
+        return digest.hexdigest()
+
+    @classmethod
+    def get(cls, key, length):
+        """
+        Returns the cached pixels (array of floats) or None if there is no (valid) cache entry
+        """
+        filepath = os.path.join(cls.get_folder(), key + '.bin')
+
+        if not os.path.exists(filepath) or os.path.getsize(filepath) != length * 4:
+            return None
+
+        pixels = array.array('f')
+
+        try:
+            with open(filepath, 'rb') as cache_file:
+                pixels.fromfile(cache_file, length)
+            # Mark as recently used
+            os.utime(filepath, None)
+        except (OSError, EOFError) as err:
+            print('Could not read preview cache file %s: %s' % (filepath, err))
+            return None
+
+        return pixels
+
+    @classmethod
+    def store(cls, key, pixels):
+        folder = cls.get_folder()
+
+        try:
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+            with open(os.path.join(folder, key + '.bin'), 'wb') as cache_file:
+                pixels.tofile(cache_file)
+
+            cls.evict(folder)
+        except OSError as err:
+            print('Could not write preview cache: %s' % err)
+
+    @classmethod
+    def evict(cls, folder):
+        entries = []
+        for filename in os.listdir(folder):
+            filepath = os.path.join(folder, filename)
+            entries.append((os.path.getmtime(filepath), os.path.getsize(filepath), filepath))
+
+        total_size = sum(entry[1] for entry in entries)
+
+        for mtime, size, filepath in sorted(entries):
+            if total_size <= cls.max_size:
+                break
+
+            os.remove(filepath)
+            total_size -= size
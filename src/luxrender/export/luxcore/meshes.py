@@ -42,19 +42,26 @@ class ExportedShape(object):
 
 class MeshExporter(object):
     def __init__(self, blender_scene, is_viewport_render=False, blender_object=None, use_instancing=False,
-                 transformation=None):
+                 transformation=None, geometry_index=None):
         self.blender_scene = blender_scene
         self.is_viewport_render = is_viewport_render
         self.blender_object = blender_object
         self.use_instancing = use_instancing
         self.transformation = transformation
+        self.geometry_index = geometry_index
 
         self.properties = pyluxcore.Properties()
         self.exported_shapes = []
 
 
     @staticmethod
-    def get_mesh_key(blender_object, is_viewport_render, use_instancing):
+    def get_mesh_key(blender_object, is_viewport_render, use_instancing, geometry_index=None):
+        # Instanced meshes that are identical to the mesh of another datablock are keyed by their geometry
+        # fingerprint, so all of them share one shape
+        if geometry_index is not None and use_instancing and geometry_index.is_shared(blender_object,
+                                                                                       is_viewport_render):
+            return tuple(['geometry', geometry_index.get(blender_object.data), blender_object.type, use_instancing])
+
         # We have to account for different modifiers being used on shared geometry
         # If the object has any active deforming modifiers we have to give the mesh a unique key
         key = tuple([blender_object.data, blender_object.type, use_instancing])
@@ -154,7 +161,8 @@ class MeshExporter(object):
 
 
     def __generate_shape_name(self, matIndex=-1):
-        mesh_key = MeshExporter.get_mesh_key(self.blender_object, self.is_viewport_render, self.use_instancing)
+        mesh_key = MeshExporter.get_mesh_key(self.blender_object, self.is_viewport_render, self.use_instancing,
+                                             self.geometry_index)
         shape_name = self.blender_scene.name
 
         for elem in mesh_key:
@@ -35,6 +35,7 @@ from ...export import object_anim_matrices
 from ...export import matrix_to_list
 from ...properties import find_node
 
+from .batch import PropertyBatch
 from .utils import calc_shutter, get_elem_key, log_exception
 from .meshes import MeshExporter
 
@@ -68,6 +69,44 @@ class ObjectExporter(object):
         return self.properties
 
 
+    def update_transform(self):
+        """
+        Fast path for objects that were only moved/rotated/scaled after they were converted.
+        Returns properties containing only the new transformations of the exported objects, or None if the object
+        can't be updated this way and has to be converted again with convert()
+        """
+        obj = self.blender_object
+
+        if not self.exported_objects or self.is_dupli or obj.type == 'LAMP':
+            return None
+
+        # The transformation of duplis depends on their duplicator
+        if len(obj.particle_systems) > 0 or obj.is_duplicator:
+            return None
+
+        # Motion blur uses .motion.n.transformation properties
+        camera = self.blender_scene.camera
+        if camera is not None and camera.data.luxrender_camera.usemblur and camera.data.luxrender_camera.objectmblur:
+            return None
+
+        keys = ['scene.objects.%s.transformation' % exported_object.luxcore_object_name
+                for exported_object in self.exported_objects]
+
+        # Objects without instancing have the transformation baked into the mesh
+        existing_keys = set(self.properties.GetAllNames())
+        if not all(key in existing_keys for key in keys):
+            return None
+
+        transform = matrix_to_list(obj.matrix_world, apply_worldscale=True)
+        properties = pyluxcore.Properties()
+
+        for key in keys:
+            properties.Set(pyluxcore.Property(key, transform))
+
+        self.properties.Set(properties)
+        return properties
+
+
     def __use_instancing(self, anim_matrices):
         """
         Adapted from ../geometry.py line 611
@@ -79,9 +118,14 @@ class ObjectExporter(object):
         if anim_matrices and len(anim_matrices) > 1:
            return True
 
-        # Use instancing on every object when in viewport render, to be able to transform them without re-exporting
-        # the mesh
-        if self.is_viewport_render:
+        # Use instancing on every object when in viewport render or incremental animation export, to be able to
+        # transform them without re-exporting the mesh
+        if self.is_viewport_render or self.luxcore_exporter.is_animation_session:
+            return True
+
+        # Meshes that are identical to the mesh of another datablock share one instanced shape
+        geometry_index = self.luxcore_exporter.geometry_index
+        if geometry_index is not None and geometry_index.is_shared(obj, self.is_viewport_render):
             return True
 
         # Duplis and proxies are always instanced
@@ -178,7 +222,9 @@ class ObjectExporter(object):
             print('Converting object %s %s' % (obj.name, 'as instance' if use_instancing else ''))
 
         # Check if mesh is in cache
-        if MeshExporter.get_mesh_key(obj, self.is_viewport_render, use_instancing) in self.luxcore_exporter.mesh_cache:
+        mesh_key = MeshExporter.get_mesh_key(obj, self.is_viewport_render, use_instancing,
+                                             self.luxcore_exporter.geometry_index)
+        if mesh_key in self.luxcore_exporter.mesh_cache:
             # Check if object is in cache
             if get_elem_key(obj) in self.luxcore_exporter.object_cache and update_mesh and not self.is_dupli:
                 self.luxcore_exporter.convert_mesh(obj, luxcore_scene, use_instancing, transform)
@@ -191,8 +237,9 @@ class ObjectExporter(object):
 
 
     def __update_props(self, anim_matrices, obj, transform, update_material):
-        mesh_exporter = self.luxcore_exporter.mesh_cache[MeshExporter.get_mesh_key(obj, self.is_viewport_render,
-                                                                                   self.__use_instancing(anim_matrices))]
+        mesh_key = MeshExporter.get_mesh_key(obj, self.is_viewport_render, self.__use_instancing(anim_matrices),
+                                             self.luxcore_exporter.geometry_index)
+        mesh_exporter = self.luxcore_exporter.mesh_cache[mesh_key]
         self.__create_luxcore_objects(mesh_exporter.exported_shapes, transform, update_material, anim_matrices)
 
 
@@ -279,15 +326,16 @@ class ObjectExporter(object):
         self.exported_objects.append(ExportedObject(luxcore_object_name, luxcore_shape_name, luxcore_material_name))
 
         prefix = 'scene.objects.' + luxcore_object_name
+        batch = PropertyBatch()
 
-        self.properties.Set(pyluxcore.Property(prefix + '.material', luxcore_material_name))
-        self.properties.Set(pyluxcore.Property(prefix + '.shape', luxcore_shape_name))
+        batch.set(prefix + '.material', luxcore_material_name)
+        batch.set(prefix + '.shape', luxcore_shape_name)
 
         use_motion_blur = anim_matrices and len(anim_matrices) > 1
 
         if transform is not None and self.__use_instancing(anim_matrices) and not use_motion_blur:
             # In case of motion blur, the object is only transformed by the .motion.n.transformation properties
-            self.properties.Set(pyluxcore.Property(prefix + '.transformation', transform))
+            batch.set_formatted(prefix + '.transformation = ' + PropertyBatch.format_matrix(transform))
 
         # Motion blur (needs at least 2 matrices in anim_matrices)
         if use_motion_blur:
@@ -297,8 +345,10 @@ class ObjectExporter(object):
             for i in range(len(anim_matrices)):
                 time = i * step
                 matrix = matrix_to_list(anim_matrices[i], apply_worldscale=True, invert=True)
-                self.properties.Set(pyluxcore.Property('%s.motion.%d.time' % (prefix, i), time))
-                self.properties.Set(pyluxcore.Property('%s.motion.%d.transformation' % (prefix, i), matrix))
+                batch.set('%s.motion.%d.time' % (prefix, i), time)
+                batch.set_formatted('%s.motion.%d.transformation = %s' % (prefix, i, PropertyBatch.format_matrix(matrix)))
+
+        batch.flush(self.properties)
 
 
     def __calc_motion_blur(self):
@@ -311,4 +361,4 @@ class ObjectExporter(object):
             steps = lux_camera.motion_blur_samples
             return object_anim_matrices(self.blender_scene, self.blender_object, steps=steps)
         else:
-            return None
\ No newline at end of file
+            return None
\ No newline at end of file
@@ -25,9 +25,10 @@
 # ***** END GPL LICENCE BLOCK *****
 #
 
-import bpy, math, mathutils, os, tempfile
+import array, bpy, collections, hashlib, math, mathutils, os
 
 from ...extensions_framework import util as efutil
+from ...export.profiling import ExportProfiler
 from ...outputs.luxcore_api import pyluxcore
 from ...outputs.luxcore_api import ToValidLuxCoreName
 from ...export import matrix_to_list
@@ -213,15 +214,12 @@ class TextureExporter(object):
             # IMAGE/MOVIE/SEQUENCE
             ####################################################################
             elif bl_texType == 'IMAGE' and texture.image and texture.image.source in ['GENERATED', 'FILE', 'SEQUENCE']:
-                temp_file = tempfile.NamedTemporaryFile(delete=False)
-                tex_image = temp_file.name
-
                 if texture.image.source == 'GENERATED':
-                    texture.image.save_render(tex_image, self.blender_scene)
+                    tex_image = ImageStagingCache.stage(texture.image, self.blender_scene)
 
                 if texture.image.source == 'FILE':
                     if texture.image.packed_file:
-                        texture.image.save_render(tex_image, self.blender_scene)
+                        tex_image = ImageStagingCache.stage(texture.image, self.blender_scene)
                     else:
                         if texture.library is not None:
                             f_path = efutil.filesystem_path(
@@ -237,10 +235,7 @@ class TextureExporter(object):
 
                 if texture.image.source == 'SEQUENCE':
                     if texture.image.packed_file:
-                        tex_image = 'luxblend_extracted_image_%s.%s' % (
-                            bpy.path.clean_name(texture.name), self.blender_scene.render.image_settings.file_format)
-                        tex_image = os.path.join(extract_path, tex_image)
-                        texture.image.save_render(tex_image, self.blender_scene)
+                        tex_image = ImageStagingCache.stage(texture.image, self.blender_scene)
                     else:
                         # sequence params from blender
                         # remove tex_preview extension to avoid error
@@ -676,8 +671,9 @@ class TextureExporter(object):
             elif texType == 'densitygrid':
                 self.properties.Set(pyluxcore.Property(prefix + '.wrap', luxTex.wrapping))
 
-                if SmokeCache.needs_update(self.blender_scene, luxTex.domain_object, luxTex.source):
-                    grid = SmokeCache.convert(self.blender_scene, luxTex.domain_object, luxTex.source)
+                if SmokeCache.needs_update(self.blender_scene, luxTex.domain_object, luxTex.source, self.luxcore_name):
+                    grid = SmokeCache.convert(self.blender_scene, luxTex.domain_object, luxTex.source,
+                                              self.luxcore_name)
                     self.properties.Set(pyluxcore.Property(prefix + '.data', grid[3]))
                     self.properties.Set(pyluxcore.Property(prefix + '.nx', int(grid[0])))
                     self.properties.Set(pyluxcore.Property(prefix + '.ny', int(grid[1])))
@@ -709,4 +705,154 @@ class TextureExporter(object):
             self.__convert_colorramp()
             return
 
-        raise Exception('Unknown texture type: ' + texture.name)
\ No newline at end of file
+        raise Exception('Unknown texture type: ' + texture.name)
+
+
+class ImageStagingCache(object):
+    """
+    Images that only exist inside Blender (generated or packed) have to be written to disk before LuxCore can load them.
+    This cache keeps the written files in a subfolder of the export directory and reuses them as long as the image
+    content and the colour management settings used by save_render() stay the same, so viewport updates and
+    animation frames don't re-encode the same image again. The total size of the files is limited, the least
+    recently used ones are deleted first. clear() removes all files when the render session ends.
+    LuxCore only loads the files when the scene properties are parsed, so files staged for the running export are
+    never deleted; the exporter calls scene_parsed() once LuxCore has loaded them.
+    """
+    folder_name = 'luxblend_images'
+    max_size = 512 * 1024 * 1024
+
+    # key -> (filepath, size in bytes), least recently used first
+    files = collections.OrderedDict()
+    # Keys of the files referenced by textures that were not parsed yet
+    in_use = set()
+
+    extensions = {
+        'BMP': 'bmp',
+        'PNG': 'png',
+        'JPEG': 'jpg',
+        'TARGA': 'tga',
+        'TARGA_RAW': 'tga',
+        'TIFF': 'tif',
+        'HDR': 'hdr',
+        'OPEN_EXR': 'exr',
+        'OPEN_EXR_MULTILAYER': 'exr',
+    }
+
+    @classmethod
+    def stage(cls, image, blender_scene):
+        """
+        Returns the path of a file containing the image, writes it only if no up-to-date file exists yet
+        """
+        key = cls.create_key(image, blender_scene)
+        cls.in_use.add(key)
+
+        if key in cls.files:
+            filepath, size = cls.files[key]
+
+            if os.path.exists(filepath):
+                cls.files.move_to_end(key)
+                ExportProfiler.count('staged image cache hits')
+                return filepath
+
+            del cls.files[key]
+
+        folder = os.path.join(efutil.export_path or efutil.temp_directory(), cls.folder_name)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        file_format = blender_scene.render.image_settings.file_format
+        filename = 'luxblend_extracted_image_%s_%s.%s' % (bpy.path.clean_name(image.name), key[-1][:16],
+                                                          cls.extensions.get(file_format, file_format.lower()))
+        filepath = os.path.join(folder, filename)
+
+        with ExportProfiler.span(image.name, 'image'):
+            image.save_render(filepath, blender_scene)
+
+        ExportProfiler.count('temp image files written')
+        cls.files[key] = (filepath, os.path.getsize(filepath))
+        cls.evict()
+        return filepath
+
+    @classmethod
+    def evict(cls):
+        total_size = sum(size for filepath, size in cls.files.values())
+
+        # Files of the running export are kept, even if that exceeds the limit for a while
+        for key in [key for key in cls.files if key not in cls.in_use]:
+            if total_size <= cls.max_size:
+                break
+
+            filepath, size = cls.files.pop(key)
+            total_size -= size
+            cls.remove_file(filepath)
+
+    @classmethod
+    def scene_parsed(cls):
+        """
+        Called after the texture properties were parsed into the LuxCore scene, the staged files are not needed
+        by LuxCore anymore and may be evicted
+        """
+        cls.in_use = set()
+        cls.evict()
+
+    @classmethod
+    def clear(cls):
+        for filepath, size in cls.files.values():
+            cls.remove_file(filepath)
+
+        cls.files = collections.OrderedDict()
+        cls.in_use = set()
+
+    @staticmethod
+    def remove_file(filepath):
+        try:
+            os.remove(filepath)
+        except OSError as err:
+            print('Could not remove staged image %s: %s' % (filepath, err))
+
+    @staticmethod
+    def read_pixels(image):
+        """
+        Returns the pixels as float bytes. foreach_get() copies them into the buffer in one go (newer Blender
+        versions), slicing creates a Python float per channel and is only the fallback.
+        """
+        pixels = image.pixels
+
+        if hasattr(pixels, 'foreach_get'):
+            buffer = array.array('f', bytes(4 * len(pixels)))
+            pixels.foreach_get(buffer)
+            return buffer.tobytes()
+
+        return array.array('f', pixels[:]).tobytes()
+
+    @staticmethod
+    def create_key(image, blender_scene):
+        digest = hashlib.sha1()
+
+        packed_data = getattr(image.packed_file, 'data', None) if image.packed_file else None
+
+        if packed_data and not image.is_dirty:
+            digest.update(packed_data if isinstance(packed_data, bytes) else packed_data.encode())
+        elif image.source == 'GENERATED' and not image.is_dirty:
+            # Untouched generated images are fully described by their generation settings
+            digest.update(str((tuple(image.size), image.generated_type, tuple(image.generated_color),
+                               image.use_generated_float)).encode())
+        else:
+            # Painted or otherwise modified images: hash the pixels
+            digest.update(ImageStagingCache.read_pixels(image))
+            digest.update(str((tuple(image.size), image.channels)).encode())
+
+        # save_render() applies the colour management and output settings of the scene
+        render_settings = (
+            blender_scene.render.image_settings.file_format,
+            blender_scene.render.image_settings.color_depth,
+            blender_scene.view_settings.view_transform,
+            blender_scene.view_settings.look,
+            blender_scene.view_settings.exposure,
+            blender_scene.view_settings.gamma,
+            blender_scene.display_settings.display_device,
+        )
+        digest.update(str(render_settings).encode())
+
+        library = image.library.filepath if image.library else ''
+        return image.name, library, digest.hexdigest()
@@ -0,0 +1,192 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# --------------------------------------------------------------------------
+# Blender 2.5 LuxRender Add-On
+# --------------------------------------------------------------------------
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+Lightweight timing of the export stages. When enabled, spans and counters are collected during an export and
+written as a Chrome trace (load it in chrome://tracing or https://ui.perfetto.dev), and a summary table is
+printed to the console. When disabled, span() returns a shared no-op object, so the instrumentation costs
+almost nothing.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class _NullSpan(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _Span(object):
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ExportProfiler.add_span(self.name, self.category, self.start, time.perf_counter(), self.args)
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class ExportProfiler(object):
+    """
+    Collects timing spans and counters for one export. Usage:
+
+        ExportProfiler.begin(enabled)
+        with ExportProfiler.span('geometry'):
+            ...
+            ExportProfiler.count('vertices written', n)
+        ExportProfiler.end(trace_filepath)
+    """
+
+    enabled = False
+    start_time = 0
+    events = []
+    counters = OrderedDict()
+
+    @classmethod
+    def begin(cls, enabled=True):
+        cls.enabled = enabled
+        cls.start_time = time.perf_counter()
+        cls.events = []
+        cls.counters = OrderedDict()
+
+    @classmethod
+    def span(cls, name, category='export', **args):
+        if not cls.enabled:
+            return NULL_SPAN
+
+        return _Span(name, category, args)
+
+    @classmethod
+    def add_span(cls, name, category, start, end, args=None):
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - cls.start_time) * 1000000,
+            'dur': (end - start) * 1000000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+        }
+
+        if args:
+            event['args'] = {key: str(value) for key, value in args.items()}
+
+        cls.events.append(event)
+
+    @classmethod
+    def count(cls, name, amount=1):
+        if cls.enabled:
+            cls.counters[name] = cls.counters.get(name, 0) + amount
+
+    @classmethod
+    def get_trace(cls):
+        end_ts = (time.perf_counter() - cls.start_time) * 1000000
+        counter_events = [{
+            'name': name,
+            'cat': 'counter',
+            'ph': 'C',
+            'ts': end_ts,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': {'value': value},
+        } for name, value in cls.counters.items()]
+
+        return {
+            'traceEvents': cls.events + counter_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'counters': dict(cls.counters)},
+        }
+
+    @classmethod
+    def get_summary(cls):
+        """
+        Returns a list of (category, name, count, total seconds, max seconds), slowest first.
+        Export stages are listed by name, per-element spans (objects, materials, ...) per category.
+        """
+        totals = OrderedDict()
+
+        for event in cls.events:
+            key = (event['cat'], event['name'] if event['cat'] == 'export' else '(all)')
+            count, total, maximum = totals.get(key, (0, 0, 0))
+            totals[key] = (count + 1, total + event['dur'], max(maximum, event['dur']))
+
+        summary = [(cat, name, count, total / 1000000, maximum / 1000000)
+                   for (cat, name), (count, total, maximum) in totals.items()]
+        summary.sort(key=lambda row: row[3], reverse=True)
+        return summary
+
+    @classmethod
+    def print_summary(cls):
+        print('\nExport profile:')
+        print('%-10s %-32s %8s %10s %10s' % ('Category', 'Span', 'Count', 'Total (s)', 'Max (s)'))
+
+        for cat, name, count, total, maximum in cls.get_summary():
+            print('%-10s %-32s %8d %10.3f %10.3f' % (cat, name[:32], count, total, maximum))
+
+        for name, value in cls.counters.items():
+            print('%-43s %8d' % (name, value))
+
+        slowest = sorted((event for event in cls.events if event['cat'] != 'export'),
+                         key=lambda event: event['dur'], reverse=True)[:10]
+
+        if slowest:
+            print('\nSlowest elements:')
+
+            for event in slowest:
+                print('%-10s %-32s %8s %10.3f' % (event['cat'], event['name'][:32], '', event['dur'] / 1000000))
+
+    @classmethod
+    def end(cls, filepath=None):
+        """
+        Stop collecting, print the summary and write the trace to filepath (if given)
+        """
+        if not cls.enabled:
+            return
+
+        cls.enabled = False
+        cls.print_summary()
+
+        if filepath:
+            try:
+                with open(filepath, 'w') as trace_file:
+                    json.dump(cls.get_trace(), trace_file)
+
+                print('Export trace written to %s' % filepath)
+            except OSError as err:
+                print('Could not write export trace %s: %s' % (filepath, err))
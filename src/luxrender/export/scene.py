@@ -40,10 +40,10 @@ from ..export import geometry        as export_geometry
 from ..export import volumes        as export_volumes
 from ..export import fix_matrix_order
 from ..export import is_obj_visible
+from ..export.profiling import ExportProfiler
 from ..outputs import LuxManager, LuxLog
 from ..outputs.file_api import Files
 from ..outputs.pure_api import LUXRENDER_VERSION
-from ..properties import find_node
 
 
 class SceneExporterProperties(object):
@@ -75,70 +75,6 @@ class SceneExporter(object):
     def report(self, type, message):
         LuxLog('%s: %s' % ('|'.join([('%s' % i).upper() for i in type]), message))
 
-    def object_is_lit(self, GE, obj):
-
-        have_lamp = False
-        have_emitter = False
-
-        if obj.type == 'LAMP' and is_obj_visible(self.scene, obj):
-            lamp_enabled = export_lights.checkLightEnabled(self.scene, obj.data)
-            lamp_enabled &= obj.data.energy > 0.0
-
-            if obj.data.type == 'POINT':
-                lamp_enabled &= obj.data.luxrender_lamp.luxrender_lamp_point.L_color.v > 0.0
-
-            if obj.data.type == 'SPOT':
-                lamp_enabled &= obj.data.luxrender_lamp.luxrender_lamp_spot.L_color.v > 0.0
-
-            if obj.data.type == 'HEMI':
-                lamp_enabled &= obj.data.luxrender_lamp.luxrender_lamp_hemi.L_color.v > 0.0
-
-            if obj.data.type == 'AREA':
-                lamp_enabled &= obj.data.luxrender_lamp.luxrender_lamp_area.L_color.v > 0.0
-                lamp_enabled &= obj.data.luxrender_lamp.luxrender_lamp_area.power > 0.0
-                lamp_enabled &= obj.data.luxrender_lamp.luxrender_lamp_area.efficacy > 0.0
-
-            have_lamp |= lamp_enabled
-
-        if obj.type in ['MESH', 'SURFACE', 'CURVE', 'FONT', 'META'] and is_obj_visible(self.scene, obj):
-            for ms in obj.material_slots:
-                mat = ms.material
-
-                if mat and mat.luxrender_emission.use_emission:
-                    emit_enabled = self.scene.luxrender_lightgroups.is_enabled(mat.luxrender_emission.lightgroup)
-                    emit_enabled &= (mat.luxrender_emission.L_color.v * mat.luxrender_emission.gain) > 0.0
-                    have_emitter |= emit_enabled
-
-                    if have_emitter:
-                        break
-
-                if mat.luxrender_material.nodetree:
-                    output_node = find_node(mat, 'luxrender_material_output_node')
-
-                    if output_node is not None:
-                        light_socket = output_node.inputs['Emission']
-
-                        if light_socket.is_linked:
-                            have_emitter = light_socket.is_linked
-
-        if have_lamp or have_emitter:
-            return True
-
-        return False
-
-    def scene_is_lit(self, GE):
-
-        for obj in self.scene.objects:
-            if self.object_is_lit(GE, obj):
-                return True
-
-        for grp in bpy.data.groups:
-            for obj in list(grp.objects):
-                if self.object_is_lit(GE, obj):
-                    return True
-
-        return False
-
     def export(self):
         scene = self.scene
 
@@ -146,6 +82,8 @@ class SceneExporter(object):
             if scene is None:
                 raise Exception('Scene is not valid for export to %s' % self.properties.filename)
 
+            ExportProfiler.begin(scene.luxrender_testing.profile_export)
+
             # Force scene update; NB, scene.update() doesn't work
             scene.frame_set(scene.frame_current)
 
@@ -165,9 +103,6 @@ class SceneExporter(object):
 
             GE = export_geometry.GeometryExporter(lux_context, scene)
 
-            if not self.scene_is_lit(GE):
-                raise Exception('Scene is not lit!')
-
             if self.properties.filename.endswith('.lxs'):
                 self.properties.filename = self.properties.filename[:-4]
 
@@ -215,41 +150,40 @@ class SceneExporter(object):
                 lux_context.set_output_file(Files.MAIN)
 
             # Set up render engine parameters
-            lux_context.renderer(*scene.luxrender_rendermode.api_output())
-            lux_context.sampler(*scene.luxrender_sampler.api_output())
-            lux_context.accelerator(*scene.luxrender_accelerator.api_output())
-            lux_context.surfaceIntegrator(*scene.luxrender_integrator.api_output(scene))
-            lux_context.volumeIntegrator(*scene.luxrender_volumeintegrator.api_output())
-            lux_context.pixelFilter(*scene.luxrender_filter.api_output())
+            with ExportProfiler.span('render settings'):
+                lux_context.renderer(*scene.luxrender_rendermode.api_output())
+                lux_context.sampler(*scene.luxrender_sampler.api_output())
+                lux_context.accelerator(*scene.luxrender_accelerator.api_output())
+                lux_context.surfaceIntegrator(*scene.luxrender_integrator.api_output(scene))
+                lux_context.volumeIntegrator(*scene.luxrender_volumeintegrator.api_output())
+                lux_context.pixelFilter(*scene.luxrender_filter.api_output())
 
             # Set up camera, view and film
-            is_cam_animated = False
+            with ExportProfiler.span('camera'):
+                is_cam_animated = False
 
-            if scene.camera.data.luxrender_camera.usemblur and scene.camera.data.luxrender_camera.cammblur:
+                if scene.camera.data.luxrender_camera.usemblur and scene.camera.data.luxrender_camera.cammblur:
 
-                STEPS = scene.camera.data.luxrender_camera.motion_blur_samples
-                anim_matrices = object_anim_matrices(scene, scene.camera, steps=STEPS)
+                    STEPS = scene.camera.data.luxrender_camera.motion_blur_samples
+                    anim_matrices = object_anim_matrices(scene, scene.camera, steps=STEPS)
 
-                if anim_matrices:
-                    num_steps = len(anim_matrices) - 1
-                    fsps = float(num_steps) * scene.render.fps / scene.render.fps_base
-                    step_times = [(i) / fsps for i in range(0, num_steps + 1)]
-                    lux_context.motionBegin(step_times)
+                    if anim_matrices:
+                        num_steps = len(anim_matrices) - 1
+                        fsps = float(num_steps) * scene.render.fps / scene.render.fps_base
+                        step_times = [(i) / fsps for i in range(0, num_steps + 1)]
+                        lux_context.motionBegin(step_times)
 
-                    for m in anim_matrices:
-                        lux_context.lookAt(*scene.camera.data.luxrender_camera.lookAt(scene.camera, m))
+                        for m in anim_matrices:
+                            lux_context.lookAt(*scene.camera.data.luxrender_camera.lookAt(scene.camera, m))
 
-                    lux_context.motionEnd()
-                    is_cam_animated = True
+                        lux_context.motionEnd()
+                        is_cam_animated = True
 
-            if not is_cam_animated:
-                lux_context.lookAt(*scene.camera.data.luxrender_camera.lookAt(scene.camera))
+                if not is_cam_animated:
+                    lux_context.lookAt(*scene.camera.data.luxrender_camera.lookAt(scene.camera))
 
-            lux_context.camera(*scene.camera.data.luxrender_camera.api_output(scene, is_cam_animated))
-            lux_context.film(*scene.camera.data.luxrender_camera.luxrender_film.api_output())
-
-            lux_context.worldBegin()
-            lights_in_export = False
+                lux_context.camera(*scene.camera.data.luxrender_camera.api_output(scene, is_cam_animated))
+                lux_context.film(*scene.camera.data.luxrender_camera.luxrender_film.api_output())
 
             # Find linked 'background_set' scenes
             geom_scenes = [scene]
@@ -259,25 +193,45 @@ class SceneExporter(object):
                 s = s.background_set
                 geom_scenes.append(s)
 
+            # Every background scene gets its own geometry file, included by the main file
+            geometry_files = {}
+            if self.properties.api_type == 'FILE':
+                for geom_scene in geom_scenes[1:]:
+                    geometry_files[geom_scene] = lux_context.add_geometry_file(geom_scene, scene.frame_current)
+
+            lux_context.worldBegin()
+            lights_in_export = False
+
             # Make sure lamp textures go back into main file, not geom file
             if self.properties.api_type in ['FILE']:
                 lux_context.set_output_file(Files.MAIN)
 
-            # Export all data in linked 'background_set' scenes
-            for geom_scene in geom_scenes:
-                if len(geom_scene.luxrender_volumes.volumes) > 0:
-                    self.report({'INFO'}, 'Exporting volume data')
-                    if self.properties.api_type == 'FILE':
-                        lux_context.set_output_file(Files.MATS)
+            # Export all data in linked 'background_set' scenes. Blender data is read on this thread,
+            # PLY files are written by the writer pool of GE in the meantime.
+            try:
+                for geom_scene in geom_scenes:
+                    if len(geom_scene.luxrender_volumes.volumes) > 0:
+                        self.report({'INFO'}, 'Exporting volume data')
+                        if self.properties.api_type == 'FILE':
+                            lux_context.set_output_file(Files.MATS)
 
-                    for volume in geom_scene.luxrender_volumes.volumes:
-                        lux_context.makeNamedVolume(volume.name, *volume.api_output(lux_context))
+                        with ExportProfiler.span('volumes', scene=geom_scene.name):
+                            for volume in geom_scene.luxrender_volumes.volumes:
+                                lux_context.makeNamedVolume(volume.name, *volume.api_output(lux_context))
 
-                self.report({'INFO'}, 'Exporting geometry')
+                    self.report({'INFO'}, 'Exporting geometry')
+                    if self.properties.api_type == 'FILE':
+                        lux_context.set_geometry_file(geometry_files.get(geom_scene, Files.GEOM))
+                        lux_context.set_output_file(Files.GEOM)
+
+                    with ExportProfiler.span('geometry', scene=geom_scene.name):
+                        lights_in_export |= GE.iterateScene(geom_scene)
+            finally:
                 if self.properties.api_type == 'FILE':
-                    lux_context.set_output_file(Files.GEOM)
+                    lux_context.set_geometry_file(Files.GEOM)
 
-                lights_in_export |= GE.iterateScene(geom_scene)
+                with ExportProfiler.span('PLY writing'):
+                    GE.writer_pool.shutdown()
 
             for geom_scene in geom_scenes:
                 # Make sure lamp textures go back into main file, not geom file
@@ -285,10 +239,12 @@ class SceneExporter(object):
                     lux_context.set_output_file(Files.MAIN)
 
                 self.report({'INFO'}, 'Exporting lights')
-                lights_in_export |= export_lights.lights(lux_context, geom_scene, scene, GE.ExportedMeshes)
+                with ExportProfiler.span('lights', scene=geom_scene.name):
+                    lights_in_export |= export_lights.lights(lux_context, geom_scene, scene, GE.ExportedMeshes)
 
+            # Lamps and emitters are detected while exporting them, there is no separate pass over the scene
             if not lights_in_export:
-                raise Exception('No lights in exported data!')
+                raise Exception('Scene is not lit!')
 
             # Default 'Camera' Exterior
             if scene.camera.data.luxrender_camera.Exterior_volume:
@@ -302,10 +258,13 @@ class SceneExporter(object):
             if created_lux_manager:
                 LM.reset()
 
+            ExportProfiler.end(lxs_filename + '.trace.json')
+
             self.report({'INFO'}, 'Export finished')
             return {'FINISHED'}
 
         except Exception as err:
+            ExportProfiler.end()
             self.report({'ERROR'}, 'Export aborted: %s' % err)
             import traceback
 
@@ -27,7 +27,7 @@
 # System Libs
 from __future__ import division
 from ctypes import cdll, c_uint, c_float, cast, POINTER, byref, sizeof
-import os, struct, sys, time
+import array, collections, os, struct, sys, time
 
 # Blender Libs
 import bpy
@@ -37,6 +37,7 @@ from ..extensions_framework import util as efutil
 from . import ParamSet, matrix_to_list, LuxManager
 from ..outputs import LuxLog
 from ..outputs.file_api import Files
+from .profiling import ExportProfiler
 
 
 class library_loader():
@@ -641,30 +642,94 @@ class SmokeCache(object):
     Only speeds up viewport updates that are not related to volume updates (e.g. when a material in the scene is edited,
     this cache prevents that smoke is re-exported and pyluxcore.Properties are set just to check for volume updates.
     The really expensive operation is *not* the smoke export, but the Property setting.)
+    Whether the data of a texture has to be set is tracked per texture. Several textures that use the same domain
+    and channel share one converted grid, only the first of them reads the smoke cache file.
+    Grids are kept as float arrays (4 bytes per cell instead of a list of Python floats). Their total size is limited
+    to max_size bytes (luxcore_translatorsettings.smoke_cache_size), the least recently used grids are dropped first.
     """
-    cache = {}
+    max_size = 512 * 1024 * 1024
+    size = 0
+
+    # key -> (nx, ny, nz, array of cell values), least recently used first
+    cache = collections.OrderedDict()
+    # LuxCore texture name -> key of the grid that was last set as its data
+    exported = {}
+
+    hits = 0
+    misses = 0
+    evictions = 0
 
     @classmethod
-    def convert(cls, blender_scene, smoke_obj_name, channel):
+    def convert(cls, blender_scene, smoke_obj_name, channel, texture_name):
+        """
+        Returns the grid (nx, ny, nz, cell values) for the texture texture_name, from the cache if another
+        texture already converted it
+        """
+        cls.max_size = blender_scene.luxcore_translatorsettings.smoke_cache_size * 1024 * 1024
         key = cls.create_key(blender_scene, smoke_obj_name, channel)
+        cls.exported[texture_name] = key
+
+        if key in cls.cache:
+            cls.cache.move_to_end(key)
+            cls.hits += 1
+            ExportProfiler.count('smoke cache hits')
+
+            nx, ny, nz, data = cls.cache[key]
+            # pyluxcore.Property() only accepts lists
+            return nx, ny, nz, data.tolist() if isinstance(data, array.array) else data
 
-        if key not in cls.cache:
-            cls.cache[key] = export_smoke(smoke_obj_name, channel)
+        cls.misses += 1
+        ExportProfiler.count('smoke cache misses')
 
-        return cls.cache[key]
+        grid = export_smoke(smoke_obj_name, channel)
+        cls.add(key, grid)
+        return grid
+
+    @classmethod
+    def add(cls, key, grid):
+        nx, ny, nz, data = grid
+
+        if isinstance(data, list):
+            data = array.array('f', data)
+
+        size = cls.get_size(data)
+
+        if key in cls.cache:
+            cls.size -= cls.get_size(cls.cache.pop(key)[3])
+
+        if size > cls.max_size:
+            return
+
+        cls.cache[key] = (nx, ny, nz, data)
+        cls.size += size
+
+        while cls.size > cls.max_size:
+            _, removed = cls.cache.popitem(last=False)
+            cls.size -= cls.get_size(removed[3])
+            cls.evictions += 1
+            ExportProfiler.count('smoke cache evictions')
+
+    @staticmethod
+    def get_size(data):
+        # Size of the cell values in bytes, the preview grid is a single float
+        return len(data) * data.itemsize if isinstance(data, array.array) else 0
 
     @classmethod
     def reset(cls):
-        cls.cache = {}
+        cls.cache = collections.OrderedDict()
+        cls.exported = {}
+        cls.size = 0
 
     @classmethod
-    def needs_update(cls, blender_scene, smoke_obj_name, channel):
-        key = cls.create_key(blender_scene, smoke_obj_name, channel)
-        return key not in cls.cache
+    def needs_update(cls, blender_scene, smoke_obj_name, channel, texture_name):
+        """
+        True if the grid data of the texture texture_name has not been set for the current frame yet
+        """
+        return cls.exported.get(texture_name) != cls.create_key(blender_scene, smoke_obj_name, channel)
 
     @staticmethod
     def create_key(blender_scene, smoke_obj_name, channel):
-        return blender_scene.name + smoke_obj_name + channel + str(blender_scene.frame_current)
+        return blender_scene.name, smoke_obj_name, channel, blender_scene.frame_current
 
 
 def export_smoke(smoke_obj_name, channel):
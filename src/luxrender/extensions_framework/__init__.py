@@ -28,7 +28,7 @@ import time
 
 import bpy
 
-from ..extensions_framework.ui import EF_OT_msg
+from ..extensions_framework.ui import EF_OT_msg, build_property_lookup
 
 bpy.utils.register_class(EF_OT_msg)
 del EF_OT_msg
@@ -62,76 +62,75 @@ def init_properties(obj, props, cache=True):
 
     """
 
-    if not obj in added_property_cache.keys():
-        added_property_cache[obj] = []
+    added_attrs = added_property_cache.setdefault(obj, set())
 
     for prop in props:
         try:
-            if cache and prop['attr'] in added_property_cache[obj]:
+            if cache and prop['attr'] in added_attrs:
                 continue
 
             if prop['type'] == 'bool':
                 t = bpy.props.BoolProperty
-                a = {k: v for k, v in prop.items() if k in ["name",
-                                                            "description", "default", "options", "subtype", "update"]}
+                a = {k: v for k, v in prop.items() if k in {"name",
+                                                            "description", "default", "options", "subtype", "update"}}
             elif prop['type'] == 'bool_vector':
                 t = bpy.props.BoolVectorProperty
-                a = {k: v for k, v in prop.items() if k in ["name",
+                a = {k: v for k, v in prop.items() if k in {"name",
                                                             "description", "default", "options", "subtype", "size",
-                                                            "update"]}
+                                                            "update"}}
             elif prop['type'] == 'collection':
                 t = bpy.props.CollectionProperty
-                a = {k: v for k, v in prop.items() if k in ["ptype", "name",
-                                                            "description", "default", "options"]}
+                a = {k: v for k, v in prop.items() if k in {"ptype", "name",
+                                                            "description", "default", "options"}}
                 a['type'] = a['ptype']
                 del a['ptype']
             elif prop['type'] == 'enum':
                 t = bpy.props.EnumProperty
-                a = {k: v for k, v in prop.items() if k in ["items", "name",
-                                                            "description", "default", "options", "update"]}
+                a = {k: v for k, v in prop.items() if k in {"items", "name",
+                                                            "description", "default", "options", "update"}}
             elif prop['type'] == 'float':
                 t = bpy.props.FloatProperty
-                a = {k: v for k, v in prop.items() if k in ["name",
+                a = {k: v for k, v in prop.items() if k in {"name",
                                                             "description", "default", "min", "max", "soft_min",
                                                             "soft_max",
                                                             "step", "precision", "options", "subtype", "unit",
-                                                            "update"]}
+                                                            "update"}}
             elif prop['type'] == 'float_vector':
                 t = bpy.props.FloatVectorProperty
-                a = {k: v for k, v in prop.items() if k in ["name",
+                a = {k: v for k, v in prop.items() if k in {"name",
                                                             "description", "default", "min", "max", "soft_min",
                                                             "soft_max",
                                                             "step", "precision", "options", "subtype", "size",
-                                                            "update"]}
+                                                            "update"}}
             elif prop['type'] == 'int':
                 t = bpy.props.IntProperty
-                a = {k: v for k, v in prop.items() if k in ["name",
+                a = {k: v for k, v in prop.items() if k in {"name",
                                                             "description", "default", "min", "max", "soft_min",
                                                             "soft_max",
-                                                            "step", "options", "subtype", "update"]}
+                                                            "step", "options", "subtype", "update"}}
             elif prop['type'] == 'int_vector':
                 t = bpy.props.IntVectorProperty
-                a = {k: v for k, v in prop.items() if k in ["name",
+                a = {k: v for k, v in prop.items() if k in {"name",
                                                             "description", "default", "min", "max", "soft_min",
                                                             "soft_max",
-                                                            "options", "subtype", "size", "update"]}
+                                                            "options", "subtype", "size", "update"}}
             elif prop['type'] == 'pointer':
                 t = bpy.props.PointerProperty
-                a = {k: v for k, v in prop.items() if k in ["ptype", "name",
-                                                            "description", "options", "update"]}
+                a = {k: v for k, v in prop.items() if k in {"ptype", "name",
+                                                            "description", "options", "update"}}
                 a['type'] = a['ptype']
                 del a['ptype']
             elif prop['type'] == 'string':
                 t = bpy.props.StringProperty
-                a = {k: v for k, v in prop.items() if k in ["name",
+                a = {k: v for k, v in prop.items() if k in {"name",
                                                             "description", "default", "maxlen", "options", "subtype",
-                                                            "update"]}
+                                                            "update"}}
             else:
                 continue
 
             setattr(obj, prop['attr'], t(**a))
 
-            added_property_cache[obj].append(prop['attr'])
+            added_attrs.add(prop['attr'])
         except KeyError:
             # Silently skip invalid entries in props
             continue
@@ -167,6 +166,13 @@ class declarative_property_group(bpy.types.PropertyGroup):
     """
     ef_attach_to = []
 
+    """Maps each attr in the properties list to its definition, so that
+    a property_group_renderer does not have to search the list for every
+    control it draws. Built by initialise_properties.
+
+    """
+    ef_property_lookup = None
+
     @classmethod
     def initialise_properties(cls):
         """This is a function that should be called on
@@ -195,6 +201,7 @@ class declarative_property_group(bpy.types.PropertyGroup):
                                                     }], cache=False)
 
             init_properties(cls, cls.properties, cache=False)
+            cls.ef_property_lookup = build_property_lookup(cls.properties)
             cls.ef_initialised = True
 
         return cls
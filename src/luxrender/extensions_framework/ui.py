@@ -27,7 +27,7 @@
 import bpy
 
 from types import *
-from ..extensions_framework.validate import Logician
+from ..extensions_framework.validate import compile_logic
 
 
 class EF_OT_msg(bpy.types.Operator):
@@ -58,6 +58,59 @@ def _get_item_from_context(context, path):
     return context
 
 
+def build_property_lookup(props):
+    """Map each 'attr' in a declarative props list to the list of its
+    definitions, in the order of props. An attr that is listed more than
+    once is drawn once for every definition.
+
+    """
+    lookup = {}
+    for prop in props:
+        if 'attr' in prop:
+            lookup.setdefault(prop['attr'], []).append(prop)
+    return lookup
+
+
+def _get_property_lookup(property_group):
+    """Return the attr -> definition dict for the property_group's class.
+    It is normally built by declarative_property_group.initialise_properties,
+    groups that were not initialised that way get one on first draw.
+
+    """
+    cls = type(property_group)
+    lookup = cls.__dict__.get('ef_property_lookup')
+
+    if lookup is None:
+        lookup = build_property_lookup(property_group.properties)
+        cls.ef_property_lookup = lookup
+
+    return lookup
+
+
+"""Compiled visibility/enabled/alert rules, keyed by the id of the rules
+dict and the property name. The original logic is kept alongside so that
+rules which are replaced at runtime (e.g. texture variant alerts) are
+compiled again.
+
+"""
+_compiled_rules = {}
+
+
+def _test_rule(property_group, rules, lookup_property, default):
+    if lookup_property not in rules:
+        return default
+
+    logic = rules[lookup_property]
+    key = (id(rules), lookup_property)
+    compiled = _compiled_rules.get(key)
+
+    if compiled is None or compiled[0] is not logic:
+        compiled = (logic, compile_logic(logic))
+        _compiled_rules[key] = compiled
+
+    return compiled[1](property_group, getattr(property_group, lookup_property, None))
+
+
 class property_group_renderer(bpy.types.Panel):
     """Mix-in class for sub-classes of bpy.types.Panel. This class
     will provide the draw() method which implements drawing one or
@@ -108,54 +161,19 @@ class property_group_renderer(bpy.types.Panel):
 
     def check_visibility(self, lookup_property, property_group):
         """Determine if the lookup_property should be drawn in the Panel"""
-        vt = Logician(property_group)
-
-        if lookup_property in property_group.visibility.keys():
-            if hasattr(property_group, lookup_property):
-                member = getattr(property_group, lookup_property)
-            else:
-                member = None
-
-            return vt.test_logic(member,
-                                 property_group.visibility[lookup_property])
-        else:
-            return True
+        return _test_rule(property_group, property_group.visibility, lookup_property, True)
 
     def check_enabled(self, lookup_property, property_group):
         """Determine if the lookup_property should be enabled in the Panel"""
-        et = Logician(property_group)
-
-        if lookup_property in property_group.enabled.keys():
-            if hasattr(property_group, lookup_property):
-                member = getattr(property_group, lookup_property)
-            else:
-                member = None
-
-            return et.test_logic(member,
-                                 property_group.enabled[lookup_property])
-        else:
-            return True
+        return _test_rule(property_group, property_group.enabled, lookup_property, True)
 
     def check_alert(self, lookup_property, property_group):
         """Determine if the lookup_property should be in an alert state in the Panel"""
-        et = Logician(property_group)
-
-        if lookup_property in property_group.alert.keys():
-            if hasattr(property_group, lookup_property):
-                member = getattr(property_group, lookup_property)
-            else:
-                member = None
-            return et.test_logic(member,
-                                 property_group.alert[lookup_property])
-        else:
-            return False
+        return _test_rule(property_group, property_group.alert, lookup_property, False)
 
     def is_real_property(self, lookup_property, property_group):
-        for prop in property_group.properties:
-            if prop['attr'] == lookup_property:
-                return prop['type'] not in ['text', 'prop_search']
-
-        return False
+        props = _get_property_lookup(property_group).get(lookup_property)
+        return props is not None and props[0]['type'] not in ['text', 'prop_search']
 
     def draw_column(self, control_list_item, layout, context,
                     supercontext=None, property_group=None):
@@ -187,29 +205,63 @@ class property_group_renderer(bpy.types.Panel):
                                      property_group)
         else:
             if self.check_visibility(control_list_item, property_group):
-                for current_property in property_group.properties:
-                    if current_property['attr'] == control_list_item:
-                        current_property_keys = current_property.keys()
-                        sub_layout_created = False
-
-                        if not self.check_enabled(control_list_item, property_group):
+                for current_property in _get_property_lookup(property_group).get(control_list_item, []):
+                    current_property_keys = current_property.keys()
+                    sub_layout_created = False
+
+                    if not self.check_enabled(control_list_item, property_group):
+                        last_layout = layout
+                        sub_layout_created = True
+                        layout = layout.row()
+                        layout.enabled = False
+
+                    if self.check_alert(control_list_item, property_group):
+                        if not sub_layout_created:
                             last_layout = layout
                             sub_layout_created = True
-                            layout = layout.row()
-                            layout.enabled = False
-
-                        if self.check_alert(control_list_item, property_group):
-                            if not sub_layout_created:
-                                last_layout = layout
-                                sub_layout_created = True
 
-                            layout = layout.row()
-                            layout.alert = True
-
-                        # XXX: tomb: this is a very weird way of doing it - what about
-                        # just foo=current_property.get(key, default_value)?
-                        if 'type' in current_property_keys:
-                            if current_property['type'] in ['int', 'float', 'float_vector', 'string']:
+                        layout = layout.row()
+                        layout.alert = True
+
+                    # XXX: tomb: this is a very weird way of doing it - what about
+                    # just foo=current_property.get(key, default_value)?
+                    if 'type' in current_property_keys:
+                        if current_property['type'] in ['int', 'float', 'float_vector', 'string']:
+                            layout.prop(
+                                property_group,
+                                control_list_item,
+                                text=current_property['name'],
+                                expand=current_property['expand']
+                                    if 'expand' in current_property_keys
+                                    else False,
+                                slider=current_property['slider']
+                                    if 'slider' in current_property_keys
+                                    else False,
+                                toggle=current_property['toggle']
+                                    if 'toggle' in current_property_keys
+                                    else False,
+                                icon_only=current_property['icon_only']
+                                    if 'icon_only' in current_property_keys
+                                    else False,
+                                event=current_property['event']
+                                    if 'event' in current_property_keys
+                                    else False,
+                                full_event=current_property['full_event']
+                                    if 'full_event' in current_property_keys
+                                    else False,
+                                emboss=current_property['emboss']
+                                    if 'emboss' in current_property_keys
+                                    else True,
+                            )
+
+                        if current_property['type'] in ['enum']:
+                            if 'use_menu' in current_property_keys and current_property['use_menu']:
+                                layout.prop_menu_enum(
+                                    property_group,
+                                    control_list_item,
+                                    text=current_property['name']
+                                )
+                            else:
                                 layout.prop(
                                     property_group,
                                     control_list_item,
@@ -236,133 +288,97 @@ class property_group_renderer(bpy.types.Panel):
                                         if 'emboss' in current_property_keys
                                         else True,
                                 )
+                        if current_property['type'] in ['bool']:
+                            layout.prop(
+                                property_group,
+                                control_list_item,
+                                text=current_property['name'],
+                                toggle=current_property['toggle']
+                                    if 'toggle' in current_property_keys
+                                    else False,
+                                icon_only=current_property['icon_only']
+                                    if 'icon_only' in current_property_keys
+                                    else False,
+                                event=current_property['event']
+                                    if 'event' in current_property_keys
+                                    else False,
+                                full_event=current_property['full_event']
+                                    if 'full_event' in current_property_keys
+                                    else False,
+                                emboss=current_property['emboss']
+                                    if 'emboss' in current_property_keys
+                                    else True,
+                                icon=current_property['icon']
+                                    if 'icon' in current_property_keys
+                                    else 'NONE',
+                            )
+                        elif current_property['type'] in ['operator']:
+                            args = {}
+                            for optional_arg in ('text', 'icon'):
+                                if optional_arg in current_property_keys:
+                                    args.update({
+                                        optional_arg: current_property[optional_arg],
+                                    })
+                            layout.operator(current_property['operator'], **args)
+
+                        elif current_property['type'] in ['menu']:
+                            args = {}
+                            for optional_arg in ('text', 'icon'):
+                                if optional_arg in current_property_keys:
+                                    args.update({
+                                        optional_arg: current_property[optional_arg],
+                                    })
+                            layout.menu(current_property['menu'], **args)
+
+                        elif current_property['type'] in ['text']:
+                            layout.label(
+                                text=current_property['name'],
+                                icon=current_property['icon']
+                                    if 'icon' in current_property_keys
+                                    else 'NONE'
+                            )
+
+                        elif current_property['type'] in ['template_list']:
+                            layout.template_list("UI_UL_list", current_property['src_attr'],  # Use that as uid...
+                                                 current_property['src'](supercontext, context),
+                                                 current_property['src_attr'],
+                                                 current_property['trg'](supercontext, context),
+                                                 current_property['trg_attr'],
+                                                 rows=4 \
+                                                     if not 'rows' in current_property_keys \
+                                                     else current_property['rows'],
+                                                 maxrows=4 \
+                                                     if not 'rows' in current_property_keys \
+                                                     else current_property['rows'],
+                                                 type='DEFAULT' \
+                                                     if not 'list_type' in current_property_keys \
+                                                     else current_property['list_type']
+                            )
+
+                        elif current_property['type'] in ['prop_search']:
+                            layout.prop_search(
+                                current_property['trg'](supercontext,
+                                                        context),
+                                current_property['trg_attr'],
+                                current_property['src'](supercontext,
+                                                        context),
+                                current_property['src_attr'],
+                                text=current_property['name'],
+                                icon=current_property['icon'] if 'icon' in current_property_keys else 'NONE'
+                            )
+
+                        elif current_property['type'] in ['ef_callback']:
+                            getattr(self, current_property['method'])(supercontext)
+
+                        elif current_property['type'] in ['separator']:
+                            layout.separator()
+                    else:
+                        layout.prop(property_group, control_list_item)
+
+                    if sub_layout_created:
+                        layout = last_layout
+
+                    # Fire a draw callback if specified
+                    if 'draw' in current_property_keys:
+                        current_property['draw'](supercontext, context)
 
-                            if current_property['type'] in ['enum']:
-                                if 'use_menu' in current_property_keys and current_property['use_menu']:
-                                    layout.prop_menu_enum(
-                                        property_group,
-                                        control_list_item,
-                                        text=current_property['name']
-                                    )
-                                else:
-                                    layout.prop(
-                                        property_group,
-                                        control_list_item,
-                                        text=current_property['name'],
-                                        expand=current_property['expand']
-                                            if 'expand' in current_property_keys
-                                            else False,
-                                        slider=current_property['slider']
-                                            if 'slider' in current_property_keys
-                                            else False,
-                                        toggle=current_property['toggle']
-                                            if 'toggle' in current_property_keys
-                                            else False,
-                                        icon_only=current_property['icon_only']
-                                            if 'icon_only' in current_property_keys
-                                            else False,
-                                        event=current_property['event']
-                                            if 'event' in current_property_keys
-                                            else False,
-                                        full_event=current_property['full_event']
-                                            if 'full_event' in current_property_keys
-                                            else False,
-                                        emboss=current_property['emboss']
-                                            if 'emboss' in current_property_keys
-                                            else True,
-                                    )
-                            if current_property['type'] in ['bool']:
-                                layout.prop(
-                                    property_group,
-                                    control_list_item,
-                                    text=current_property['name'],
-                                    toggle=current_property['toggle']
-                                        if 'toggle' in current_property_keys
-                                        else False,
-                                    icon_only=current_property['icon_only']
-                                        if 'icon_only' in current_property_keys
-                                        else False,
-                                    event=current_property['event']
-                                        if 'event' in current_property_keys
-                                        else False,
-                                    full_event=current_property['full_event']
-                                        if 'full_event' in current_property_keys
-                                        else False,
-                                    emboss=current_property['emboss']
-                                        if 'emboss' in current_property_keys
-                                        else True,
-                                    icon=current_property['icon']
-                                        if 'icon' in current_property_keys
-                                        else 'NONE',
-                                )
-                            elif current_property['type'] in ['operator']:
-                                args = {}
-                                for optional_arg in ('text', 'icon'):
-                                    if optional_arg in current_property_keys:
-                                        args.update({
-                                            optional_arg: current_property[optional_arg],
-                                        })
-                                layout.operator(current_property['operator'], **args)
-
-                            elif current_property['type'] in ['menu']:
-                                args = {}
-                                for optional_arg in ('text', 'icon'):
-                                    if optional_arg in current_property_keys:
-                                        args.update({
-                                            optional_arg: current_property[optional_arg],
-                                        })
-                                layout.menu(current_property['menu'], **args)
-
-                            elif current_property['type'] in ['text']:
-                                layout.label(
-                                    text=current_property['name'],
-                                    icon=current_property['icon']
-                                        if 'icon' in current_property_keys
-                                        else 'NONE'
-                                )
-
-                            elif current_property['type'] in ['template_list']:
-                                layout.template_list("UI_UL_list", current_property['src_attr'],  # Use that as uid...
-                                                     current_property['src'](supercontext, context),
-                                                     current_property['src_attr'],
-                                                     current_property['trg'](supercontext, context),
-                                                     current_property['trg_attr'],
-                                                     rows=4 \
-                                                         if not 'rows' in current_property_keys \
-                                                         else current_property['rows'],
-                                                     maxrows=4 \
-                                                         if not 'rows' in current_property_keys \
-                                                         else current_property['rows'],
-                                                     type='DEFAULT' \
-                                                         if not 'list_type' in current_property_keys \
-                                                         else current_property['list_type']
-                                )
-
-                            elif current_property['type'] in ['prop_search']:
-                                layout.prop_search(
-                                    current_property['trg'](supercontext,
-                                                            context),
-                                    current_property['trg_attr'],
-                                    current_property['src'](supercontext,
-                                                            context),
-                                    current_property['src_attr'],
-                                    text=current_property['name'],
-                                    icon=current_property['icon'] if 'icon' in current_property_keys else 'NONE'
-                                )
-
-                            elif current_property['type'] in ['ef_callback']:
-                                getattr(self, current_property['method'])(supercontext)
-
-                            elif current_property['type'] in ['separator']:
-                                layout.separator()
-                        else:
-                            layout.prop(property_group, control_list_item)
-
-                        if sub_layout_created:
-                            layout = last_layout
-
-                        # Fire a draw callback if specified
-                        if 'draw' in current_property_keys:
-                            current_property['draw'](supercontext, context)
-
-                        break
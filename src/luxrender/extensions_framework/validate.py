@@ -224,6 +224,116 @@ class Logician(object):
             print('member %s is %s' % (member_name, result))
 
 
+OPERATOR_TESTS = {
+    'eq': lambda member, operand: member == operand,
+    '==': lambda member, operand: member == operand,
+    'not': lambda member, operand: member != operand,
+    '!=': lambda member, operand: member != operand,
+    'lt': lambda member, operand: member < operand,
+    '<': lambda member, operand: member < operand,
+    'lte': lambda member, operand: member <= operand,
+    '<=': lambda member, operand: member <= operand,
+    'gt': lambda member, operand: member > operand,
+    '>': lambda member, operand: member > operand,
+    'gte': lambda member, operand: member >= operand,
+    '>=': lambda member, operand: member >= operand,
+    'and': lambda member, operand: member & operand,
+    '&': lambda member, operand: member & operand,
+    'or': lambda member, operand: member | operand,
+    '|': lambda member, operand: member | operand,
+    'len': lambda member, operand: len(member) == operand,
+}
+
+
+def compile_member(member_name):
+    """Return a function(subject) that reads member_name in the same
+    way as Logician.get_member(). Absolute references are parsed once.
+    """
+    if member_name.count('.') > 0:
+        code = compile(member_name, '<logic>', 'eval')
+
+        def get_member(subject):
+            if subject is None:
+                raise Exception('Cannot run tests on a subject which is None')
+            return eval(code)
+    else:
+        def get_member(subject):
+            if subject is None:
+                raise Exception('Cannot run tests on a subject which is None')
+            return getattr(subject, member_name)
+
+    return get_member
+
+
+def compile_logic(logic, operator='eq'):
+    """Turn a logic description into a function(subject, member) which
+    gives the same result as Logician(subject).test_logic(member, logic).
+    The type of each test is only inspected once, which makes repeated
+    evaluation (for example UI visibility on every redraw) much cheaper.
+    """
+    if type(logic) is dict:
+        tests = [(compile_member(other_member), compile_logic(test)) for other_member, test in logic.items()]
+
+        def test_dict(subject, member):
+            result = True
+            for get_member, test in tests:
+                result &= test(subject, get_member(subject))
+            return result
+
+        return test_dict
+    elif type(logic) is Logic_AND:
+        tests = [compile_logic(test) for test in logic]
+
+        def test_and(subject, member):
+            result = True
+            for test in tests:
+                result &= test(subject, member)
+            return result
+
+        return test_and
+    elif type(logic) is Logic_OR:
+        tests = [compile_logic(test) for test in logic]
+
+        def test_or(subject, member):
+            result = False
+            for test in tests:
+                result |= test(subject, member)
+            return result
+
+        return test_or
+    elif type(logic) is Logic_Operator:
+        return compile_operator(logic)
+    elif (isinstance(logic, LambdaType) or isinstance(logic, FunctionType)) and logic.__code__.co_argcount == 0:
+        return lambda subject, member: logic()
+    elif (isinstance(logic, LambdaType) or isinstance(logic, FunctionType)) and logic.__code__.co_argcount == 1:
+        return lambda subject, member: logic(member)
+    else:
+        return compile_operator(Logic_Operator({operator: logic}))
+
+
+def compile_operator(value):
+    """Compiled form of Logician.test_operator(), unknown operators are
+    ignored in the same way.
+    """
+    tests = []
+    for operator, operand in value.items():
+        operator = operator.lower().strip()
+        if operator in OPERATOR_TESTS:
+            tests.append((OPERATOR_TESTS[operator], operand))
+
+    if len(tests) == 1:
+        test, operand = tests[0]
+        return lambda subject, member: True & test(member, operand)
+
+    def test_operator(subject, member):
+        result = True
+        for test, operand in tests:
+            result &= test(member, operand)
+        return result
+
+    return test_operator
+
+
 # A couple of name aliases
 class Validation(Logician):
     pass
@@ -233,8 +233,11 @@ def cycles_material_converter(blender_mat, context):
             elif node.type == 'EMISSION' and node.outputs[0].is_linked:
                 emission = node
 
+        # Lux nodes created for each Cycles node output, shared by all sockets linked to it
+        converted = {}
+
         # Convert surface socket
-        first_surface_node, default_value = convert_socket(output.inputs['Surface'], lux_nodetree)
+        first_surface_node, default_value = convert_socket(output.inputs['Surface'], lux_nodetree, converted)
 
         # Create Lux output node
         lux_output = lux_nodetree.nodes.new('luxrender_material_output_node')
@@ -264,13 +267,13 @@ def cycles_material_converter(blender_mat, context):
             lux_emission.location = lux_output.location.x - 230, lux_output.location.y - 180
 
             # Color
-            linked_node, default_value = convert_socket(emission.inputs['Color'], lux_nodetree)
+            linked_node, default_value = convert_socket(emission.inputs['Color'], lux_nodetree, converted)
             # The default value of a Cycles color is always RGBA, but we only need RGB
             default_value = convert_rgba_to_rgb(default_value)
             copy_socket_properties(lux_emission, 0, lux_nodetree, linked_node, default_value)
 
             # Strenght (gain)
-            linked_node, default_value = convert_socket(emission.inputs['Strength'], lux_nodetree)
+            linked_node, default_value = convert_socket(emission.inputs['Strength'], lux_nodetree, converted)
             if default_value:
                 # Gain is not a socket in Lux emission node
                 lux_emission.gain = default_value
@@ -304,7 +307,12 @@ def copy_socket_properties(lux_node, socket_index, lux_nodetree, linked_node=Non
         # Set default value of the socket
         lux_node.inputs[socket_index].default_value = default_value
 
-def convert_socket(socket, lux_nodetree):
+def convert_socket(socket, lux_nodetree, converted):
+    """
+    converted is a dict that maps (Cycles node name, output socket identifier) to the result of the conversion.
+    A Cycles node that is linked to several sockets (e.g. an image texture used for color and roughness) is only
+    converted once, so the Lux nodetree does not contain duplicated nodes.
+    """
     if socket.is_linked:
         node = socket.links[0].from_node
         # Get from_socket information, for nodes with multiple outputs (e.g. image map with color and alpha)
@@ -315,6 +323,15 @@ def convert_socket(socket, lux_nodetree):
         # Sockets like NodeSocketShader do not have a default value
         return None, None
 
+    key = (node.name, from_socket.identifier)
+
+    if key not in converted:
+        converted[key] = convert_node(node, from_socket, lux_nodetree, converted)
+
+    return converted[key]
+
+
+def convert_node(node, from_socket, lux_nodetree, converted):
     lux_node = None
 
     if node.type in ('OUTPUT_MATERIAL', 'EMISSION'):
@@ -327,7 +344,7 @@ def convert_socket(socket, lux_nodetree):
         lux_node = lux_nodetree.nodes.new('luxrender_material_matte_node')
 
         # Color
-        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree, converted)
         # The default value of a Cycles color is always RGBA, but we only need RGB
         default_value = convert_rgba_to_rgb(default_value)
         copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
@@ -337,13 +354,13 @@ def convert_socket(socket, lux_nodetree):
         lux_node = lux_nodetree.nodes.new('luxrender_material_metal2_node')
 
         # Color
-        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree, converted)
         # The default value of a Cycles color is always RGBA, but we only need RGB
         default_value = convert_rgba_to_rgb(default_value)
         copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
 
         # Roughness
-        linked_node, default_value = convert_socket(node.inputs['Roughness'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Roughness'], lux_nodetree, converted)
         copy_socket_properties(lux_node, 2, lux_nodetree, linked_node, default_value)
 
     elif node.type == 'MIX_SHADER':
@@ -358,13 +375,13 @@ def convert_socket(socket, lux_nodetree):
             lux_node = lux_nodetree.nodes.new('luxrender_material_glossy_node')
 
             # Diffuse color (from BSDF_DIFFUSE)
-            linked_node, default_value = convert_socket(mat1_node.inputs['Color'], lux_nodetree)
+            linked_node, default_value = convert_socket(mat1_node.inputs['Color'], lux_nodetree, converted)
             # The default value of a Cycles color is always RGBA, but we only need RGB
             default_value = convert_rgba_to_rgb(default_value)
             copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
 
             # Roughness (from BSDF_GLOSSY)
-            linked_node, default_value = convert_socket(mat2_node.inputs['Roughness'], lux_nodetree)
+            linked_node, default_value = convert_socket(mat2_node.inputs['Roughness'], lux_nodetree, converted)
             copy_socket_properties(lux_node, 6, lux_nodetree, linked_node, default_value)
 
             # TODO: specular color (get brightness from fresnel/layerweight node and color from glossy node?)
@@ -379,15 +396,15 @@ def convert_socket(socket, lux_nodetree):
             lux_node.architectural = True
 
             # Glass transmission color (from BSDF_GLASS)
-            linked_node, default_value = convert_socket(glass_node.inputs['Color'], lux_nodetree)
+            linked_node, default_value = convert_socket(glass_node.inputs['Color'], lux_nodetree, converted)
             # The default value of a Cycles color is always RGBA, but we only need RGB
             default_value = convert_rgba_to_rgb(default_value)
             copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
         else:
             # "Normal" mix material, no special treatment
-            linked_node_amount, default_value_amount = convert_socket(node.inputs['Fac'], lux_nodetree)
-            linked_node_1, default_value_1 = convert_socket(node.inputs[1], lux_nodetree)
-            linked_node_2, default_value_2 = convert_socket(node.inputs[2], lux_nodetree)
+            linked_node_amount, default_value_amount = convert_socket(node.inputs['Fac'], lux_nodetree, converted)
+            linked_node_1, default_value_1 = convert_socket(node.inputs[1], lux_nodetree, converted)
+            linked_node_2, default_value_2 = convert_socket(node.inputs[2], lux_nodetree, converted)
 
             # Only create the mix material if at least one of the sub-shaders could be converted
             if linked_node_1 or linked_node_2:
@@ -401,8 +418,8 @@ def convert_socket(socket, lux_nodetree):
 
     elif node.type == 'ADD_SHADER':
         # Since there is no better euqivalent for the add shader in Lux we will use a mix material
-        linked_node_1, default_value_1 = convert_socket(node.inputs[0], lux_nodetree)
-        linked_node_2, default_value_2 = convert_socket(node.inputs[1], lux_nodetree)
+        linked_node_1, default_value_1 = convert_socket(node.inputs[0], lux_nodetree, converted)
+        linked_node_2, default_value_2 = convert_socket(node.inputs[1], lux_nodetree, converted)
 
         if linked_node_1 or linked_node_2:
             lux_node = lux_nodetree.nodes.new('luxrender_material_mix_node')
@@ -414,7 +431,7 @@ def convert_socket(socket, lux_nodetree):
     elif node.type == 'BSDF_TRANSPARENT':
         lux_node = lux_nodetree.nodes.new('luxrender_material_null_node')
 
-        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree, converted)
         default_value = convert_rgba_to_rgb(default_value)
 
         copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
@@ -423,13 +440,13 @@ def convert_socket(socket, lux_nodetree):
         lux_node = lux_nodetree.nodes.new('luxrender_material_glass_node')
 
         # Color (Transmission)
-        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree, converted)
         # The default value of a Cycles color is always RGBA, but we only need RGB
         default_value = convert_rgba_to_rgb(default_value)
         copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
 
         # Roughness
-        linked_node, default_value = convert_socket(node.inputs['Roughness'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Roughness'], lux_nodetree, converted)
 
         if (default_value and default_value > 0.000001) or linked_node:
             # Use roughness
@@ -437,14 +454,14 @@ def convert_socket(socket, lux_nodetree):
             copy_socket_properties(lux_node, 6, lux_nodetree, linked_node, default_value)
 
         # IOR
-        linked_node, default_value = convert_socket(node.inputs['IOR'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['IOR'], lux_nodetree, converted)
         copy_socket_properties(lux_node, 2, lux_nodetree, linked_node, default_value)
 
     elif node.type == 'BSDF_TRANSLUCENT':
         lux_node = lux_nodetree.nodes.new('luxrender_material_mattetranslucent_node')
 
         # Color (the cycles node only has one value that is used for both reflection and transmission in the Lux mat)
-        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree, converted)
         # The default value of a Cycles color is always RGBA, but we only need RGB
         default_value = convert_rgba_to_rgb(default_value)
         copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
@@ -454,7 +471,7 @@ def convert_socket(socket, lux_nodetree):
         lux_node = lux_nodetree.nodes.new('luxrender_material_velvet_node')
 
         # Color (the cycles node only has one value that is used for both reflection and transmission in the Lux mat)
-        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Color'], lux_nodetree, converted)
         # The default value of a Cycles color is always RGBA, but we only need RGB
         default_value = convert_rgba_to_rgb(default_value)
         copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
@@ -504,14 +521,14 @@ def convert_socket(socket, lux_nodetree):
         lux_node.mode = 'scale'
 
         # Strength
-        linked_node, default_value = convert_socket(node.inputs['Strength'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Strength'], lux_nodetree, converted)
         if default_value and node.invert:
             # TODO: extend this so it is able to invert linked nodes, too
             default_value = -default_value
         copy_socket_properties(lux_node, 0, lux_nodetree, linked_node, default_value)
 
         # Height
-        linked_node, default_value = convert_socket(node.inputs['Height'], lux_nodetree)
+        linked_node, default_value = convert_socket(node.inputs['Height'], lux_nodetree, converted)
         copy_socket_properties(lux_node, 1, lux_nodetree, linked_node, default_value)
 
     else:
@@ -526,7 +543,7 @@ def convert_socket(socket, lux_nodetree):
         if 'BSDF' in node.type:
             # Bump
             if 'Normal' in node.inputs and 'Bump' in lux_node.inputs:
-                linked_node, default_value = convert_socket(node.inputs['Normal'], lux_nodetree)
+                linked_node, default_value = convert_socket(node.inputs['Normal'], lux_nodetree, converted)
                 # There is no valid default value for the bump slot, that's why we pass None
                 copy_socket_properties(lux_node, 'Bump', lux_nodetree, linked_node, None)
 
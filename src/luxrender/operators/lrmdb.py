@@ -29,6 +29,7 @@ import bpy
 from .. import LuxRenderAddon
 from ..outputs import LuxLog, LuxManager
 from ..export import materials as export_materials
+from ..util import EncodedFileCache
 
 from .lrmdb_lib import lrmdb_client
 
@@ -349,3 +350,6 @@ class LUXRENDER_OT_upload_material(bpy.types.Operator):
         except Exception as err:
             self.report({'ERROR'}, 'Cannot save: %s' % err)
             return {'CANCELLED'}
+        finally:
+            # The embedded files of this material are not needed for anything else
+            EncodedFileCache.clear()
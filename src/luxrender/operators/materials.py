@@ -32,6 +32,7 @@ import json, math, os, mathutils
 from .. import LuxRenderAddon
 from ..outputs import LuxLog, LuxManager
 from ..export import materials as export_materials
+from ..util import EncodedFileCache
 
 from .cycles_converter import cycles_material_converter
 
@@ -152,6 +153,9 @@ class LUXRENDER_OT_save_material(bpy.types.Operator):
         except Exception as err:
             self.report({'ERROR'}, 'Cannot save: %s' % err)
             return {'CANCELLED'}
+        finally:
+            # The embedded files of this material are not needed for anything else
+            EncodedFileCache.clear()
 
 
 def material_converter(report, scene, blender_mat):
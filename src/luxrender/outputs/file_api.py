@@ -67,7 +67,9 @@ class Custom_Context(object):
     context_name = ''
     files = []
     file_names = []
+    scene_file_names = []
     current_file = Files.MAIN
+    geometry_file = Files.GEOM
     parse_at_worldend = True
 
     def __init__(self, name):
@@ -116,16 +118,14 @@ class Custom_Context(object):
 
         self.files = []
         self.file_names = []
+        self.scene_file_names = []
+        self.geometry_file = Files.GEOM
 
         self.file_names.append('%s.lxs' % name)
         self.files.append(open(self.file_names[Files.MAIN], 'w'))
         self.wf(Files.MAIN, '# Main Scene File')
 
-        subdir = '%s%s/%s/%05d' % (efutil.export_path, efutil.scene_filename(), bpy.path.clean_name(scene.name),
-                                   scene.frame_current)
-
-        if not os.path.exists(subdir):
-            os.makedirs(subdir)
+        subdir = self.scene_subdir(scene, scene.frame_current)
 
         self.file_names.append('%s/LuxRender-Materials.lxm' % subdir)
         self.files.append(open(self.file_names[Files.MATS], 'w'))
@@ -139,6 +139,56 @@ class Custom_Context(object):
 
         self.set_output_file(Files.MAIN)
 
+    def scene_subdir(self, scene, frame):
+        """
+        scene				bpy.types.Scene
+        frame				int
+
+        Create the export folder for the files of the given scene and frame,
+        the PLY files of the scene are written there, too
+
+        Returns string
+        """
+
+        subdir = '%s%s/%s/%05d' % (efutil.export_path, efutil.scene_filename(), bpy.path.clean_name(scene.name),
+                                   frame)
+
+        if not os.path.exists(subdir):
+            os.makedirs(subdir)
+
+        return subdir
+
+    def add_geometry_file(self, scene, frame):
+        """
+        scene				bpy.types.Scene
+        frame				int
+
+        Open a separate geometry file for a 'background_set' scene, which
+        is included by the main file after the geometry file of the main scene.
+        Must be called before worldBegin().
+
+        Returns the file index to pass to set_geometry_file()
+        """
+
+        file_name = '%s/LuxRender-Geometry.lxo' % self.scene_subdir(scene, frame)
+        self.files.append(open(file_name, 'w'))
+        index = len(self.files) - 1
+        self.scene_file_names.append((index, file_name))
+        self.wf(index, '# Geometry File (%s)' % scene.name)
+
+        return index
+
+    def set_geometry_file(self, file):
+        """
+        file				int
+
+        Send all following output for Files.GEOM to the given file index
+
+        Returns None
+        """
+
+        self.geometry_file = file
+
     def set_output_file(self, file):
         """
         file				int
@@ -148,7 +198,7 @@ class Custom_Context(object):
         Returns None
         """
 
-        self.current_file = file
+        self.current_file = self.geometry_file if file == Files.GEOM else file
 
     def _api(self, identifier, args=[], file=None):
         """
@@ -230,6 +280,9 @@ class Custom_Context(object):
                 if idx < len(self.file_names) and os.path.exists(self.file_names[idx]):
                     self.wf(Files.MAIN, '\nInclude "%s"' % efutil.path_relative_to_export(self.file_names[idx]))
 
+            for idx, file_name in self.scene_file_names:
+                self.wf(Files.MAIN, '\nInclude "%s"' % efutil.path_relative_to_export(file_name))
+
     def lightGroup(self, *args):
         if args[0] != '':
             self._api('LightGroup', args)
@@ -92,7 +92,8 @@ class luxrender_testing(declarative_property_group):
     controls = [
         'clay_render',
         'object_analysis',
-        're_raise'
+        're_raise',
+        'profile_export'
     ]
 
     visibility = {}
@@ -119,6 +120,14 @@ class luxrender_testing(declarative_property_group):
             'description': 'Show export error messages in the UI as well as the console',
             'default': False
         },
+        {
+            'type': 'bool',
+            'attr': 'profile_export',
+            'name': 'Debug: Profile Export',
+            'description': 'Print the time spent in each export stage and write a Chrome trace file '
+                           '(<scene file>.trace.json) next to the exported scene',
+            'default': False
+        },
     ]
 
 
@@ -135,10 +144,13 @@ class luxrender_engine(declarative_property_group):
         #       'binary_name',
         #       'write_files',
         ['export_particles', 'export_hair'],
-        'embed_filedata',
+        ['embed_filedata', 'embed_compression'],
         'mesh_type',
-        'partial_ply',
+        ['partial_ply', 'deduplicate_meshes'],
+        'export_threads',
         ['render', 'monitor_external'],
+        ['pipeline_animation', 'pipeline_lookahead'],
+        ['queue_processes', 'queue_retries'],
         'fixed_seed',
         # ['threads_auto', 'fixed_seed'],
         # 'threads',
@@ -149,12 +161,23 @@ class luxrender_engine(declarative_property_group):
     visibility = {
         'write_files': {'export_type': 'INT'},
         'embed_filedata': O([{'export_type': 'EXT'}, A([{'export_type': 'INT'}, {'write_files': True}])]),
+        'embed_compression': A([O([{'export_type': 'EXT'}, A([{'export_type': 'INT'}, {'write_files': True}])]),
+                                {'embed_filedata': True}]),
         'mesh_type': O([{'export_type': 'EXT'}, A([{'export_type': 'INT'}, {'write_files': True}])]),
         'binary_name': {'export_type': 'EXT'},
         'render': O([{'write_files': True}, {'export_type': 'EXT'}]),
         # We need run renderer unless we are set for internal-pipe mode, which is the only time both of these are false
         'monitor_external': {'export_type': 'EXT', 'binary_name': 'luxrender', 'render': True},
+        'pipeline_animation': {'export_type': 'EXT', 'render': True},
+        'pipeline_lookahead': {'export_type': 'EXT', 'render': True, 'pipeline_animation': True},
+        'queue_processes': {'export_type': 'EXT', 'binary_name': 'luxrender', 'render': True,
+                            'pipeline_animation': False},
+        'queue_retries': {'export_type': 'EXT', 'binary_name': 'luxrender', 'render': True,
+                          'pipeline_animation': False},
         'partial_ply': O([{'export_type': 'EXT'}, A([{'export_type': 'INT'}, {'write_files': True}])]),
+        'deduplicate_meshes': O([{'export_type': 'EXT'}, A([{'export_type': 'INT'}, {'write_files': True}])]),
+        'export_threads': A([O([{'export_type': 'EXT'}, A([{'export_type': 'INT'}, {'write_files': True}])]),
+                             {'mesh_type': 'binary_ply'}]),
         'threads_auto': O([A([{'write_files': False}, {'export_type': 'INT'}]),
                            A([O([{'write_files': True}, {'export_type': 'EXT'}]), {'render': True}])]),
         # The flag options must be present for any condition where run renderer is present and checked,
@@ -229,6 +252,53 @@ class luxrender_engine(declarative_property_group):
             'default': True,
             'save_in_preset': True
         },
+        {
+            'type': 'bool',
+            'attr': 'pipeline_animation',
+            'name': 'Pipelined Animation',
+            'description': 'When rendering animations, start LuxConsole on each frame as soon as it is exported, \
+            so that the export of the next frame overlaps with rendering of the current one. Only used when exporting \
+            to an external LuxConsole; internal (pylux) animations are rendered frame by frame',
+            'default': False,
+            'save_in_preset': True
+        },
+        {
+            'type': 'int',
+            'attr': 'pipeline_lookahead',
+            'name': 'Frames In Flight',
+            'description': 'Maximum number of frames rendering at the same time in pipelined animation mode',
+            'default': 1,
+            'min': 1,
+            'soft_min': 1,
+            'max': 16,
+            'soft_max': 4,
+            'save_in_preset': True
+        },
+        {
+            'type': 'int',
+            'attr': 'queue_processes',
+            'name': 'Queue Processes',
+            'description': 'Number of LuxConsole processes rendering the frames of an animation queue at the same \
+            time, the render threads are divided between them. 1 opens the queue in the LuxRender GUI',
+            'default': 1,
+            'min': 1,
+            'soft_min': 1,
+            'max': 64,
+            'soft_max': 16,
+            'save_in_preset': True
+        },
+        {
+            'type': 'int',
+            'attr': 'queue_retries',
+            'name': 'Frame Retries',
+            'description': 'How often a frame of a multi-process animation queue is restarted when its renderer fails',
+            'default': 1,
+            'min': 0,
+            'soft_min': 0,
+            'max': 10,
+            'soft_max': 3,
+            'save_in_preset': True
+        },
         {
             'type': 'enum',
             'attr': 'selected_luxrender_api',
@@ -251,6 +321,28 @@ class luxrender_engine(declarative_property_group):
             'default': True,
             'save_in_preset': True
         },
+        {
+            'type': 'bool',
+            'attr': 'deduplicate_meshes',
+            'name': 'Share Identical Meshes',
+            'description': 'Export bit-identical meshes from different mesh datablocks (e.g. appended or linked \
+            copies of an asset) only once and instance them',
+            'default': False,
+            'save_in_preset': True
+        },
+        {
+            'type': 'int',
+            'attr': 'export_threads',
+            'name': 'PLY Writer Threads',
+            'description': 'Number of threads writing PLY files while the export continues with the next objects \
+            and background scenes, 1 writes them one after another',
+            'default': 4,
+            'min': 1,
+            'soft_min': 1,
+            'max': 64,
+            'soft_max': 16,
+            'save_in_preset': True
+        },
         {
             'type': 'enum',
             'attr': 'binary_name',
@@ -294,6 +386,19 @@ class luxrender_engine(declarative_property_group):
             'default': False,
             'save_in_preset': True
         },
+        {
+            'type': 'int',
+            'attr': 'embed_compression',
+            'name': 'Compression',
+            'description': 'zlib compression level of embedded files, higher levels give slightly smaller scene \
+            files but take much longer to export',
+            'default': 6,
+            'min': 1,
+            'soft_min': 1,
+            'max': 9,
+            'soft_max': 9,
+            'save_in_preset': True
+        },
         {
             'type': 'bool',
             'attr': 'is_saving_lbm2',
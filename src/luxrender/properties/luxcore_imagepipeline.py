@@ -172,6 +172,8 @@ class luxcore_imagepipeline(declarative_property_group):
         'displayinterval',
         'fast_initial_preview',
         'viewport_interval',
+        'viewport_update_interval',
+        ['viewport_resolution_reduction', 'viewport_full_resolution_delay'],
     ]
     
     visibility = {
@@ -608,4 +610,37 @@ class luxcore_imagepipeline(declarative_property_group):
             'min': 5,
             'soft_min': 50
         },
+        {
+            'type': 'int',
+            'attr': 'viewport_update_interval',
+            'name': 'Viewport Edit Interval (ms)',
+            'description': 'Minimum period between scene edits of the viewport render (milliseconds). Changes made '
+                           'in between (e.g. while dragging an object) are merged into one edit',
+            'default': 100,
+            'min': 0,
+            'soft_max': 1000
+        },
+        {
+            'type': 'enum',
+            'attr': 'viewport_resolution_reduction',
+            'name': 'Interactive Resolution',
+            'description': 'Film resolution of the viewport render while the scene or view is edited, the image is '
+                           'upscaled for display',
+            'default': '1',
+            'items': [
+                ('1', 'Full', 'Always render with the full viewport resolution'),
+                ('2', '1/2', 'Render with half the viewport resolution during interaction'),
+                ('4', '1/4', 'Render with a quarter of the viewport resolution during interaction'),
+            ],
+        },
+        {
+            'type': 'int',
+            'attr': 'viewport_full_resolution_delay',
+            'name': 'Full Res. Delay (ms)',
+            'description': 'Edits that follow each other within this time switch the viewport render to reduced '
+                           'resolution, after this time without edits it returns to full resolution (milliseconds)',
+            'default': 500,
+            'min': 0,
+            'soft_max': 5000
+        },
     ]
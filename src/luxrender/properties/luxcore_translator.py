@@ -41,9 +41,12 @@ class luxcore_translatorsettings(declarative_property_group):
 
     controls = [
         ['export_particles', 'export_hair', 'export_proxies'],
+        'incremental_animation',
+        'deduplicate_meshes',
+        'smoke_cache_size',
         'override_materials',
         ['override_glass', 'override_lights', 'override_null'],
-        ['label_debug', 'print_cfg', 'print_scn'],
+        ['label_debug', 'print_cfg', 'print_scn', 'profile_export'],
         'use_rtpathcpu',
     ]
 
@@ -80,6 +83,37 @@ class luxcore_translatorsettings(declarative_property_group):
             'default': True,
             'save_in_preset': True
         },
+        {
+            'type': 'bool',
+            'attr': 'incremental_animation',
+            'name': 'Incremental Animation Export',
+            'description': 'Keep the converted scene between animation frames and only convert objects, materials '
+                           'and lights that changed since the previous frame',
+            'default': False,
+            'save_in_preset': True
+        },
+        {
+            'type': 'bool',
+            'attr': 'deduplicate_meshes',
+            'name': 'Share Identical Meshes',
+            'description': 'Define bit-identical meshes from different mesh datablocks (e.g. appended or linked '
+                           'copies of an asset) only once and instance them (final render only)',
+            'default': False,
+            'save_in_preset': True
+        },
+        {
+            'type': 'int',
+            'attr': 'smoke_cache_size',
+            'name': 'Smoke Cache Size (MB)',
+            'description': 'Memory used to keep converted smoke grids between viewport updates, the least recently '
+                           'used grids are dropped first',
+            'default': 512,
+            'min': 0,
+            'soft_min': 16,
+            'max': 65536,
+            'soft_max': 8192,
+            'save_in_preset': True
+        },
         {
             'type': 'bool',
             'attr': 'override_materials',
@@ -137,6 +171,15 @@ class luxcore_translatorsettings(declarative_property_group):
             'default': False,
             'save_in_preset': True
         },
+        {
+            'type': 'bool',
+            'attr': 'profile_export',
+            'name': 'Profile',
+            'description': 'Print the time spent in each export stage and write a Chrome trace file to the output '
+                           'path (final renders only)',
+            'default': False,
+            'save_in_preset': True
+        },
         {
             'type': 'enum',
             'attr': 'export_type',
@@ -63,6 +63,7 @@ class luxrender_mesh(declarative_property_group):
                    'mesh_type',
                    'instancing_mode',
                    'portal',
+                   'portal_lightgroup_chooser',
                    'generatetangents',
                    'subdiv',
                    'sublevels',
@@ -78,6 +79,7 @@ class luxrender_mesh(declarative_property_group):
     visibility = dict_merge({
                                 'mesh_type': lambda: not UseLuxCore(),
                                 'instancing_mode': lambda: not UseLuxCore(),
+                                'portal_lightgroup_chooser': {'portal': True},
                                 'nsmooth': {'subdiv': 'loop'},
                                 'sharpbound': {'subdiv': 'loop'},
                                 'splitnormal': {'subdiv': 'loop'},
@@ -119,6 +121,24 @@ class luxrender_mesh(declarative_property_group):
                          'description': 'Use this mesh as an exit portal (geometry should be open/planar)',
                          'default': False,
                      },
+                     {
+                         'type': 'string',
+                         'attr': 'portal_lightgroup',
+                         'name': 'Portal Light Group',
+                         'description': 'Only use this portal for lights in this light group; leave blank to use it '
+                                        'for all lights',
+                         'default': '',
+                     },
+                     {
+                         'type': 'prop_search',
+                         'attr': 'portal_lightgroup_chooser',
+                         'src': lambda s, c: s.scene.luxrender_lightgroups,
+                         'src_attr': 'lightgroups',
+                         'trg': lambda s, c: c.luxrender_mesh,
+                         'trg_attr': 'portal_lightgroup',
+                         'name': 'Portal Light Group',
+                         'icon': 'OUTLINER_OB_LAMP'
+                     },
                      {
                          'type': 'bool',
                          'attr': 'generatetangents',
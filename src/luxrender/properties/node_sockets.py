@@ -44,6 +44,36 @@ def get_default(TextureParameter):
     return TextureParameter
 
 
+class NodeExportCache(object):
+    """
+    Remembers the LuxCore names of the nodes that were already exported into a pyluxcore.Properties object.
+    Node trees are DAGs: a node linked to several sockets (directly or through mix nodes) is exported only once,
+    following exports of the same node output just return the cached name.
+    The cache is bound to the Properties object of the current material/volume export and is reset when
+    a different Properties object is passed in.
+    """
+    properties = None
+    names = {}
+
+    @classmethod
+    def export(cls, properties, node, from_socket):
+        if properties is not cls.properties:
+            cls.properties = properties
+            cls.names = {}
+
+        key = (node.as_pointer(), from_socket.identifier)
+
+        if key not in cls.names:
+            cls.names[key] = node.export_luxcore(properties)
+
+        return cls.names[key]
+
+    @classmethod
+    def reset(cls):
+        cls.properties = None
+        cls.names = {}
+
+
 def export_socket_luxcore(properties, socket, fallback=None):
     """
     Export a socket. If the socket is linked, the linked node is exported and the name of the resulting LuxCore node
@@ -53,7 +83,7 @@ def export_socket_luxcore(properties, socket, fallback=None):
     linked_node = get_linked_node(socket)
 
     if linked_node is not None:
-        return linked_node.export_luxcore(properties)
+        return NodeExportCache.export(properties, linked_node, socket.links[0].from_socket)
     else:
         return fallback
 
@@ -1860,8 +1860,8 @@ class luxrender_texture_type_node_vol_smoke_data(luxrender_texture_node):
         set_prop_tex(properties, luxcore_name, 'type', 'densitygrid')
         set_prop_tex(properties, luxcore_name, 'wrap', self.wrap)
 
-        if SmokeCache.needs_update(LuxManager.CurrentScene, self.domain, self.source):
-            grid = SmokeCache.convert(LuxManager.CurrentScene, self.domain, self.source)
+        if SmokeCache.needs_update(LuxManager.CurrentScene, self.domain, self.source, luxcore_name):
+            grid = SmokeCache.convert(LuxManager.CurrentScene, self.domain, self.source, luxcore_name)
             set_prop_tex(properties, luxcore_name, 'data', grid[3])
             set_prop_tex(properties, luxcore_name, 'nx', int(grid[0]))
             set_prop_tex(properties, luxcore_name, 'ny', int(grid[1]))
@@ -38,7 +38,18 @@ def dict_merge(*args):
     return vis
 
 
-import base64, io, os, time, zlib
+import base64, collections, io, os, sys, time, zlib
+
+# Files are read in chunks of this size, a multiple of 57 bytes so that every chunk of compressed data that is
+# base64 encoded gives complete 76 character lines, just like base64.encodebytes() of the whole data would
+ENCODE_CHUNK_SIZE = 57 * 1024 * 16
+
+# Encoded text is read in chunks of this size, a multiple of 77 bytes (one complete base64 line plus newline)
+DECODE_CHUNK_SIZE = 77 * 1024 * 16
+
+# zlib compression level used for embedded files. Level 9 is several times slower than the default level
+# while the output is only slightly smaller
+DEFAULT_COMPRESSION_LEVEL = 6
 
 
 class bEncoder(object):
@@ -46,8 +57,9 @@ class bEncoder(object):
     Encode binary files to text using base64(zlib.compress(file))
     """
 
-    def __init__(self):
+    def __init__(self, compression_level=DEFAULT_COMPRESSION_LEVEL):
         self.last_encode_size = 0
+        self.compression_level = compression_level
 
     def Encode_File2File(self, fSrc_name, fDes_name):
         with open(fSrc_name, 'rb') as fSrc:
@@ -55,16 +67,31 @@ class bEncoder(object):
                 self._Encode(fSrc, fDes)
 
     def Encode_File2String(self, fSrc_name):
+        return ''.join('%s\n' % line for line in self.Encode_File2Lines(fSrc_name))
+
+    def Encode_File2Lines(self, fSrc_name):
+        """
+        Returns the encoded file as a list of 76 character lines (without newlines), the form in which embedded
+        data is added to a ParamSet. The lines are collected while the file is encoded, so the encoded data is
+        never held as one string.
+        """
+        cached = EncodedFileCache.get(fSrc_name, self.compression_level)
+
+        if cached is not None:
+            lines, self.last_encode_size = cached
+            return list(lines)
+
         with open(fSrc_name, 'rb') as fSrc:
-            with io.StringIO() as fDes:
-                fDes.name = '<string>'
-                self._Encode(fSrc, fDes)
+            fDes = LineWriter()
+            self._Encode(fSrc, fDes)
 
-                return fDes.getvalue()
+        EncodedFileCache.add(fSrc_name, self.compression_level, fDes.lines, self.last_encode_size)
+        return fDes.lines
 
     def _Encode(self, fSrc, fDes):
         """
-        Assumes that fSrc and fDes are already-opened file-like objects
+        Assumes that fSrc and fDes are already-opened file-like objects.
+        The file is compressed and encoded chunk by chunk, so memory use does not depend on the file size.
         """
 
         start_time = time.time()
@@ -76,33 +103,140 @@ class bEncoder(object):
 
         # Compress with a specific set of parameters
         comp_obj = zlib.compressobj(
-            9,  # compression level
+            self.compression_level,
         )
 
-        deflated = comp_obj.compress(
-            fSrc.read()
-        )
-        deflated += comp_obj.flush()
+        deflated_len = 0
+        # Compressed data that did not fill a complete base64 line yet
+        pending = b''
 
-        fDes.write(
-            base64.encodebytes(
-                deflated
-            ).decode()
-        )
+        while True:
+            chunk = fSrc.read(ENCODE_CHUNK_SIZE)
+
+            if chunk:
+                deflated = comp_obj.compress(chunk)
+            else:
+                deflated = comp_obj.flush()
+
+            deflated_len += len(deflated)
+            pending += deflated
+
+            if chunk:
+                # Only encode complete lines, the rest is kept for the next chunk
+                split = len(pending) - len(pending) % 57
+            else:
+                split = len(pending)
+
+            if split:
+                fDes.write(base64.encodebytes(pending[:split]).decode())
+                pending = pending[split:]
+
+            if not chunk:
+                break
 
         self.last_encode_size = fDes.tell()
-        elapsed = time.time() - start_time
+        elapsed = max(time.time() - start_time, 1e-6)
         print('bEncode %s : %d bytes -> %d bytes -> %d bytes: %0.2f%% : %0.2f sec : %0.2f kb/sec' % (
             input_filename,
             filelen,
-            len(deflated),
+            deflated_len,
             self.last_encode_size,
-            100 * self.last_encode_size / filelen,
+            100 * self.last_encode_size / max(filelen, 1),
             elapsed,
             filelen / elapsed / 1024)
         )
 
 
+class LineWriter(object):
+    """
+    Text file replacement for bEncoder._Encode() that keeps the written text as a list of lines.
+    _Encode() only writes complete base64 lines, so every write can be split on its own.
+    """
+
+    def __init__(self):
+        self.name = '<lines>'
+        self.lines = []
+        self.size = 0
+
+    def seek(self, offset):
+        pass
+
+    def tell(self):
+        return self.size
+
+    def write(self, text):
+        self.lines.extend(text.splitlines())
+        self.size += len(text)
+
+
+class EncodedFileCache(object):
+    """
+    Keeps the encoded lines of recently embedded files, so that exporting several frames of an animation
+    does not compress the same textures again. Entries are keyed by path, modification time, size and
+    compression level; the least recently used ones are dropped when the size limit is reached. The limit is
+    checked against the memory the line strings really use, which is well above the length of the text.
+    The render engine clears the cache when the export of a still image or of the last animation frame is done.
+    """
+
+    max_size = 256 * 1024 * 1024
+    size = 0
+    entries = collections.OrderedDict()
+
+    @staticmethod
+    def create_key(filepath, compression_level):
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        return os.path.abspath(filepath), stat.st_mtime_ns, stat.st_size, compression_level
+
+    @classmethod
+    def get(cls, filepath, compression_level):
+        key = cls.create_key(filepath, compression_level)
+
+        if key is None or key not in cls.entries:
+            return None
+
+        cls.entries.move_to_end(key)
+        lines, encoded_size, memory_size = cls.entries[key]
+        return lines, encoded_size
+
+    @staticmethod
+    def memory_size(lines):
+        """Bytes used by a tuple of lines, including the string objects themselves"""
+        return sys.getsizeof(lines) + sum(sys.getsizeof(line) for line in lines)
+
+    @classmethod
+    def add(cls, filepath, compression_level, lines, encoded_size):
+        """Store the encoded lines of a file, encoded_size is the length of the encoded text"""
+        key = cls.create_key(filepath, compression_level)
+
+        if key is None:
+            return
+
+        lines = tuple(lines)
+        memory_size = cls.memory_size(lines)
+
+        if memory_size > cls.max_size:
+            return
+
+        if key in cls.entries:
+            cls.size -= cls.entries.pop(key)[2]
+
+        cls.entries[key] = (lines, encoded_size, memory_size)
+        cls.size += memory_size
+
+        while cls.size > cls.max_size:
+            _, (removed, removed_encoded_size, removed_size) = cls.entries.popitem(last=False)
+            cls.size -= removed_size
+
+    @classmethod
+    def clear(cls):
+        cls.entries.clear()
+        cls.size = 0
+
+
 class bDecoder(object):
     """
     Decode binary files from text using base64(zlib.compress(file))
@@ -121,15 +255,15 @@ class bDecoder(object):
                 return fDes.getvalue()
 
     def Decode_String2File(self, in_string, fDes_name):
-        fSrc = io.BytesIO()
-        fSrc.write(in_string.encode())
-        with open(fDes_name, 'wb') as fDes:
-            fSrc.name = fDes.name
-            self._Decode(fSrc, fDes)
+        with io.BytesIO(in_string.encode()) as fSrc:
+            with open(fDes_name, 'wb') as fDes:
+                fSrc.name = fDes.name
+                self._Decode(fSrc, fDes)
 
     def _Decode(self, fSrc, fDes):
         """
-        Assumes that fSrc and fDes are already-opened file-like objects
+        Assumes that fSrc and fDes are already-opened file-like objects.
+        The text is decoded and decompressed chunk by chunk.
         """
 
         start_time = time.time()
@@ -140,44 +274,63 @@ class bDecoder(object):
         fDes.seek(0)
 
         decomp_obj = zlib.decompressobj()
+        # base64 characters that did not make up a complete 4 character group yet
+        pending = b''
 
-        fDes.write(
-            decomp_obj.decompress(
-                base64.decodebytes(
-                    fSrc.read()
-                )
-            )
-        )
+        while True:
+            chunk = fSrc.read(DECODE_CHUNK_SIZE)
+            pending += b''.join(chunk.split())
+
+            if chunk:
+                split = len(pending) - len(pending) % 4
+            else:
+                split = len(pending)
+
+            if split:
+                fDes.write(decomp_obj.decompress(base64.decodebytes(pending[:split])))
+                pending = pending[split:]
+
+            if not chunk:
+                break
+
+        fDes.write(decomp_obj.flush())
 
         outlen = fDes.tell()
-        elapsed = time.time() - start_time
+        elapsed = max(time.time() - start_time, 1e-6)
         print('bDecode %s : %d bytes -> %d bytes : %0.2f%% : %0.2f sec : %0.2f kb/sec' % (
             input_filename,
             filelen,
             outlen,
-            100 * outlen / filelen,
+            100 * outlen / max(filelen, 1),
             elapsed,
             filelen / elapsed / 1024)
         )
 
 
-def bencode_file2file(in_filename, out_filename):
-    be = bEncoder()
+def bencode_file2file(in_filename, out_filename, compression_level=DEFAULT_COMPRESSION_LEVEL):
+    be = bEncoder(compression_level)
     be.Encode_File2File(in_filename, out_filename)
 
 
-def bencode_file2string(in_filename):
-    be = bEncoder()
+def bencode_file2string(in_filename, compression_level=DEFAULT_COMPRESSION_LEVEL):
+    be = bEncoder(compression_level)
     return be.Encode_File2String(in_filename)
 
 
-def bencode_file2string_with_size(in_filename):
-    be = bEncoder()
+def bencode_file2string_with_size(in_filename, compression_level=DEFAULT_COMPRESSION_LEVEL):
+    be = bEncoder(compression_level)
     en = be.Encode_File2String(in_filename)
     sz = be.last_encode_size
     return en, sz
 
 
+def bencode_file2lines_with_size(in_filename, compression_level=DEFAULT_COMPRESSION_LEVEL):
+    be = bEncoder(compression_level)
+    en = be.Encode_File2Lines(in_filename)
+    sz = be.last_encode_size
+    return en, sz
+
+
 def bdecode_file2file(in_filename, out_filename):
     be = bDecoder()
     be.Decode_File2File(in_filename, out_filename)
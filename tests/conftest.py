@@ -0,0 +1,55 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+"""
+The tests run without Blender. Modules that do not import bpy are loaded straight from their source file with
+load_module(), single functions and classes of the other modules are compiled with load_definitions() from the
+fake Blender layer of the benchmarks (benchmarks/fake_blender.py).
+"""
+
+import importlib.util
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
+
+from fake_blender import SOURCE_ROOT
+
+
+def load_module(relpath):
+    """Import the Blender independent add-on module at relpath (relative to src/luxrender) on its own"""
+    name = 'luxrender_test.' + os.path.splitext(relpath)[0].replace('/', '.')
+    spec = importlib.util.spec_from_file_location(name, os.path.join(SOURCE_ROOT, relpath))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def import_addon_module(name, package='luxrender_test_addon'):
+    """
+    Import luxrender.<name> (a module that imports bpy, with its relative imports) below a stand-in package, so the
+    add-on __init__ with its UI registration is not executed. Needs the fake modules of fake_blender.install().
+    """
+    if package not in sys.modules:
+        addon = types.ModuleType(package)
+        addon.__path__ = [SOURCE_ROOT]
+        sys.modules[package] = addon
+
+    return importlib.import_module('%s.%s' % (package, name))
@@ -0,0 +1,148 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+from fake_blender import Bag, load_definitions
+
+convert_socket = load_definitions(
+    'operators/cycles_converter.py',
+    ['convert_rgba_to_rgb', 'get_linked_node', 'copy_socket_properties', 'convert_socket', 'convert_node'], {})[3]
+
+
+class Sockets(list):
+    """node.inputs/outputs, indexed by position or by name"""
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return next(socket for socket in self if socket.name == key)
+        return super().__getitem__(key)
+
+    def __contains__(self, name):
+        return any(socket.name == name for socket in self)
+
+
+def socket(name, default_value=None):
+    return Bag(name=name, identifier=name, is_linked=False, links=[], default_value=default_value)
+
+
+def cycles_node(name, type, inputs=(), outputs=('Color',)):
+    return Bag(name=name, type=type, location=(0, 0), invert=False, image=None, color_space='COLOR',
+               inputs=Sockets(socket(name, value) for name, value in inputs),
+               outputs=Sockets(socket(name) for name in outputs))
+
+
+def link(from_node, to_socket, output='Color'):
+    to_socket.is_linked = True
+    to_socket.links = [Bag(from_node=from_node, from_socket=from_node.outputs[output])]
+
+
+class LuxInputs(dict):
+    """Inputs of a Lux node, the sockets are created when they are first used"""
+
+    def __init__(self, node_type):
+        super().__init__()
+        self.node_type = node_type
+
+    def __missing__(self, key):
+        self[key] = Bag(default_value=None)
+        return self[key]
+
+    def __contains__(self, name):
+        return name == 'Bump' and self.node_type.startswith('luxrender_material')
+
+
+class LuxNodeTree(object):
+    def __init__(self):
+        self.nodes = Bag(new=self.new_node, created=[])
+        self.links = Bag(new=self.new_link, created=[])
+
+    def new_node(self, node_type):
+        node = Bag(type=node_type, inputs=LuxInputs(node_type), outputs=[Bag(name='out')])
+        self.nodes.created.append(node)
+        return node
+
+    def new_link(self, from_socket, to_socket):
+        self.links.created.append((from_socket, to_socket))
+
+
+def shared_texture_material():
+    """
+    Mix(Fac: noise, diffuse, glossy); one image feeds the color of both shaders and the height of a bump node,
+    which is the normal of both shaders. Returns the material output and the Cycles nodes without the output.
+    """
+    output = cycles_node('Material Output', 'OUTPUT_MATERIAL', [('Surface', None)], [])
+    mix = cycles_node('Mix Shader', 'MIX_SHADER', [('Fac', 0.5), ('Shader', None), ('Shader', None)], ['Shader'])
+    noise = cycles_node('Noise Texture', 'TEX_NOISE', outputs=['Fac'])
+    diffuse = cycles_node('Diffuse BSDF', 'BSDF_DIFFUSE', [('Color', (0.8, 0.8, 0.8, 1)), ('Normal', None)],
+                          ['BSDF'])
+    glossy = cycles_node('Glossy BSDF', 'BSDF_GLOSSY',
+                         [('Color', (0.8, 0.8, 0.8, 1)), ('Roughness', 0.2), ('Normal', None)], ['BSDF'])
+    image = cycles_node('Image Texture', 'TEX_IMAGE', outputs=['Color', 'Alpha'])
+    bump = cycles_node('Bump', 'BUMP', [('Strength', 1.0), ('Height', 1.0)], ['Normal'])
+
+    link(mix, output.inputs['Surface'], 'Shader')
+    link(noise, mix.inputs['Fac'], 'Fac')
+    link(diffuse, mix.inputs[1], 'BSDF')
+    link(glossy, mix.inputs[2], 'BSDF')
+    link(image, bump.inputs['Height'])
+
+    for shader in (diffuse, glossy):
+        link(image, shader.inputs['Color'])
+        link(bump, shader.inputs['Normal'], 'Normal')
+
+    return output, [mix, noise, diffuse, glossy, image, bump]
+
+
+def test_shared_nodes_are_converted_once():
+    output, cycles_nodes = shared_texture_material()
+    lux_nodetree = LuxNodeTree()
+    converted = {}
+
+    surface_node, default_value = convert_socket(output.inputs['Surface'], lux_nodetree, converted)
+
+    assert surface_node.type == 'luxrender_material_mix_node'
+    assert len(lux_nodetree.nodes.created) == len(cycles_nodes)
+    assert len(converted) == len(cycles_nodes)
+
+    cycles_links = sum(len(socket.links) for node in cycles_nodes for socket in node.inputs)
+    assert len(lux_nodetree.links.created) == cycles_links
+
+    image_maps = [node for node in lux_nodetree.nodes.created
+                  if node.type == 'luxrender_texture_blender_image_map_node']
+    assert len(image_maps) == 1
+
+    linked_from = [from_socket for from_socket, to_socket in lux_nodetree.links.created]
+    assert linked_from.count(image_maps[0].outputs[0]) == 3
+
+
+def test_outputs_of_one_node_are_converted_separately():
+    output, cycles_nodes = shared_texture_material()
+    mix, noise, diffuse, glossy, image, bump = cycles_nodes
+    link(image, glossy.inputs['Roughness'], 'Alpha')
+    lux_nodetree = LuxNodeTree()
+
+    convert_socket(output.inputs['Surface'], lux_nodetree, {})
+
+    image_maps = [node for node in lux_nodetree.nodes.created
+                  if node.type == 'luxrender_texture_blender_image_map_node']
+    assert len(lux_nodetree.nodes.created) == len(cycles_nodes) + 1
+    assert [getattr(node, 'channel', None) for node in image_maps] == [None, 'alpha']
+
+
+def test_unlinked_socket_returns_default_value():
+    assert convert_socket(socket('Roughness', 0.2), LuxNodeTree(), {}) == (None, 0.2)
@@ -0,0 +1,113 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import sys
+
+import fake_blender
+from conftest import import_addon_module
+
+bpy, mathutils, pyluxcore = fake_blender.install()
+
+PROPERTY_COUNT = 500
+
+
+def import_extensions_framework():
+    for name in [name for name in sys.modules if name.startswith('luxrender_test_addon.extensions_framework')]:
+        del sys.modules[name]
+
+    return import_addon_module('extensions_framework')
+
+
+def synthetic_properties():
+    types = [('bool', {'default': True}), ('int', {'min': 0, 'max': 10, 'bogus': 1}),
+             ('float', {'precision': 3}), ('enum', {'items': [('A', 'A', '')]}), ('string', {'subtype': 'FILE_PATH'})]
+
+    properties = []
+    for i in range(PROPERTY_COUNT):
+        prop_type, settings = types[i % len(types)]
+        prop = {'type': prop_type, 'attr': 'prop_%d' % i, 'name': 'Prop %d' % i}
+        prop.update(settings)
+        properties.append(prop)
+
+    # Entries without a bpy.props type (labels, separators) are skipped
+    properties.append({'type': 'text', 'attr': 'label'})
+    return properties
+
+
+def test_import_starts_with_empty_cache():
+    module = import_extensions_framework()
+
+    assert hasattr(module, 'init_properties')
+    assert module.added_property_cache == {}
+
+
+def test_init_properties_creates_each_property_once():
+    ef = import_extensions_framework()
+    target = type('Target', (), {})
+    properties = synthetic_properties()
+    bpy.props.calls.clear()
+
+    ef.init_properties(target, properties)
+
+    assert sum(bpy.props.calls.values()) == PROPERTY_COUNT
+    assert bpy.props.calls['IntProperty'] == PROPERTY_COUNT // 5
+    assert ef.added_property_cache[target] == {'prop_%d' % i for i in range(PROPERTY_COUNT)}
+    assert not hasattr(target, 'label')
+
+    # Keywords that the bpy.props function does not accept are filtered out
+    function, keywords = target.prop_1
+    assert keywords == {'name': 'Prop 1', 'min': 0, 'max': 10}
+
+    # Cached: nothing is created again
+    ef.init_properties(target, properties)
+    assert sum(bpy.props.calls.values()) == PROPERTY_COUNT
+
+    # Not cached: everything is redefined
+    ef.init_properties(target, properties, cache=False)
+    assert sum(bpy.props.calls.values()) == 2 * PROPERTY_COUNT
+
+
+def test_initialise_properties_builds_lookup():
+    ef = import_extensions_framework()
+
+    class luxrender_test_group(ef.declarative_property_group):
+        ef_attach_to = ['Scene']
+        properties = synthetic_properties()[:10]
+
+    luxrender_test_group.register_initialise_properties()
+
+    assert hasattr(bpy.types.Scene, 'luxrender_test_group')
+    assert [prop['type'] for prop in luxrender_test_group.ef_property_lookup['prop_2']] == ['float']
+    assert luxrender_test_group.ef_initialised
+
+    luxrender_test_group.remove_properties()
+    assert not hasattr(bpy.types.Scene, 'luxrender_test_group')
+    assert not hasattr(luxrender_test_group, 'prop_0')
+
+
+def test_property_lookup_keeps_duplicate_definitions():
+    ef = import_extensions_framework()
+    label = {'type': 'text', 'attr': 'label', 'name': 'Label'}
+    properties = synthetic_properties()[:2] + [label, {'type': 'separator', 'attr': 'label'}]
+
+    lookup = ef.build_property_lookup(properties)
+
+    assert lookup['prop_0'] == [properties[0]]
+    # Every definition of an attr is drawn, in the order of the list
+    assert lookup['label'] == [label, properties[3]]
@@ -0,0 +1,137 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import base64
+import os
+import random
+import zlib
+
+import pytest
+
+from conftest import load_module
+
+util = load_module('util/__init__.py')
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    util.EncodedFileCache.clear()
+    yield
+    util.EncodedFileCache.clear()
+
+
+def write_file(directory, name, size, seed=0):
+    """Half random, half repeated bytes, so the data is neither incompressible nor trivial"""
+    rng = random.Random(seed)
+    data = bytes(rng.getrandbits(8) for _ in range(size // 2)) + b'LuxRender' * (size // 18)
+    path = os.path.join(str(directory), name)
+
+    with open(path, 'wb') as f:
+        f.write(data)
+
+    return path, data
+
+
+def test_chunked_encoding_matches_one_shot(tmp_path):
+    # Several encode and decode chunks, with a partial last chunk
+    path, data = write_file(tmp_path, 'texture.bin', 3 * util.ENCODE_CHUNK_SIZE + 1234)
+
+    encoded = util.bencode_file2string(path, 9)
+
+    assert encoded == base64.encodebytes(zlib.compress(data, 9)).decode()
+
+
+@pytest.mark.parametrize('size', [0, 1, 57, util.ENCODE_CHUNK_SIZE, 2 * util.ENCODE_CHUNK_SIZE + 1])
+def test_round_trip(tmp_path, size):
+    path, data = write_file(tmp_path, 'texture.bin', size)
+    decoded_path = os.path.join(str(tmp_path), 'decoded.bin')
+
+    util.bdecode_string2file(util.bencode_file2string(path), decoded_path)
+
+    with open(decoded_path, 'rb') as f:
+        assert f.read() == data
+
+
+def test_file_round_trip(tmp_path):
+    path, data = write_file(tmp_path, 'texture.bin', util.DECODE_CHUNK_SIZE * 2 + 99)
+    encoded_path = os.path.join(str(tmp_path), 'texture.b64')
+    decoded_path = os.path.join(str(tmp_path), 'decoded.bin')
+
+    util.bencode_file2file(path, encoded_path, 1)
+    util.bdecode_file2file(encoded_path, decoded_path)
+
+    with open(decoded_path, 'rb') as f:
+        assert f.read() == data
+
+
+def test_lines_match_string(tmp_path):
+    path, data = write_file(tmp_path, 'texture.bin', 2 * util.ENCODE_CHUNK_SIZE + 5)
+
+    lines, size = util.bencode_file2lines_with_size(path, 9)
+    encoded = base64.encodebytes(zlib.compress(data, 9)).decode()
+
+    assert lines == encoded.splitlines()
+    assert size == len(encoded)
+    assert all(len(line) == 76 for line in lines[:-1])
+
+
+def test_compression_level_is_used(tmp_path):
+    path, data = write_file(tmp_path, 'texture.bin', util.ENCODE_CHUNK_SIZE)
+
+    fast, fast_size = util.bencode_file2lines_with_size(path, 1)
+    best, best_size = util.bencode_file2lines_with_size(path, 9)
+
+    assert fast == base64.encodebytes(zlib.compress(data, 1)).decode().splitlines()
+    assert best_size < fast_size
+    # Both levels are cached separately
+    assert len(util.EncodedFileCache.entries) == 2
+
+
+def test_cache_hit_returns_same_lines(tmp_path):
+    path, data = write_file(tmp_path, 'texture.bin', 10000)
+
+    lines, size = util.bencode_file2lines_with_size(path)
+    cached_lines, cached_size = util.bencode_file2lines_with_size(path)
+
+    assert cached_lines == lines and cached_size == size
+    # The caller gets its own list, adding it to a ParamSet does not change the cache
+    assert cached_lines is not lines
+    # The line strings use more memory than the text they hold
+    assert util.EncodedFileCache.size == memory_size(lines) > size
+
+    util.EncodedFileCache.clear()
+    assert util.EncodedFileCache.size == 0 and not util.EncodedFileCache.entries
+
+
+def memory_size(lines):
+    return util.EncodedFileCache.memory_size(tuple(lines))
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    paths = [write_file(tmp_path, 'texture%i.bin' % i, 6000, seed=i)[0] for i in range(3)]
+    sizes = [memory_size(util.bencode_file2lines_with_size(path)[0]) for path in paths[:2]]
+    monkeypatch.setattr(util.EncodedFileCache, 'max_size', sum(sizes) + 10)
+
+    # Use the first file again, so the second one is the least recently used
+    util.bencode_file2lines_with_size(paths[0])
+    third_size = memory_size(util.bencode_file2lines_with_size(paths[2])[0])
+
+    cached_paths = [key[0] for key in util.EncodedFileCache.entries]
+    assert cached_paths == [os.path.abspath(paths[0]), os.path.abspath(paths[2])]
+    assert util.EncodedFileCache.size == sizes[0] + third_size
@@ -0,0 +1,119 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+from fake_blender import Bag, load_definitions
+
+
+def find_node(material, nodetype):
+    return material.output_node
+
+
+namespace = {'find_node': find_node}
+get_material_emission, material_emits_light, mesh_cache_key, emitting_material = load_definitions(
+    'export/geometry.py',
+    ['get_material_emission', 'material_emits_light', 'GeometryExporter.mesh_cache_key',
+     'GeometryExporter.emitting_material'],
+    namespace)
+
+
+class Exporter(object):
+    mesh_cache_key = mesh_cache_key
+    emitting_material = emitting_material
+
+    def __init__(self, geometry_index):
+        self.geometry_scene = Bag(name='Scene')
+        self.geometry_index = geometry_index
+
+
+class SharedIndex(object):
+    """Every mesh has the same geometry"""
+
+    def is_shared(self, obj):
+        return True
+
+    def get(self, mesh):
+        return 'fingerprint'
+
+
+def material(name, use_emission=False, output_node=None):
+    return Bag(name=name, output_node=output_node, luxrender_emission=Bag(use_emission=use_emission))
+
+
+def emission_output(light_node=None):
+    links = [Bag(from_node=light_node)] if light_node is not None else []
+    return Bag(inputs={'Emission': Bag(is_linked=bool(links), links=links)})
+
+
+def mesh_object(name, *materials):
+    return Bag(name=name, data=Bag(name=name + '_mesh'), material_slots=[Bag(material=mat) for mat in materials])
+
+
+def test_material_emission():
+    light = Bag(name='Light')
+
+    assert get_material_emission(material('classic', use_emission=True)) == (True, None)
+    assert get_material_emission(material('plain')) == (False, None)
+    assert get_material_emission(material('nodes', use_emission=True, output_node=emission_output())) == (False, None)
+    assert get_material_emission(material('lamp', output_node=emission_output(light))) == (True, light)
+
+
+def test_material_emits_light():
+    scene = Bag(luxrender_lightgroups=Bag(is_enabled=lambda lightgroup: lightgroup != 'off'))
+
+    def emitter(gain=1.0, value=1.0, lightgroup='', nodetree=''):
+        return Bag(luxrender_emission=Bag(gain=gain, L_color=Bag(v=value), lightgroup=lightgroup),
+                   luxrender_material=Bag(nodetree=nodetree))
+
+    assert material_emits_light(scene, emitter())
+    assert not material_emits_light(scene, emitter(gain=0.0))
+    assert not material_emits_light(scene, emitter(value=0.0))
+    assert not material_emits_light(scene, emitter(lightgroup='off'))
+    assert material_emits_light(scene, emitter(gain=0.0, nodetree='Nodes'))
+    assert not material_emits_light(scene, emitter(lightgroup='off', nodetree='Nodes'))
+
+
+def test_identical_meshes_share_without_emission():
+    exporter = Exporter(SharedIndex())
+    a = mesh_object('A', material('red'))
+    b = mesh_object('B', material('blue'))
+
+    assert exporter.mesh_cache_key(a, 0) == exporter.mesh_cache_key(b, 0)
+
+
+def test_identical_meshes_with_different_emission_do_not_share():
+    exporter = Exporter(SharedIndex())
+    warm = material('warm', use_emission=True)
+    cold = material('cold', output_node=emission_output(Bag(name='Blackbody')))
+    a = mesh_object('A', warm)
+    b = mesh_object('B', cold)
+    c = mesh_object('C', material('plain'))
+    d = mesh_object('D', warm)
+
+    keys = {exporter.mesh_cache_key(obj, 0) for obj in (a, b, c)}
+    assert len(keys) == 3
+    assert exporter.mesh_cache_key(a, 0) == exporter.mesh_cache_key(d, 0)
+
+
+def test_unassigned_slot_and_unshared_meshes():
+    exporter = Exporter(SharedIndex())
+    assert exporter.mesh_cache_key(mesh_object('A'), 0)[3] is None
+
+    exporter = Exporter(None)
+    a = mesh_object('A', material('warm', use_emission=True))
+    assert exporter.mesh_cache_key(a, 0) == (exporter.geometry_scene, a.data, 0)
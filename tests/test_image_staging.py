@@ -0,0 +1,147 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import array
+import collections
+import hashlib
+import os
+
+import pytest
+
+from conftest import load_module
+from fake_blender import Bag, clean_name, load_definitions
+
+namespace = {'array': array, 'collections': collections, 'hashlib': hashlib, 'os': os,
+             'ExportProfiler': load_module('export/profiling.py').ExportProfiler,
+             'bpy': Bag(path=Bag(clean_name=clean_name))}
+ImageStagingCache, = load_definitions('export/luxcore/textures.py', ['ImageStagingCache'], namespace)
+
+
+class ForeachPixels(object):
+    """Pixel array of newer Blender versions, slicing is not allowed in the test"""
+
+    def __init__(self, values):
+        self.values = values
+        self.foreach_get_calls = 0
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, index):
+        raise AssertionError('pixels were sliced')
+
+    def foreach_get(self, buffer):
+        self.foreach_get_calls += 1
+        buffer[:] = array.array('f', self.values)
+
+
+class UntouchablePixels(object):
+    def __len__(self):
+        raise AssertionError('pixels were read')
+
+    def __getitem__(self, index):
+        raise AssertionError('pixels were read')
+
+
+def scene():
+    return Bag(render=Bag(image_settings=Bag(file_format='PNG', color_depth='8')),
+               view_settings=Bag(view_transform='Default', look='None', exposure=0.0, gamma=1.0),
+               display_settings=Bag(display_device='sRGB'))
+
+
+def image(pixels, source='GENERATED', is_dirty=False, color=(0.0, 0.0, 0.0, 1.0)):
+    return Bag(name='Untitled', library=None, packed_file=None, source=source, is_dirty=is_dirty, pixels=pixels,
+               size=(2, 1), channels=4, generated_type='BLANK', generated_color=color, use_generated_float=False)
+
+
+def test_generated_image_is_keyed_without_reading_pixels():
+    key = ImageStagingCache.create_key(image(UntouchablePixels()), scene())
+    other_color = ImageStagingCache.create_key(image(UntouchablePixels(), color=(1.0, 0.0, 0.0, 1.0)), scene())
+
+    assert key == ImageStagingCache.create_key(image(UntouchablePixels()), scene())
+    assert key != other_color
+
+
+def test_painted_image_is_hashed_with_foreach_get():
+    pixels = ForeachPixels([0.5] * 8)
+    key = ImageStagingCache.create_key(image(pixels, is_dirty=True), scene())
+    assert pixels.foreach_get_calls == 1
+
+    painted = ForeachPixels([0.5] * 7 + [0.25])
+    assert ImageStagingCache.create_key(image(painted, is_dirty=True), scene()) != key
+
+
+def test_pixel_slice_fallback_matches_foreach_get():
+    values = [0.1, 0.2, 0.3, 1.0, 0.4, 0.5, 0.6, 1.0]
+
+    assert ImageStagingCache.read_pixels(image(ForeachPixels(values))) == \
+        ImageStagingCache.read_pixels(image(list(values)))
+
+
+def test_render_settings_change_the_key():
+    settings = scene()
+    key = ImageStagingCache.create_key(image(UntouchablePixels()), settings)
+    settings.view_settings.exposure = 1.0
+
+    assert ImageStagingCache.create_key(image(UntouchablePixels()), settings) != key
+
+
+@pytest.fixture
+def staging(tmp_path, monkeypatch):
+    monkeypatch.setitem(namespace, 'efutil', Bag(export_path=str(tmp_path), temp_directory=lambda: str(tmp_path)))
+    monkeypatch.setattr(ImageStagingCache, 'max_size', 1000)
+    ImageStagingCache.clear()
+    yield ImageStagingCache
+    ImageStagingCache.clear()
+
+
+def packed_image(name, size):
+    """Packed image whose save_render() writes a file of size bytes"""
+    def save_render(filepath, blender_scene):
+        with open(filepath, 'wb') as f:
+            f.write(b'x' * size)
+
+    return Bag(name=name, library=None, packed_file=Bag(data=name.encode()), is_dirty=False, source='FILE',
+               save_render=save_render)
+
+
+def test_files_of_running_export_are_not_evicted(staging):
+    # 1600 bytes in one export, more than max_size
+    paths = [staging.stage(packed_image('Image%i' % i, 400), scene()) for i in range(4)]
+
+    assert all(os.path.exists(path) for path in paths)
+
+    # Once LuxCore has parsed the textures, the least recently used files are deleted down to the limit
+    staging.scene_parsed()
+
+    assert [os.path.exists(path) for path in paths] == [False, False, True, True]
+    assert sum(size for path, size in staging.files.values()) <= staging.max_size
+
+
+def test_reused_files_are_kept_for_the_next_export(staging):
+    first = staging.stage(packed_image('Old', 400), scene())
+    reused = staging.stage(packed_image('Reused', 400), scene())
+    staging.scene_parsed()
+
+    # The next export references the second image again and adds two new ones
+    assert staging.stage(packed_image('Reused', 400), scene()) == reused
+    paths = [staging.stage(packed_image('New%i' % i, 400), scene()) for i in range(2)]
+
+    assert not os.path.exists(first)
+    assert all(os.path.exists(path) for path in [reused] + paths)
@@ -0,0 +1,179 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import os
+import time
+
+from conftest import load_module
+from fake_blender import Bag, Matrix, load_definitions, make_pyluxcore
+
+ExportProfiler = load_module('export/profiling.py').ExportProfiler
+
+pyluxcore = make_pyluxcore()
+pyluxcore.RenderConfig = lambda config_properties, luxcore_scene: Bag(properties=config_properties)
+
+
+class ObjectExporter(object):
+    """Creates one LuxCore object per material slot, unless the object is hidden"""
+
+    conversions = []
+
+    def __init__(self, luxcore_exporter, blender_scene, is_viewport_render, blender_object):
+        self.blender_object = blender_object
+        self.properties = pyluxcore.Properties()
+
+    def convert(self, update_mesh, update_material, luxcore_scene):
+        obj = self.blender_object
+        self.conversions.append((obj.name, update_mesh))
+        self.properties = pyluxcore.Properties()
+
+        if not obj.hide_render:
+            for index, slot in enumerate(obj.material_slots):
+                name = '%s%03d' % (obj.name, index)
+                self.properties.Set(pyluxcore.Property('scene.objects.%s.material' % name, slot.material.name))
+
+        return self.properties
+
+
+LuxCoreExporter, = load_definitions('export/luxcore/__init__.py', ['LuxCoreExporter'], {
+    'ExportProfiler': ExportProfiler, 'pyluxcore': pyluxcore, 'time': time, 'os': os,
+    'SmokeCache': Bag(reset=lambda: None), 'ObjectExporter': ObjectExporter, 'ErrorCache': object,
+    'ImageColorSampler': lambda: None,
+    'get_elem_key': lambda element: element.name, 'ImageStagingCache': Bag(scene_parsed=lambda: None),
+})
+
+
+class StubExporter(LuxCoreExporter):
+    """Exporter kept alive between animation frames, with everything but the objects left out"""
+
+    def __init__(self, objects):
+        self.blender_scene = Bag(objects=objects, luxcore_translatorsettings=Bag(
+            profile_export=False, print_cfg=False, print_scn=False, export_type='internal'))
+        self.renderengine = Bag(test_break=lambda: False, update_stats=lambda *args: None,
+                                update_progress=lambda progress: None)
+        self.is_viewport_render = False
+        self.config_exporter = Bag(get_engine=lambda: 'PATHCPU')
+        self.config_properties = pyluxcore.Properties()
+        self.scene_properties = pyluxcore.Properties()
+        self.updated_scene_properties = pyluxcore.Properties()
+        self.object_cache = {}
+        self.object_matrices = {}
+        self.object_states = {}
+        self.dupli_cache = {}
+        self.light_cache = {}
+        self.temp_material_cache = set()
+
+    def convert_camera(self):
+        pass
+
+    def convert_all_volumes(self):
+        pass
+
+    def convert_config(self, film_width, film_height):
+        pass
+
+    def convert_imagepipeline(self):
+        pass
+
+    def convert_lightgroup_scales(self, verbose=False):
+        pass
+
+    def get_trace_filepath(self):
+        return None
+
+
+class LuxCoreScene(object):
+    def __init__(self):
+        self.deleted = []
+
+    def Parse(self, properties):
+        pass
+
+    def DeleteObject(self, name):
+        self.deleted.append(name)
+
+
+def material(name):
+    return Bag(name=name, animation_data=None, luxrender_material=Bag(nodetree=''), texture_slots=[])
+
+
+def blender_object(name, *materials):
+    slots = [Bag(material=material(material_name)) for material_name in materials]
+    return Bag(name=name, type='EMPTY', data=None, matrix_world=Matrix(), hide_render=False, layers=[True, False],
+               material_slots=slots, particle_systems=[], is_duplicator=False)
+
+
+def exported_frame(objects):
+    """An exporter and scene after the first frame of the animation was converted"""
+    exporter = StubExporter(objects)
+    luxcore_scene = LuxCoreScene()
+    exporter.convert_frame(64, 64, luxcore_scene)
+    del ObjectExporter.conversions[:]
+    return exporter, luxcore_scene
+
+
+def test_unchanged_objects_are_skipped():
+    exporter, luxcore_scene = exported_frame([blender_object('Cube', 'Wood')])
+
+    exporter.convert_frame(64, 64, luxcore_scene)
+
+    assert ObjectExporter.conversions == []
+    assert luxcore_scene.deleted == []
+
+
+def test_hidden_object_is_converted_again():
+    cube = blender_object('Cube', 'Wood')
+    exporter, luxcore_scene = exported_frame([cube])
+
+    cube.hide_render = True
+    exporter.convert_frame(64, 64, luxcore_scene)
+
+    assert ObjectExporter.conversions == [('Cube', True)]
+    assert luxcore_scene.deleted == ['Cube000']
+
+
+def test_object_with_other_materials_is_converted_again():
+    cube = blender_object('Cube', 'Wood')
+    exporter, luxcore_scene = exported_frame([cube])
+
+    cube.material_slots[0].material = material('Metal')
+    exporter.convert_frame(64, 64, luxcore_scene)
+    assert ObjectExporter.conversions == [('Cube', True)]
+
+    cube.layers = [False, True]
+    exporter.convert_frame(64, 64, luxcore_scene)
+    assert ObjectExporter.conversions == [('Cube', True), ('Cube', True)]
+
+
+def test_removed_object_is_deleted_with_its_duplis():
+    cube = blender_object('Cube', 'Wood')
+    exporter, luxcore_scene = exported_frame([cube, blender_object('Sphere', 'Wood')])
+
+    duplis = pyluxcore.Properties()
+    duplis.Set(pyluxcore.Property('scene.objects.Cube_dupli_0.shape', 'Cone'))
+    exporter.dupli_cache['Cube'] = Bag(properties=duplis)
+
+    exporter.blender_scene.objects.remove(cube)
+    exporter.convert_frame(64, 64, luxcore_scene)
+
+    assert sorted(luxcore_scene.deleted) == ['Cube000', 'Cube_dupli_0']
+    assert 'Cube' not in exporter.object_cache
+    assert 'Cube' not in exporter.dupli_cache
+    assert 'Cube' not in exporter.object_matrices
+    assert 'Cube' not in exporter.object_states
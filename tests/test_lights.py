@@ -0,0 +1,199 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+from fake_blender import Bag, load_definitions
+
+exported = []
+
+
+def export_light(scene, lux_context, ob, matrix, portals=[]):
+    exported.append((ob.name, list(portals)))
+    return True
+
+
+object_may_produce_lamps, group_contains_lamps, search_lamps, portals_for_light, lights = load_definitions(
+    'export/lights.py',
+    ['object_may_produce_lamps', 'group_contains_lamps', 'search_lamps', 'portals_for_light', 'lights'],
+    {'is_obj_visible': lambda scene, ob: True, 'exportLight': export_light, 'lamp_emits_light': lambda lamp: True})
+
+
+class CountingObjects(list):
+    """group.objects that counts how often it is iterated"""
+    iterations = 0
+
+    def __iter__(self):
+        self.iterations += 1
+        return super().__iter__()
+
+
+def lamp(name):
+    return Bag(name=name, type='LAMP', is_duplicator=False, dupli_type='NONE', parent=None, hide_render=False,
+               matrix_world=None, data=Bag(name=name, luxrender_lamp=Bag(lightgroup='')))
+
+
+def mesh(name):
+    return Bag(name=name, type='MESH', is_duplicator=False, dupli_type='NONE', parent=None, hide_render=False)
+
+
+def group(name, *objects):
+    return Bag(name=name, objects=CountingObjects(objects))
+
+
+def group_duplicator(name, dupli_group):
+    ob = mesh(name)
+    ob.is_duplicator = True
+    ob.dupli_type = 'GROUP'
+    ob.dupli_group = dupli_group
+    ob.dupli_list = []
+    ob.dupli_list_creations = 0
+
+    def dupli_list_create(scene):
+        ob.dupli_list_creations += 1
+        ob.dupli_list = [Bag(object=child, matrix=None) for child in dupli_group.objects]
+
+    def dupli_list_clear():
+        ob.dupli_list = []
+
+    ob.dupli_list_create = dupli_list_create
+    ob.dupli_list_clear = dupli_list_clear
+    return ob
+
+
+def test_lamps_and_plain_objects():
+    assert object_may_produce_lamps(lamp('Sun'), {})
+    assert not object_may_produce_lamps(mesh('Cube'), {})
+
+
+def test_group_results_are_memoized():
+    trees = group('Trees', mesh('Tree'), mesh('Bush'))
+    cache = {}
+    duplicators = [group_duplicator('Forest%i' % i, trees) for i in range(50)]
+
+    assert not any(object_may_produce_lamps(ob, cache) for ob in duplicators)
+    assert trees.objects.iterations == 1
+    assert cache[trees] is False
+
+    lamps = group('Lamps', mesh('Post'), lamp('Bulb'))
+    nested = group('Street', group_duplicator('Row', lamps))
+    assert object_may_produce_lamps(group_duplicator('City', nested), cache)
+    assert group_contains_lamps(nested, cache)
+    assert lamps.objects.iterations == 1
+
+
+def test_vertex_duplicators_check_their_children():
+    ob = mesh('Emitter')
+    ob.is_duplicator = True
+    ob.dupli_type = 'VERTS'
+    ob.children = [mesh('Pebble')]
+    assert not object_may_produce_lamps(ob, {})
+
+    ob.children.append(lamp('Firefly'))
+    assert object_may_produce_lamps(ob, {})
+
+
+def test_cyclic_groups_terminate():
+    a = group('A', mesh('Cube'))
+    b = group('B')
+    a.objects.append(group_duplicator('ToB', b))
+    b.objects.append(group_duplicator('ToA', a))
+    assert not group_contains_lamps(a, {})
+
+    b.objects.append(lamp('Lamp'))
+    assert group_contains_lamps(a, {})
+
+
+def test_groups_on_a_cycle_are_not_cached_as_lamp_free():
+    a = group('A')
+    b = group('B')
+    a.objects.append(group_duplicator('ToB', b))
+    a.objects.append(lamp('Lamp'))
+    b.objects.append(group_duplicator('ToA', a))
+    cache = {}
+
+    # B is checked while A is still running, B reaches the lamp of A through ToA
+    assert group_contains_lamps(a, cache)
+    assert group_contains_lamps(b, cache)
+    assert object_may_produce_lamps(b.objects[0], cache)
+    assert all(cache.values())
+
+    # Without lamps every group and duplicator on the cycle is cached as lamp-free
+    c = group('C')
+    d = group('D', group_duplicator('ToC', c))
+    c.objects.append(group_duplicator('ToD', d))
+    cache = {}
+
+    assert not group_contains_lamps(c, cache)
+    assert cache == {c: False, d: False, c.objects[0]: False, d.objects[0]: False}
+
+
+def test_lamp_free_duplicators_are_not_expanded():
+    del exported[:]
+    trees = group_duplicator('Forest', group('Trees', mesh('Tree')))
+    lamps = group_duplicator('Street', group('Lamps', mesh('Post'), lamp('Bulb')))
+    scene = Bag(objects=[trees, lamps, lamp('Sun')])
+
+    assert lights(None, scene, scene, Bag(cache_items={}))
+    assert trees.dupli_list_creations == 0
+    assert lamps.dupli_list_creations == 1
+    assert [name for name, portals in exported] == ['Bulb', 'Sun']
+
+
+def test_unlit_scene():
+    del exported[:]
+    scene = Bag(objects=[mesh('Cube'), group_duplicator('Forest', group('Trees', mesh('Tree')))])
+
+    assert not lights(None, scene, scene, Bag(cache_items={}))
+    assert exported == []
+
+
+def sky(name, lightgroup):
+    light = lamp(name)
+    light.data.luxrender_lamp.lightgroup = lightgroup
+    return light
+
+
+PORTALS = [('', 'Window'), ('sky', 'Skylight'), ('default', 'Door'), ('sky', 'Roof')]
+
+
+def test_portals_match_the_light_group():
+    cache = {}
+
+    assert portals_for_light(sky('Sky', 'sky').data, PORTALS, cache) == ['Window', 'Skylight', 'Roof']
+    assert portals_for_light(sky('Sun', 'sun').data, PORTALS, cache) == ['Window']
+    assert set(cache) == {'sky', 'sun'}
+
+
+def test_lights_without_light_group_use_the_default_group():
+    assert portals_for_light(sky('Hemi', '').data, PORTALS, {}) == ['Window', 'Door']
+    assert portals_for_light(sky('Sky', 'sky').data, [('', 'Window')], {}) == ['Window']
+
+
+def test_portal_shapes_come_from_the_mesh_definitions():
+    del exported[:]
+    window = Bag(name='Window', luxrender_mesh=Bag(portal=True, portal_lightgroup=''))
+    skylight = Bag(name='Skylight', luxrender_mesh=Bag(portal=True, portal_lightgroup='sky'))
+    wall = Bag(name='Wall', luxrender_mesh=Bag(portal=False, portal_lightgroup=''))
+
+    mesh_definitions = {('Scene', window, 0): ('Window_0000_m000',), ('Scene', skylight, 0): ('Skylight_0000_m000',),
+                        ('Scene', wall, 0): ('Wall_0000_m000',), 'proxy.ply': ('proxy',)}
+    scene = Bag(objects=[sky('Sky', 'sky'), sky('Sun', '')])
+
+    lights(None, scene, scene, Bag(cache_items=mesh_definitions, get=mesh_definitions.get))
+
+    assert exported == [('Sky', ['Window_0000_m000', 'Skylight_0000_m000']), ('Sun', ['Window_0000_m000'])]
@@ -0,0 +1,88 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+from fake_blender import Bag, load_definitions
+
+
+def get_linked_node(socket):
+    return socket.links[0].from_node if socket.is_linked else None
+
+
+NodeExportCache, export_socket_luxcore = load_definitions(
+    'properties/node_sockets.py', ['NodeExportCache', 'export_socket_luxcore'], {'get_linked_node': get_linked_node})
+
+
+class StubNode(object):
+    """Exports its linked inputs first, like the LuxRender texture and material nodes"""
+
+    def __init__(self, name, *inputs):
+        self.name = name
+        self.outputs = [Bag(identifier='Color')]
+        self.inputs = [Bag(is_linked=True, links=[Bag(from_node=node, from_socket=node.outputs[0])])
+                       for node in inputs]
+        self.export_count = 0
+
+    def as_pointer(self):
+        return id(self)
+
+    def export_luxcore(self, properties):
+        self.export_count += 1
+        input_names = [export_socket_luxcore(properties, socket) for socket in self.inputs]
+        properties.append((self.name, input_names))
+        return self.name
+
+
+def root_socket(node):
+    return Bag(is_linked=True, links=[Bag(from_node=node, from_socket=node.outputs[0])])
+
+
+def diamond_tree(depth):
+    """Every mix level uses the level below twice, without the cache the leaf is exported 2 ** depth times"""
+    leaf = StubNode('leaf')
+    node = leaf
+
+    for level in range(depth):
+        node = StubNode('mix%i' % level, node, node)
+
+    return leaf, node
+
+
+def test_shared_node_is_exported_once_per_tree():
+    NodeExportCache.reset()
+    leaf, root = diamond_tree(10)
+    properties = []
+
+    assert export_socket_luxcore(properties, root_socket(root)) == 'mix9'
+    assert leaf.export_count == 1
+    assert root.export_count == 1
+    assert len(properties) == 11
+    assert properties[1] == ('mix0', ['leaf', 'leaf'])
+
+
+def test_cache_resets_for_the_next_export():
+    NodeExportCache.reset()
+    leaf, root = diamond_tree(3)
+
+    export_socket_luxcore([], root_socket(root))
+    export_socket_luxcore([], root_socket(root))
+    assert leaf.export_count == 2
+
+
+def test_unlinked_socket_returns_fallback():
+    assert export_socket_luxcore([], Bag(is_linked=False, links=[]), fallback=0.5) == 0.5
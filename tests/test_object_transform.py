@@ -0,0 +1,89 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+from fake_blender import Bag, Matrix, load_definitions, make_pyluxcore
+
+pyluxcore = make_pyluxcore()
+
+
+def matrix_to_list(matrix, apply_worldscale=False):
+    return [value for row in matrix.transposed().rows for value in row]
+
+
+update_transform, = load_definitions('export/luxcore/objects.py', ['ObjectExporter.update_transform'],
+                                     {'pyluxcore': pyluxcore, 'matrix_to_list': matrix_to_list})
+
+
+def translation(x, y, z):
+    return Matrix([[1, 0, 0, x], [0, 1, 0, y], [0, 0, 1, z], [0, 0, 0, 1]])
+
+
+def exported_cube(instanced=True, **object_settings):
+    """ObjectExporter state after convert() of a cube with two materials"""
+    settings = dict(name='Cube', type='MESH', particle_systems=[], is_duplicator=False,
+                    matrix_world=translation(1, 2, 3))
+    settings.update(object_settings)
+    obj = Bag(**settings)
+
+    properties = pyluxcore.Properties()
+    for part in ('Cube000', 'Cube001'):
+        properties.Set(pyluxcore.Property('scene.objects.%s.shape' % part, part + '_shape'))
+        properties.Set(pyluxcore.Property('scene.objects.%s.material' % part, 'Material'))
+        if instanced:
+            properties.Set(pyluxcore.Property('scene.objects.%s.transformation' % part, matrix_to_list(Matrix())))
+
+    camera = Bag(data=Bag(luxrender_camera=Bag(usemblur=False, objectmblur=True)))
+    return Bag(blender_object=obj, is_dupli=False, properties=properties,
+               blender_scene=Bag(camera=camera),
+               exported_objects=[Bag(luxcore_object_name='Cube000'), Bag(luxcore_object_name='Cube001')])
+
+
+def test_transform_change_emits_only_transformations():
+    exporter = exported_cube()
+    before = dict(exporter.properties.values)
+
+    properties = update_transform(exporter)
+
+    assert sorted(properties.GetAllNames()) == ['scene.objects.Cube000.transformation',
+                                                'scene.objects.Cube001.transformation']
+    expected = matrix_to_list(translation(1, 2, 3))
+    assert all(value == expected for value in properties.values.values())
+
+    # The cached properties of the exporter follow, shapes and materials are untouched
+    changed = {name for name, value in exporter.properties.values.items() if before[name] != value}
+    assert changed == set(properties.GetAllNames())
+
+
+def test_objects_that_need_a_full_conversion():
+    assert update_transform(exported_cube(instanced=False)) is None
+    assert update_transform(exported_cube(type='LAMP')) is None
+    assert update_transform(exported_cube(is_duplicator=True)) is None
+    assert update_transform(exported_cube(particle_systems=[Bag(name='Hair')])) is None
+
+    dupli = exported_cube()
+    dupli.is_dupli = True
+    assert update_transform(dupli) is None
+
+    motion_blur = exported_cube()
+    motion_blur.blender_scene.camera.data.luxrender_camera.usemblur = True
+    assert update_transform(motion_blur) is None
+
+    not_exported = exported_cube()
+    not_exported.exported_objects = []
+    assert update_transform(not_exported) is None
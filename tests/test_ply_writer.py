@@ -0,0 +1,133 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import collections
+import concurrent.futures
+import os
+import struct
+import threading
+
+import fake_blender
+import synthetic
+from conftest import load_module
+from fake_blender import Bag, load_definitions, log
+
+bpy, mathutils, pyluxcore = fake_blender.install()
+
+ExportProfiler = load_module('export/profiling.py').ExportProfiler
+
+export_ns = {'collections': collections, 'concurrent': concurrent}
+ParamSetItem, ParamSet, ExportCache, ExportWriterPool = load_definitions(
+    'export/__init__.py', ['ParamSetItem', 'ParamSet', 'ExportCache', 'ExportWriterPool'], export_ns)
+
+
+def load_ply_exporter(export_dir):
+    """The parts of GeometryExporter that buildBinaryPLYMesh() uses, writing to export_dir"""
+    ply_ns = {'os': os, 'struct': struct, 'bpy': bpy, 'LuxLog': log, 'ParamSet': ParamSet,
+              'ExportProfiler': ExportProfiler,
+              'efutil': Bag(export_path=export_dir, scene_filename=lambda: 'test',
+                            path_relative_to_export=lambda path: path)}
+    load_definitions('export/geometry.py',
+                     ['InvalidGeometryException', 'UnexportableObjectException', 'write_binary_ply'], ply_ns)
+    build_ply, cache_key, instancing = load_definitions(
+        'export/geometry.py',
+        ['GeometryExporter.buildBinaryPLYMesh', 'GeometryExporter.mesh_cache_key',
+         'GeometryExporter.allow_instancing'], ply_ns)
+
+    class Exporter(object):
+        NewExportedObjects = set()
+        KnownExportedObjects = set()
+        KnownModifiedObjects = set()
+        geometry_index = None
+        buildBinaryPLYMesh = build_ply
+        mesh_cache_key = cache_key
+        allow_instancing = instancing
+
+        def __init__(self, workers):
+            self.geometry_scene = Bag(name='Scene')
+            self.visibility_scene = Bag(frame_current=1, luxrender_engine=Bag(partial_ply=False))
+            self.ExportedMeshes = ExportCache('ExportedMeshes')
+            self.ExportedPLYs = ExportCache('ExportedPLYs')
+            self.writer_pool = ExportWriterPool(workers)
+
+    ply_ns['GeometryExporter'] = Exporter
+    return Exporter
+
+
+def export_plys(export_dir, workers):
+    """Export a stub scene of several meshes, returns {relative path: file contents}"""
+    exporter = load_ply_exporter(str(export_dir))(workers)
+    meshes = [synthetic.grid_mesh(8 + i, material_count=1 + i % 3, uv=i % 2 == 0, vertex_colors=i % 3 != 0)
+              for i in range(6)]
+    definitions = []
+
+    for i, mesh in enumerate(meshes):
+        definitions.extend(exporter.buildBinaryPLYMesh(synthetic.mesh_object('Grid%i' % i, mesh, ParamSet)))
+
+    exporter.writer_pool.shutdown()
+
+    files = {}
+    for directory, _, filenames in os.walk(str(export_dir)):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            with open(path, 'rb') as ply:
+                files[os.path.relpath(path, str(export_dir))] = ply.read()
+
+    return definitions, files
+
+
+def test_parallel_plys_are_identical_to_serial(tmp_path):
+    serial_definitions, serial_files = export_plys(tmp_path / 'serial', 1)
+    parallel_definitions, parallel_files = export_plys(tmp_path / 'parallel', 4)
+
+    assert len(serial_files) == sum(1 + i % 3 for i in range(6))
+    assert sorted(parallel_files) == sorted(serial_files)
+
+    for path, data in serial_files.items():
+        assert parallel_files[path] == data, path
+
+    assert [definition[:3] for definition in parallel_definitions] == \
+        [definition[:3] for definition in serial_definitions]
+
+
+def test_threads_start_with_first_job():
+    pool = ExportWriterPool(4)
+    assert pool.executor is None
+
+    # Nothing submitted (e.g. a material preview), shutting down does not need any threads
+    pool.shutdown()
+    assert pool.executor is None
+
+    threads = set()
+    pool.submit(lambda: threads.add(threading.get_ident()))
+    assert pool.executor is not None
+
+    pool.shutdown()
+    assert pool.executor is None
+    assert threads and threading.get_ident() not in threads
+
+
+def test_single_worker_runs_jobs_on_caller():
+    pool = ExportWriterPool(1)
+    threads = []
+
+    pool.submit(lambda: threads.append(threading.get_ident()))
+
+    assert threads == [threading.get_ident()]
+    assert pool.executor is None
@@ -0,0 +1,244 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import json
+import os
+import time
+
+import pytest
+
+from conftest import load_module
+from fake_blender import Bag, Matrix, load_definitions, make_pyluxcore
+
+profiling = load_module('export/profiling.py')
+ExportProfiler = profiling.ExportProfiler
+
+pyluxcore = make_pyluxcore()
+pyluxcore.RenderConfig = lambda config_properties, luxcore_scene: Bag(properties=config_properties)
+
+SPAN_FIELDS = {'name', 'cat', 'ph', 'ts', 'dur', 'pid', 'tid'}
+
+
+class ObjectExporter(object):
+    """Converts the materials of the object, like the real one does for its mesh parts"""
+
+    def __init__(self, luxcore_exporter, blender_scene, is_viewport_render, blender_object):
+        self.luxcore_exporter = luxcore_exporter
+        self.blender_object = blender_object
+        self.properties = pyluxcore.Properties()
+
+    def convert(self, update_mesh, update_material, luxcore_scene):
+        for material in self.blender_object.materials:
+            self.luxcore_exporter.convert_material(material)
+
+        name = self.blender_object.name
+        self.properties.Set(pyluxcore.Property('scene.objects.%s.shape' % name, name))
+        return self.properties
+
+
+class MaterialExporter(object):
+    def __init__(self, luxcore_exporter, blender_scene, material):
+        self.material = material
+        self.properties = pyluxcore.Properties()
+
+    def convert(self):
+        if self.material.broken:
+            raise RuntimeError('Cannot convert material %s' % self.material.name)
+
+        time.sleep(0.001)
+        self.properties.Set(pyluxcore.Property('scene.materials.%s.type' % self.material.name, 'matte'))
+        return self.properties
+
+
+LuxCoreExporter, = load_definitions('export/luxcore/__init__.py', ['LuxCoreExporter'], {
+    'ExportProfiler': ExportProfiler, 'pyluxcore': pyluxcore, 'time': time, 'os': os,
+    'SmokeCache': Bag(reset=lambda: None), 'ObjectExporter': ObjectExporter, 'MaterialExporter': MaterialExporter,
+    'get_elem_key': lambda element: element.name, 'ImageColorSampler': lambda: None, 'ErrorCache': object,
+    'ImageStagingCache': Bag(scene_parsed=lambda: None),
+})
+
+
+class StubExporter(LuxCoreExporter):
+    """Scene exporter with the camera, volume and config conversion left out"""
+
+    def __init__(self, objects, trace_filepath, cancel=False):
+        self.blender_scene = Bag(objects=objects, luxcore_translatorsettings=Bag(
+            profile_export=True, print_cfg=False, print_scn=False, export_type='internal'))
+        self.renderengine = Bag(test_break=lambda: cancel, update_stats=lambda *args: None,
+                                update_progress=lambda progress: None)
+        self.is_viewport_render = False
+        self.is_material_preview = False
+        self.geometry_index = None
+        self.trace_filepath = trace_filepath
+
+        self.config_exporter = Bag(get_engine=lambda: 'PATHCPU')
+        self.config_properties = pyluxcore.Properties()
+        self.scene_properties = pyluxcore.Properties()
+        self.updated_scene_properties = pyluxcore.Properties()
+        self.object_cache = {}
+        self.object_matrices = {}
+        self.object_states = {}
+        self.dupli_cache = {}
+        self.material_cache = {}
+        self.temp_material_cache = set()
+
+    def convert_camera(self):
+        pass
+
+    def convert_all_volumes(self):
+        pass
+
+    def convert_config(self, film_width, film_height):
+        pass
+
+    def convert_imagepipeline(self):
+        pass
+
+    def convert_lightgroup_scales(self, verbose=False):
+        pass
+
+    def get_trace_filepath(self):
+        return self.trace_filepath
+
+
+def material(name, broken=False):
+    return Bag(name=name, broken=broken)
+
+
+def scene_objects(broken=False):
+    wood, metal = material('Wood'), material('Metal', broken)
+    return [Bag(name='Cube', type='MESH', materials=[wood, metal], matrix_world=Matrix(), material_slots=[],
+                particle_systems=[], is_duplicator=False, hide_render=False, layers=[True], data=None),
+            Bag(name='Sphere', type='MESH', materials=[wood], matrix_world=Matrix(), material_slots=[],
+                particle_systems=[], is_duplicator=False, hide_render=False, layers=[True], data=None)]
+
+
+def luxcore_scene():
+    return Bag(Parse=lambda properties: None)
+
+
+@pytest.fixture(autouse=True)
+def stopped_profiler():
+    ExportProfiler.begin(False)
+    yield
+    ExportProfiler.begin(False)
+
+
+def contains(outer, inner):
+    return outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+
+
+def test_trace_of_stubbed_export(tmp_path):
+    trace_filepath = str(tmp_path / 'scene.trace.json')
+
+    config = StubExporter(scene_objects(), trace_filepath).convert(64, 64, luxcore_scene())
+
+    assert config is not None
+    assert not ExportProfiler.enabled
+
+    with open(trace_filepath) as trace_file:
+        trace = json.load(trace_file)
+
+    spans = {(event['cat'], event['name']): event for event in trace['traceEvents'] if event['ph'] == 'X'}
+    counters = [event for event in trace['traceEvents'] if event['ph'] == 'C']
+
+    assert sorted(spans) == [('export', 'camera'), ('export', 'config'), ('export', 'objects'),
+                             ('export', 'parse'), ('export', 'volumes'),
+                             ('material', 'Metal'), ('material', 'Wood'), ('object', 'Cube'), ('object', 'Sphere')]
+
+    for (cat, name), event in spans.items():
+        assert set(event) == SPAN_FIELDS | ({'args'} if cat == 'object' else set())
+        assert event['pid'] == os.getpid()
+        assert event['ts'] >= 0 and event['dur'] >= 0
+
+    assert spans['object', 'Cube']['args'] == {'type': 'MESH'}
+
+    # Materials are converted by their object, objects inside the 'objects' stage
+    assert contains(spans['export', 'objects'], spans['object', 'Cube'])
+    assert contains(spans['export', 'objects'], spans['object', 'Sphere'])
+    assert contains(spans['object', 'Cube'], spans['material', 'Wood'])
+    assert contains(spans['object', 'Cube'], spans['material', 'Metal'])
+    assert not contains(spans['object', 'Sphere'], spans['material', 'Wood'])
+
+    # Wood was already converted for the cube
+    assert [(event['name'], event['cat'], event['args']) for event in counters] == [
+        ('material cache hits', 'counter', {'value': 1})]
+    assert set(counters[0]) == SPAN_FIELDS - {'dur'} | {'args'}
+    assert trace['otherData'] == {'counters': {'material cache hits': 1}}
+
+
+def test_summary_of_stubbed_export(tmp_path):
+    StubExporter(scene_objects(), None).convert(64, 64, luxcore_scene())
+
+    summary = ExportProfiler.get_summary()
+    rows = {(cat, name): (count, total, maximum) for cat, name, count, total, maximum in summary}
+
+    # Export stages by name, elements per category
+    assert set(rows) == {('export', 'camera'), ('export', 'volumes'), ('export', 'objects'), ('export', 'config'),
+                         ('export', 'parse'), ('object', '(all)'), ('material', '(all)')}
+    assert rows['object', '(all)'][0] == 2
+    assert rows['material', '(all)'][0] == 2
+    assert rows['export', 'objects'][1] >= rows['object', '(all)'][1] >= rows['material', '(all)'][1]
+    assert rows['material', '(all)'][2] <= rows['material', '(all)'][1]
+    assert [row[3] for row in summary] == sorted((row[3] for row in summary), reverse=True)
+
+
+def test_summary_groups_spans():
+    ExportProfiler.begin()
+    start = ExportProfiler.start_time
+    ExportProfiler.add_span('geometry', 'export', start, start + 3.0)
+    ExportProfiler.add_span('Cube', 'object', start, start + 1.0)
+    ExportProfiler.add_span('Sphere', 'object', start + 1.0, start + 1.5)
+    ExportProfiler.add_span('lights', 'export', start + 3.0, start + 3.25)
+
+    assert ExportProfiler.get_summary() == [
+        ('export', 'geometry', 1, pytest.approx(3.0), pytest.approx(3.0)),
+        ('object', '(all)', 2, pytest.approx(1.5), pytest.approx(1.0)),
+        ('export', 'lights', 1, pytest.approx(0.25), pytest.approx(0.25)),
+    ]
+
+
+def test_disabled_profiler_collects_nothing():
+    ExportProfiler.begin(False)
+
+    with ExportProfiler.span('geometry') as span:
+        ExportProfiler.count('vertices', 8)
+
+    assert span is profiling.NULL_SPAN
+    assert ExportProfiler.events == [] and not ExportProfiler.counters
+
+
+@pytest.mark.parametrize('convert', ['convert', 'convert_frame'])
+def test_failed_conversion_stops_profiler(tmp_path, convert):
+    trace_filepath = str(tmp_path / 'scene.trace.json')
+    exporter = StubExporter(scene_objects(broken=True), trace_filepath)
+
+    with pytest.raises(RuntimeError):
+        getattr(exporter, convert)(64, 64, luxcore_scene())
+
+    assert not ExportProfiler.enabled
+    assert ExportProfiler.span('viewport update') is profiling.NULL_SPAN
+    assert not os.path.exists(trace_filepath)
+
+
+def test_cancelled_conversion_stops_profiler(tmp_path):
+    exporter = StubExporter(scene_objects(), str(tmp_path / 'scene.trace.json'), cancel=True)
+
+    assert exporter.convert(64, 64, luxcore_scene()) is None
+    assert not ExportProfiler.enabled
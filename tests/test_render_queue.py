@@ -0,0 +1,165 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import sys
+import time
+
+from conftest import load_module
+
+render_queue = load_module('core/render_queue.py')
+
+
+def sleeper(seconds, exit_code=0):
+    return [sys.executable, '-c', 'import sys, time; time.sleep(%f); sys.exit(%i)' % (seconds, exit_code)]
+
+
+def never_break():
+    return False
+
+
+def test_split_threads():
+    assert render_queue.split_threads(8, 1) == [8]
+    assert render_queue.split_threads(10, 4) == [3, 3, 2, 2]
+    assert render_queue.split_threads(2, 4) == [1, 1, 1, 1]
+
+
+def test_pipeline_divides_threads_between_slots():
+    pipeline = render_queue.FramePipeline(3, 8, log=lambda message: None)
+    assert pipeline.thread_budget == [3, 3, 2]
+    assert sum(pipeline.thread_budget) == 8
+
+
+def test_pipeline_bounds_frames_in_flight():
+    pipeline = render_queue.FramePipeline(2, 4, log=lambda message: None)
+
+    for frame in range(2):
+        slot = pipeline.wait_for_slot(never_break, poll_interval=0.01)
+        pipeline.dispatch(slot, sleeper(0.3))
+
+    assert len(pipeline.running()) == 2
+
+    start = time.perf_counter()
+    slot = pipeline.wait_for_slot(never_break, poll_interval=0.01)
+    assert time.perf_counter() - start > 0.1
+    pipeline.dispatch(slot, sleeper(0))
+
+    assert pipeline.wait_all(never_break, poll_interval=0.01)
+    assert pipeline.running() == []
+    assert pipeline.failed == []
+
+
+def test_pipeline_waits_for_last_frames():
+    pipeline = render_queue.FramePipeline(2, 4, log=lambda message: None)
+    pipeline.dispatch(0, sleeper(0.2))
+    pipeline.dispatch(1, sleeper(0, exit_code=2))
+
+    start = time.perf_counter()
+    assert pipeline.wait_all(never_break, poll_interval=0.01)
+    assert time.perf_counter() - start > 0.1
+    assert [process.returncode for process in pipeline.failed] == [2]
+
+
+def test_pipeline_cancel_terminates_processes():
+    pipeline = render_queue.FramePipeline(2, 4, log=lambda message: None)
+    pipeline.dispatch(0, sleeper(30))
+    pipeline.dispatch(1, sleeper(30))
+    processes = list(pipeline.slots)
+
+    assert pipeline.wait_for_slot(lambda: True, poll_interval=0.01) is None
+    assert all(process.poll() is not None for process in processes)
+    assert pipeline.slots == [None, None]
+
+    pipeline.dispatch(0, sleeper(30))
+    process = pipeline.slots[0]
+    assert not pipeline.wait_all(lambda: True, poll_interval=0.01)
+    assert process.poll() is not None
+
+
+def quiet_scheduler(scene_files, make_args, process_count, max_retries=1):
+    return render_queue.RenderQueueScheduler(scene_files, make_args, process_count, process_count * 2,
+                                             max_retries=max_retries, log=lambda message: None)
+
+
+def test_scheduler_gives_up_after_max_retries():
+    started = []
+
+    def make_args(scene_file, threads):
+        started.append(scene_file)
+        return sleeper(0, exit_code=3)
+
+    scheduler = quiet_scheduler(['frame0.lxs'], make_args, 1, max_retries=2)
+
+    assert scheduler.run(never_break, poll_interval=0.01)
+    assert started == ['frame0.lxs'] * 3
+    assert scheduler.finished == []
+    assert [(frame.index, frame.attempts, frame.returncode) for frame in scheduler.failed] == [(0, 3, 3)]
+
+
+def test_scheduler_hands_out_frames_as_slots_free_up():
+    scene_files = ['frame%i.lxs' % index for index in range(5)]
+    durations = {'frame0.lxs': 0.1, 'frame1.lxs': 1.0}
+    started = []
+
+    def make_args(scene_file, threads):
+        started.append((scene_file, len(scheduler.running())))
+        return sleeper(durations.get(scene_file, 0.05))
+
+    def check_slots():
+        assert len(scheduler.running()) <= 2
+        return False
+
+    scheduler = quiet_scheduler(scene_files, make_args, 2)
+
+    assert scheduler.thread_budget == [2, 2]
+    assert scheduler.run(check_slots, poll_interval=0.01)
+    # The first two frames fill both slots, every following frame starts when one of them is free again
+    assert started == [('frame0.lxs', 0), ('frame1.lxs', 1), ('frame2.lxs', 1), ('frame3.lxs', 1),
+                       ('frame4.lxs', 1)]
+    assert sorted(frame.index for frame in scheduler.finished) == list(range(5))
+    assert scheduler.finished[-1].index == 1
+    assert scheduler.failed == []
+
+
+def test_scheduler_cancel_terminates_processes():
+    scheduler = quiet_scheduler(['frame%i.lxs' % index for index in range(3)],
+                                lambda scene_file, threads: sleeper(30), 2)
+    processes = []
+    stop = scheduler.stop
+
+    def recording_stop():
+        processes.extend(process for frame, process in scheduler.running())
+        stop()
+
+    scheduler.stop = recording_stop
+
+    assert not scheduler.run(lambda: True, poll_interval=0.01)
+    assert len(processes) == 2
+    assert all(process.poll() is not None for process in processes)
+    assert scheduler.running() == []
+    assert scheduler.pending == []
+
+
+def test_scheduler_handles_missing_renderer():
+    scheduler = quiet_scheduler(['frame0.lxs', 'frame1.lxs'],
+                                lambda scene_file, threads: ['/nonexistent/luxconsole', scene_file], 2)
+
+    assert scheduler.run(never_break, poll_interval=0.01)
+    assert scheduler.finished == []
+    assert [(frame.index, frame.attempts, frame.returncode) for frame in scheduler.failed] == [(0, 2, -1),
+                                                                                                (1, 2, -1)]
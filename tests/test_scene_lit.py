@@ -0,0 +1,147 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import ast
+import os
+import tempfile
+
+import pytest
+
+from conftest import load_module
+from fake_blender import SOURCE_ROOT, Bag, load_definitions, log
+
+
+class NoPreScan(object):
+    """scene.objects of the test scenes, the exporter itself must not walk it to look for lights"""
+
+    def __iter__(self):
+        raise AssertionError('scene objects scanned outside of the geometry and light export')
+
+
+class RecordingContext(object):
+    """Lux context that accepts every API call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append(name)
+
+
+class StubLuxManager(object):
+    active = None
+
+    def __init__(self, name, api_type):
+        self.lux_context = RecordingContext()
+
+    @classmethod
+    def GetActive(cls):
+        return cls.active
+
+    @classmethod
+    def SetActive(cls, manager):
+        cls.active = manager
+
+    @classmethod
+    def SetCurrentScene(cls, scene):
+        pass
+
+    def reset(self):
+        StubLuxManager.active = None
+
+
+def settings(**attributes):
+    return Bag(api_output=lambda *args: ('default', []), **attributes)
+
+
+def stub_scene(emitting_meshes, lamps):
+    camera_settings = settings(usemblur=False, cammblur=False, Exterior_volume='',
+                               lookAt=lambda *args: (0, 0, 0, 0, 0, -1, 0, 1, 0), luxrender_film=settings())
+    return Bag(name='Scene', frame_current=1, frame_set=lambda frame: None, objects=NoPreScan(),
+               background_set=None, camera=Bag(data=Bag(luxrender_camera=camera_settings)),
+               luxrender_testing=Bag(profile_export=False, re_raise=False),
+               luxrender_rendermode=settings(), luxrender_sampler=settings(), luxrender_accelerator=settings(),
+               luxrender_integrator=settings(), luxrender_volumeintegrator=settings(), luxrender_filter=settings(),
+               luxrender_volumes=Bag(volumes=[]), luxrender_world=Bag(default_exterior_volume=''),
+               emitting_meshes=emitting_meshes, lamps=lamps)
+
+
+class StubGeometryExporter(object):
+    def __init__(self, lux_context, scene):
+        self.ExportedMeshes = {}
+        self.writer_pool = Bag(shutdown=lambda: None)
+
+    def iterateScene(self, scene):
+        return scene.emitting_meshes
+
+
+def export(scene):
+    namespace = {
+        'os': os, 'tempfile': tempfile, 'LuxLog': log, 'LuxManager': StubLuxManager,
+        'ExportProfiler': load_module('export/profiling.py').ExportProfiler,
+        'efutil': Bag(export_path=''), 'Files': Bag(MAIN=0, GEOM=1, MATS=2),
+        'export_geometry': Bag(GeometryExporter=StubGeometryExporter),
+        'export_materials': Bag(ExportedMaterials=Bag(clear=lambda: None), ExportedTextures=Bag(clear=lambda: None)),
+        'export_lights': Bag(lights=lambda lux_context, geom_scene, scene, meshes: geom_scene.lamps),
+        'object_anim_matrices': None,
+    }
+    SceneExporterProperties, SceneExporter = load_definitions(
+        'export/scene.py', ['SceneExporterProperties', 'SceneExporter'], namespace)
+
+    properties = SceneExporterProperties()
+    properties.filename = 'test'
+    properties.directory = tempfile.gettempdir()
+    properties.api_type = 'API'
+    properties.write_all_files = False
+
+    reports = []
+    exporter = SceneExporter().set_properties(properties).set_scene(scene)
+    exporter.set_report(lambda type, message: reports.append((type, message)))
+    return exporter.export(), reports
+
+
+def test_pre_scan_is_gone():
+    with open(os.path.join(SOURCE_ROOT, 'export', 'scene.py'), 'rb') as source_file:
+        tree = ast.parse(source_file.read())
+
+    names = {node.name for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)}
+    assert not names & {'scene_is_lit', 'object_is_lit'}
+
+
+@pytest.mark.parametrize('emitting_meshes, lamps', [(False, True), (True, False), (True, True)])
+def test_lit_scene_exports(emitting_meshes, lamps):
+    result, reports = export(stub_scene(emitting_meshes, lamps))
+
+    assert result == {'FINISHED'}
+    assert not [message for type, message in reports if 'ERROR' in type]
+
+
+def test_unlit_scene_is_rejected():
+    result, reports = export(stub_scene(False, False))
+
+    assert result == {'CANCELLED'}
+    assert ({'ERROR'}, 'Export aborted: Scene is not lit!') in reports
+
+
+def test_unlit_scene_raises_when_testing():
+    scene = stub_scene(False, False)
+    scene.luxrender_testing.re_raise = True
+
+    with pytest.raises(Exception, match='Scene is not lit!'):
+        export(scene)
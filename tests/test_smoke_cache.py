@@ -0,0 +1,137 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import array
+import collections
+
+import pytest
+
+from conftest import load_module
+from fake_blender import Bag, load_definitions
+
+ExportProfiler = load_module('export/profiling.py').ExportProfiler
+
+MB = 1024 * 1024
+# 0.75 MB of float cells, two of them fit into a 2 MB cache
+CELLS = 3 * MB // 16
+
+
+@pytest.fixture
+def smoke():
+    """Fresh SmokeCache (class state) with export_smoke() replaced, returns (SmokeCache, exported channels)"""
+    exported = []
+
+    def export_smoke(smoke_obj_name, channel):
+        exported.append((smoke_obj_name, channel))
+
+        if smoke_obj_name == 'preview':
+            return 1, 1, 1, 1.0
+
+        return 64, 64, CELLS // 4096, [float(len(exported))] * CELLS
+
+    SmokeCache, = load_definitions('export/volumes.py', ['SmokeCache'], {
+        'array': array, 'collections': collections, 'ExportProfiler': ExportProfiler, 'export_smoke': export_smoke})
+    return SmokeCache, exported
+
+
+def scene(frame=1, cache_size=2):
+    return Bag(name='Scene', frame_current=frame, luxcore_translatorsettings=Bag(smoke_cache_size=cache_size))
+
+
+def test_textures_share_converted_grid(smoke):
+    SmokeCache, exported = smoke
+    sc = scene()
+
+    assert SmokeCache.needs_update(sc, 'Domain', 'density', 'smoke_a')
+    nx, ny, nz, data = SmokeCache.convert(sc, 'Domain', 'density', 'smoke_a')
+    assert not SmokeCache.needs_update(sc, 'Domain', 'density', 'smoke_a')
+
+    # A second texture of the same domain and channel still needs its data, which comes from the cache
+    assert SmokeCache.needs_update(sc, 'Domain', 'density', 'smoke_b')
+    assert SmokeCache.convert(sc, 'Domain', 'density', 'smoke_b') == (nx, ny, nz, data)
+    assert isinstance(data, list) and len(data) == CELLS
+
+    assert exported == [('Domain', 'density')]
+    assert (SmokeCache.hits, SmokeCache.misses) == (1, 1)
+
+
+def test_needs_update_after_frame_change_and_reset(smoke):
+    SmokeCache, exported = smoke
+    SmokeCache.convert(scene(1), 'Domain', 'density', 'smoke')
+
+    assert not SmokeCache.needs_update(scene(1), 'Domain', 'density', 'smoke')
+    assert SmokeCache.needs_update(scene(2), 'Domain', 'density', 'smoke')
+    assert SmokeCache.needs_update(scene(1), 'Domain', 'fire', 'smoke')
+
+    SmokeCache.reset()
+
+    assert SmokeCache.needs_update(scene(1), 'Domain', 'density', 'smoke')
+    assert SmokeCache.size == 0 and not SmokeCache.cache
+
+    SmokeCache.convert(scene(1), 'Domain', 'density', 'smoke')
+    assert exported == [('Domain', 'density')] * 2
+
+
+def test_least_recently_used_grid_is_evicted(smoke):
+    SmokeCache, exported = smoke
+    sc = scene(cache_size=2)
+
+    SmokeCache.convert(sc, 'A', 'density', 'a')
+    SmokeCache.convert(sc, 'B', 'density', 'b')
+    # Using A again makes B the least recently used grid
+    SmokeCache.convert(sc, 'A', 'density', 'a2')
+    SmokeCache.convert(sc, 'C', 'density', 'c')
+
+    assert [key[1] for key in SmokeCache.cache] == ['A', 'C']
+    assert SmokeCache.evictions == 1
+    assert SmokeCache.size == 2 * CELLS * 4 <= SmokeCache.max_size
+
+    # B has to be read again
+    SmokeCache.convert(sc, 'B', 'density', 'b2')
+    assert exported == [('A', 'density'), ('B', 'density'), ('C', 'density'), ('B', 'density')]
+    assert [key[1] for key in SmokeCache.cache] == ['C', 'B']
+
+
+def test_size_accounting(smoke):
+    SmokeCache, exported = smoke
+    sc = scene(cache_size=2)
+
+    SmokeCache.convert(sc, 'A', 'density', 'a')
+    assert SmokeCache.size == CELLS * 4
+    assert SmokeCache.cache[SmokeCache.create_key(sc, 'A', 'density')][3].typecode == 'f'
+
+    # Adding a grid again replaces it, it is not counted twice
+    SmokeCache.add(SmokeCache.create_key(sc, 'A', 'density'), (64, 64, 48, [0.0] * CELLS))
+    assert SmokeCache.size == CELLS * 4
+
+    # The preview grid is a single value without an array
+    SmokeCache.convert(sc, 'preview', 'density', 'preview')
+    assert SmokeCache.convert(sc, 'preview', 'density', 'preview2') == (1, 1, 1, 1.0)
+    assert SmokeCache.size == CELLS * 4
+
+
+def test_grid_larger_than_cache_is_not_kept(smoke):
+    SmokeCache, exported = smoke
+    sc = scene(cache_size=0)
+
+    grid = SmokeCache.convert(sc, 'A', 'density', 'a')
+
+    assert len(grid[3]) == CELLS
+    assert SmokeCache.size == 0 and not SmokeCache.cache
+    assert not SmokeCache.needs_update(sc, 'A', 'density', 'a')
@@ -0,0 +1,161 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+from fake_blender import Bag, load_definitions
+
+
+class Clock(object):
+    now = 1000.0
+
+    @classmethod
+    def time(cls):
+        return cls.now
+
+
+UpdateChanges, defer_update_changes = load_definitions(
+    'core/__init__.py', ['UpdateChanges', 'RENDERENGINE_luxrender.defer_update_changes'], {'time': Clock})
+
+INTERVAL = 0.1
+
+
+class Engine(object):
+    """The parts of the render engine that the deferral uses"""
+    defer_update_changes = defer_update_changes
+
+    def __init__(self):
+        self.last_flush_time = Clock.now
+        self.pending_update_changes = None
+        self.redraws = 0
+        self.flushed = []
+
+    def get_update_interval(self, scene):
+        return INTERVAL
+
+    def tag_redraw(self):
+        self.redraws += 1
+
+    def view_update(self, update_changes):
+        """Like luxcore_view_update(): merge pending changes into a flush unless they can be deferred"""
+        if self.defer_update_changes(Bag(scene=None), update_changes):
+            return
+
+        if self.pending_update_changes is not None:
+            self.pending_update_changes.merge(update_changes)
+            update_changes = self.pending_update_changes
+            self.pending_update_changes = None
+
+        self.last_flush_time = Clock.now
+        self.flushed.append(update_changes)
+
+    def view_draw(self):
+        if self.pending_update_changes is not None and Clock.now - self.last_flush_time >= INTERVAL:
+            pending_update_changes = self.pending_update_changes
+            self.pending_update_changes = None
+            self.view_update(pending_update_changes)
+
+
+def transform(obj):
+    changes = UpdateChanges()
+    changes.changed_objects_transform.add(obj)
+    changes.set_cause(objectTransform=True)
+    return changes
+
+
+def test_merge_unions_elements_and_causes():
+    cube, sphere, material = Bag(name='Cube'), Bag(name='Sphere'), Bag(name='Material')
+    changes = transform(cube)
+
+    newer = UpdateChanges()
+    newer.changed_objects_mesh.add(sphere)
+    newer.changed_materials.add(material)
+    newer.set_cause(mesh=True, materials=True)
+    changes.merge(newer)
+
+    assert changes.changed_objects_transform == {cube}
+    assert changes.changed_objects_mesh == {sphere}
+    assert changes.changed_materials == {material}
+    assert changes.cause_objectTransform and changes.cause_mesh and changes.cause_materials
+    assert not changes.cause_light and not changes.cause_unknown
+    assert changes.scene_edit_necessary
+
+
+def test_merge_keeps_latest_state_of_removed_objects():
+    cube = Bag(name='Cube')
+    changes = transform(cube)
+
+    removed = UpdateChanges()
+    removed.removed_objects.add(cube)
+    removed.set_cause(objectsRemoved=True)
+    changes.merge(removed)
+    assert changes.removed_objects == {cube}
+    assert not changes.changed_objects_transform
+
+    changes.merge(transform(cube))
+    assert changes.changed_objects_transform == {cube}
+    assert not changes.removed_objects
+
+
+def test_merge_of_unknown_changes():
+    changes = UpdateChanges()
+    changes.merge(UpdateChanges())
+    assert changes.cause_unknown
+
+    changes.merge(transform(Bag(name='Cube')))
+    assert not changes.cause_unknown
+
+
+def test_fast_edits_are_flushed_once():
+    engine = Engine()
+    objects = [Bag(name='Object%i' % i) for i in range(10)]
+
+    # Ten edits, 10ms apart, all within the interval after the last flush
+    for obj in objects:
+        Clock.now += 0.01
+        engine.view_update(transform(obj))
+
+    assert engine.flushed == []
+    assert engine.redraws == len(objects)
+
+    engine.view_draw()
+    assert engine.flushed == []
+
+    Clock.now += INTERVAL
+    engine.view_draw()
+    assert len(engine.flushed) == 1
+    assert engine.flushed[0].changed_objects_transform == set(objects)
+    assert engine.pending_update_changes is None
+
+    engine.view_draw()
+    assert len(engine.flushed) == 1
+
+
+def test_config_changes_are_not_deferred():
+    engine = Engine()
+    cube = Bag(name='Cube')
+    Clock.now += 0.01
+    engine.view_update(transform(cube))
+
+    config = UpdateChanges()
+    config.set_cause(config=True)
+    Clock.now += 0.01
+    engine.view_update(config)
+
+    assert len(engine.flushed) == 1
+    assert engine.flushed[0].cause_config
+    assert engine.flushed[0].changed_objects_transform == {cube}
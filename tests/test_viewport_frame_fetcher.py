@@ -0,0 +1,132 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import threading
+import time
+
+from conftest import load_module
+
+viewport = load_module('core/viewport.py')
+
+FRAME_TIME = 0.2
+
+
+class FakeFilm(object):
+    def __init__(self, session):
+        self.session = session
+
+    def GetOutputFloat(self, output_type, buffer):
+        self.session.reads += 1
+        buffer[:] = type(buffer)('f', [float(self.session.reads)]) * len(buffer)
+
+
+class FakeLuxCoreSession(object):
+    """Each WaitNewFrame() takes a frame time, like a real session waiting for the next film update"""
+
+    def __init__(self):
+        self.in_scene_edit = False
+        self.paused = False
+        self.reads = 0
+        self.waiting = threading.Event()
+
+    def IsInSceneEdit(self):
+        return self.in_scene_edit
+
+    def IsInPause(self):
+        return self.paused
+
+    def WaitNewFrame(self):
+        self.waiting.set()
+        time.sleep(FRAME_TIME)
+        self.waiting.clear()
+
+    def GetFilm(self):
+        return FakeFilm(self)
+
+
+def start_fetcher(luxcore_session):
+    session = viewport.Session(luxcore_session)
+    session.is_active = True
+    fetcher = viewport.ViewportFrameFetcher(session, 4, 2, 3, 'RGB_TONEMAPPED', 0.001)
+    fetcher.start()
+    return session, fetcher
+
+
+def test_frames_are_delivered_once():
+    luxcore_session = FakeLuxCoreSession()
+    session, fetcher = start_fetcher(luxcore_session)
+
+    try:
+        deadline = time.perf_counter() + 5
+        frames = []
+
+        while not frames and time.perf_counter() < deadline:
+            fetcher.consume_frame(lambda pixels, width, height, depth: frames.append((list(pixels), width, height)))
+            time.sleep(0.01)
+
+        pixels, width, height = frames[0]
+        assert (width, height) == (4, 2)
+        assert len(pixels) == 4 * 2 * 3 and pixels[0] >= 1.0
+    finally:
+        fetcher.stop()
+
+
+def test_lock_is_free_while_waiting_for_a_frame():
+    luxcore_session = FakeLuxCoreSession()
+    session, fetcher = start_fetcher(luxcore_session)
+
+    try:
+        assert luxcore_session.waiting.wait(5)
+
+        # Like begin_scene_edit() on the UI thread
+        start = time.perf_counter()
+        with session.lock:
+            luxcore_session.in_scene_edit = True
+        assert time.perf_counter() - start < FRAME_TIME / 4
+
+        # The frame that arrives during the scene edit is not read
+        reads = luxcore_session.reads
+        time.sleep(FRAME_TIME * 2)
+        assert luxcore_session.reads == reads
+    finally:
+        fetcher.stop()
+
+
+def test_paused_session_is_not_fetched():
+    luxcore_session = FakeLuxCoreSession()
+    luxcore_session.paused = True
+    session, fetcher = start_fetcher(luxcore_session)
+
+    try:
+        time.sleep(0.1)
+        assert not luxcore_session.waiting.is_set()
+        assert luxcore_session.reads == 0
+    finally:
+        fetcher.stop()
+
+
+def test_stop_waits_at_most_one_frame():
+    luxcore_session = FakeLuxCoreSession()
+    session, fetcher = start_fetcher(luxcore_session)
+    assert luxcore_session.waiting.wait(5)
+
+    start = time.perf_counter()
+    fetcher.stop()
+    assert time.perf_counter() - start < FRAME_TIME * 1.5
+    assert not fetcher.is_alive()
@@ -0,0 +1,234 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+import time
+import types
+
+from fake_blender import Bag, Properties, load_definitions, log
+
+
+def properties(**values):
+    props = Properties()
+    props.values = {name.replace('_', '.'): value for name, value in values.items()}
+    return props
+
+
+class FakeConfig(object):
+    def __init__(self):
+        self.parsed = []
+        self.scene = Bag(Parse=self.parsed.append, DeleteLight=lambda name: None)
+
+    def Parse(self, props):
+        self.parsed.append(props)
+
+    def GetScene(self):
+        return self.scene
+
+
+class SessionManager(object):
+    """Records the session restarts instead of talking to LuxCore"""
+
+    def __init__(self):
+        self.config = FakeConfig()
+        self.calls = []
+
+    def get_session(self, space):
+        return Bag(luxcore_session=Bag(GetRenderConfig=lambda: self.config), lock=None)
+
+    def __getattr__(self, name):
+        return lambda *args: self.calls.append(name)
+
+
+class RecordingExporter(object):
+    def __init__(self):
+        self.calls = []
+        self.config_exporter = Bag(properties=properties(film_width=800))
+        self.config_properties = Properties()
+
+    def record(self, name, result=None):
+        def method(*args, **kwargs):
+            self.calls.append(name)
+            return result
+
+        return method
+
+    def __getattr__(self, name):
+        if name == 'pop_updated_scene_properties':
+            return self.record(name, Properties())
+        if name == 'pop_updated_camera_properties':
+            return self.record(name, properties(scene_camera_lookat=(0, 0, 1)))
+        if name == 'update_object_transform':
+            return self.record(name, True)
+        return self.record(name)
+
+
+pop_updated_camera_properties, UpdateChanges = load_definitions(
+    'export/luxcore/__init__.py', ['LuxCoreExporter.pop_updated_camera_properties'],
+    {'pyluxcore': types.SimpleNamespace(Properties=Properties)}) + \
+    load_definitions('core/__init__.py', ['UpdateChanges'], {})
+
+
+def make_engine(session_manager):
+    view_update, = load_definitions('core/__init__.py', ['RENDERENGINE_luxrender.luxcore_view_update'], {
+        'PYLUXCORE_AVAILABLE': True, 'LuxLog': log, 'time': time, 'LuxCoreSessionManager': session_manager,
+        'ImageStagingCache': Bag(scene_parsed=lambda: None), 'print': lambda *args: None})
+
+    class Engine(object):
+        def __init__(self):
+            self.luxcore_exporter = RecordingExporter()
+            self.pending_update_changes = None
+            self.update_counter = 0
+            self.space = 'VIEW_3D'
+            self.view_resolution = None
+            self.viewFilmWidth, self.viewFilmHeight = 800, 600
+
+        luxcore_view_update = view_update
+
+        def test_break(self):
+            return False
+
+        def get_resolution_settings(self, scene):
+            return 1, 0
+
+        def get_view_film_size(self):
+            return self.viewFilmWidth, self.viewFilmHeight
+
+        def start_frame_fetcher(self, context):
+            pass
+
+        def free_view_texture(self):
+            self.luxcore_exporter.calls.append('free_view_texture')
+
+    return Engine()
+
+
+class FakeGL(object):
+    """Keeps track of the texture ids that are alive"""
+
+    GL_INT = GL_FLOAT = GL_RGB = GL_RGBA = GL_TEXTURE_2D = GL_TEXTURE_MIN_FILTER = GL_TEXTURE_MAG_FILTER = \
+        GL_LINEAR = 0
+
+    def __init__(self):
+        self.textures = set()
+        self.next_id = 1
+        self.allocations = 0
+
+    def Buffer(self, type, size, data=None):
+        return [0] * size if isinstance(size, int) else data
+
+    def glGenTextures(self, count, buffer):
+        buffer[0] = self.next_id
+        self.textures.add(self.next_id)
+        self.next_id += 1
+
+    def glDeleteTextures(self, count, buffer):
+        self.textures.remove(buffer[0])
+
+    def glTexImage2D(self, *args):
+        self.allocations += 1
+
+    def __getattr__(self, name):
+        return lambda *args: None
+
+
+def make_texture_engine(bgl):
+    methods = load_definitions('core/__init__.py', ['RENDERENGINE_luxrender.upload_view_texture',
+                                                    'RENDERENGINE_luxrender.free_view_texture'], {'bgl': bgl})
+
+    class Engine(object):
+        view_texture = None
+        view_texture_size = None
+        upload_view_texture, free_view_texture = methods
+
+    return Engine()
+
+
+def context(width, height):
+    return Bag(scene=Bag(camera=None, luxcore_rendering_controls=Bag(pause_viewport_render=False),
+                         luxcore_translatorsettings=Bag(print_scn=False)),
+               region=Bag(width=width, height=height), space_data=Bag(local_view=None))
+
+
+def resize_changes():
+    # What luxcore_view_draw() sends once the region size settled
+    changes = UpdateChanges()
+    changes.set_cause(config=True)
+    return changes
+
+
+def test_resize_does_not_convert_objects():
+    session_manager = SessionManager()
+    engine = make_engine(session_manager)
+
+    engine.luxcore_view_update(context(1024, 768), resize_changes())
+
+    assert engine.luxcore_exporter.calls == ['free_view_texture', 'convert_config', 'convert_camera',
+                                             'pop_updated_camera_properties']
+    assert (engine.viewFilmWidth, engine.viewFilmHeight) == (1024, 768)
+    assert session_manager.calls.count('create_luxcore_session') == 1
+    assert 'begin_scene_edit' not in session_manager.calls
+
+
+def test_pending_edits_survive_the_restart():
+    session_manager = SessionManager()
+    engine = make_engine(session_manager)
+    cube = Bag(name='Cube', type='MESH')
+
+    pending = UpdateChanges()
+    pending.changed_objects_transform.add(cube)
+    pending.set_cause(objectTransform=True)
+    engine.pending_update_changes = pending
+
+    engine.luxcore_view_update(context(1024, 768), resize_changes())
+
+    calls = engine.luxcore_exporter.calls
+    assert 'convert_object' not in calls and 'convert' not in calls
+    assert calls.index('pop_updated_camera_properties') < calls.index('update_object_transform')
+    assert calls.count('pop_updated_scene_properties') == 1
+    assert calls[-1] == 'pop_updated_scene_properties'
+
+
+def test_camera_pop_keeps_other_changes():
+    exporter = Bag(camera_exporter=Bag(properties=properties(scene_camera_lookat=(0, 0, 1))),
+                   updated_scene_properties=properties(scene_camera_lookat=(0, 0, 1),
+                                                       scene_objects_Cube_transformation=(1,)),
+                   temp_material_cache={'Material'})
+
+    camera_props = pop_updated_camera_properties(exporter)
+
+    assert camera_props.GetAllNames() == ['scene.camera.lookat']
+    assert exporter.updated_scene_properties.GetAllNames() == ['scene.objects.Cube.transformation']
+    assert exporter.temp_material_cache == {'Material'}
+
+
+def test_view_texture_is_deleted_before_reallocation():
+    bgl = FakeGL()
+    engine = make_texture_engine(bgl)
+
+    engine.upload_view_texture([0.0] * 12, 2, 2, 3)
+    engine.upload_view_texture([0.0] * 12, 2, 2, 3)
+    assert bgl.allocations == 1 and len(bgl.textures) == 1
+
+    engine.upload_view_texture([0.0] * 16, 2, 2, 4)
+    assert bgl.allocations == 2
+    assert bgl.textures == {engine.view_texture[0]}
+
+    engine.free_view_texture()
+    assert bgl.textures == set()
+    assert engine.view_texture is None and engine.view_texture_size is None
@@ -0,0 +1,81 @@
+# -*- coding: utf8 -*-
+#
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+#
+# ***** END GPL LICENCE BLOCK *****
+#
+from conftest import load_module
+
+viewport = load_module('core/viewport.py')
+
+IDLE = 0.5
+SIZE = (800, 600)
+
+
+def test_activity_reduced_idle_full():
+    resolution = viewport.ViewportResolution()
+    restarts = 0
+
+    # Dragging: edits every 50ms, only the second one switches to the reduced size
+    for step in range(10):
+        restarts += resolution.activity(step * 0.05, 4, IDLE, *SIZE)
+
+    last_edit = 9 * 0.05
+    assert restarts == 1
+    assert resolution.film_size(*SIZE) == (200, 150)
+
+    # Still interacting
+    assert not resolution.check_idle(last_edit + IDLE / 2, IDLE, *SIZE)
+    assert resolution.film_size(*SIZE) == (200, 150)
+
+    # Idle: back to full resolution, once
+    assert resolution.check_idle(last_edit + IDLE + 0.001, IDLE, *SIZE)
+    assert resolution.film_size(*SIZE) == SIZE
+    assert not resolution.check_idle(last_edit + IDLE * 2, IDLE, *SIZE)
+
+
+def test_single_edit_keeps_full_resolution():
+    resolution = viewport.ViewportResolution()
+
+    assert not resolution.activity(10.0, 4, IDLE, *SIZE)
+    assert not resolution.check_idle(10.0 + IDLE, IDLE, *SIZE)
+    assert not resolution.activity(20.0, 4, IDLE, *SIZE)
+    assert resolution.film_size(*SIZE) == SIZE
+
+
+def test_no_restart_without_size_change():
+    resolution = viewport.ViewportResolution()
+
+    # Reduction disabled
+    assert not resolution.activity(0.0, 1, IDLE, *SIZE)
+    assert not resolution.activity(0.1, 1, IDLE, *SIZE)
+    assert not resolution.check_idle(1.0, IDLE, *SIZE)
+
+    # A one pixel region can't get smaller
+    assert not resolution.activity(2.0, 4, IDLE, 1, 1)
+    assert not resolution.activity(2.1, 4, IDLE, 1, 1)
+    assert not resolution.check_idle(3.0, IDLE, 1, 1)
+    assert resolution.film_size(1, 1) == (1, 1)
+
+
+def test_changing_reduction_while_interacting():
+    resolution = viewport.ViewportResolution()
+    resolution.activity(0.0, 2, IDLE, *SIZE)
+
+    assert resolution.activity(0.1, 2, IDLE, *SIZE)
+    assert not resolution.activity(0.2, 2, IDLE, *SIZE)
+    assert resolution.activity(0.3, 4, IDLE, *SIZE)
+    assert resolution.film_size(*SIZE) == (200, 150)